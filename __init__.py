@@ -51,7 +51,7 @@ from .config import Config, BrowserConfig, LLMConfig, ContentConfig, StorageConf
 from .config import CrawlConfig as BaseCrawlConfig, IntentCategory, URLPriority
 
 # Logging
-from .logger_config import setup_logger, ProgressLogger, LogContext
+from .logger_config import setup_logger, ProgressLogger, LogContext, get_log_history
 
 # Utilities
 from .utils import (
@@ -133,6 +133,7 @@ __all__ = [
     "setup_logger",
     "ProgressLogger",
     "LogContext",
+    "get_log_history",
     
     # Utilities
     "normalize_url",
@@ -11,7 +11,8 @@
 import os
 import sys
 import traceback
-from dataclasses import dataclass, field
+import json
+from dataclasses import dataclass, field, asdict
 from typing import List, Optional
 from pathlib import Path
 from datetime import datetime
@@ -219,12 +220,10 @@ class Config:
     
     def to_dict(self) -> dict:
         """转换为字典格式"""
-        from dataclasses import asdict
         return asdict(self)
     
     def print_config(self):
         """打印当前配置"""
-        import json
         
         # 转换Path为字符串
         config_dict = self.to_dict()
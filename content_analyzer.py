@@ -15,6 +15,7 @@
 
 import re
 import json
+import time
 from typing import Optional, Dict, List, Any, Tuple
 from dataclasses import dataclass, field
 from urllib.parse import urljoin
@@ -205,7 +206,6 @@ class ContentAnalyzer:
         Returns:
             AnalysisResult对象
         """
-        import time
         start_time = time.time()
         
         url = content.url
@@ -15,6 +15,7 @@ Trafilatura特点:
 """
 
 import re
+import time
 from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, field
 from urllib.parse import urlparse, urljoin
@@ -138,7 +139,6 @@ class ContentExtractor:
         Returns:
             ExtractedContent对象
         """
-        import time
         start_time = time.time()
         
         if not html:
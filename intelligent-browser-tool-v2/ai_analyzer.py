@@ -14,6 +14,8 @@ import json
 import re
 import time
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List, Any, Tuple
 from dataclasses import dataclass
 
@@ -21,7 +23,81 @@ import requests
 from loguru import logger
 
 from config import Config, OllamaConfig
-from prompts import PromptBuilder
+from prompts import PromptBuilder, Messages
+from llm_cache import LLMCache, SemanticCache, cache_key
+
+# ============ 可选依赖检测 ============
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+
+# 链接评分时并发请求的批数上限 (Ollama按OLLAMA_NUM_PARALLEL并行处理请求)
+LINK_SCORE_WORKERS = 4
+
+
+# ============ 分类缓存 ============
+
+# 分类缓存容量 (条), 写满后不再加入新条目
+CLASSIFY_CACHE_SIZE = 4096
+
+# SimHash汉明距离不超过该值视为近似重复页面
+CLASSIFY_SIMHASH_DISTANCE = 3
+
+# 预览文本少于该词数时不走缓存 (空预览或只有几个词的页面几乎都会"相同", 结果取决于标题)
+CLASSIFY_CACHE_MIN_TOKENS = 8
+
+# 64位SimHash切成4段16位, 距离不超过3时至少有一段完全相同 (抽屉原理)
+_SIMHASH_BANDS = 4
+_SIMHASH_BAND_BITS = 16
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# 语义缓存不保存的字段: 页面自身信息和原请求的模型/耗时, 命中时不应沿用
+_SEMANTIC_UNCACHED_KEYS = frozenset(('url', 'title', 'model', 'elapsed'))
+
+
+def _hash64(data: bytes) -> int:
+    """64位哈希 (优先xxhash)"""
+    if HAS_XXHASH:
+        return xxhash.xxh64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def _simhash64(text: str) -> int:
+    """
+    文本的64位SimHash
+    
+    以词为特征, 同一模板生成的页面 (页眉页脚相同, 正文略有差别) 指纹只差少数几位.
+    各位上的计数按位切片累加: counters[i] 的第b位是第b位计数的二进制第i位,
+    每个词只需对 O(log n) 个整数做位运算, 而不是逐位循环64次
+    """
+    counters: List[int] = []
+    n = 0
+    for token in _TOKEN_RE.findall(text.lower()):
+        carry = _hash64(token.encode('utf-8'))
+        n += 1
+        for i, counter in enumerate(counters):
+            counters[i] = counter ^ carry
+            carry &= counter
+            if not carry:
+                break
+        else:
+            if carry:
+                counters.append(carry)
+    
+    # 某一位为1的词数超过一半时, 该位为1
+    result = 0
+    for bit in range(64):
+        ones = 0
+        for i, counter in enumerate(counters):
+            ones |= (counter >> bit & 1) << i
+        if 2 * ones > n:
+            result |= 1 << bit
+    return result
 
 
 @dataclass
@@ -64,8 +140,45 @@ class AIAnalyzer:
         self.prompt_builder = PromptBuilder(user_intent)
         self.user_intent = user_intent
         
-        # 响应缓存
-        self._cache: Dict[str, ModelResponse] = {}
+        # 响应缓存: 本次运行的响应保存在内存, 低温度调用另外持久化到磁盘
+        storage = config.storage
+        self._cache = LLMCache(
+            directory=(
+                str(config.get_storage_path('cache', storage.llm_cache_dir))
+                if storage.enable_cache else None
+            ),
+            ttl=storage.llm_cache_ttl,
+            persist_max_temperature=storage.llm_cache_max_temperature
+        )
+        
+        # 内容分析的语义缓存: 近似重复页面复用已有分析结果
+        # 分析结果依赖用户意图和模型, 持久化文件按 (大模型, 嵌入模型, 意图) 分开存放
+        self._semantic_cache: Optional[SemanticCache] = None
+        if self.ollama_config.analysis_cache_strategy == "semantic-similarity":
+            namespace = hashlib.sha256(json.dumps([
+                self.ollama_config.large_model,
+                self.ollama_config.embedding_model,
+                user_intent
+            ], ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+            self._semantic_cache = SemanticCache(
+                threshold=self.ollama_config.semantic_cache_threshold,
+                path=(
+                    str(config.get_storage_path(
+                        'cache', f'semantic_analysis_{namespace}.jsonl'
+                    ))
+                    if storage.enable_cache else None
+                )
+            )
+        
+        # 页面分类缓存: 预览文本指纹 -> 分类结果, 以及按SimHash分段的近似重复索引
+        self._classify_cache: Dict[int, Dict] = {}
+        self._simhash_bands: List[Dict[int, List[Tuple[int, Dict]]]] = [
+            {} for _ in range(_SIMHASH_BANDS)
+        ]
+        self._classify_lock = threading.Lock()
+        self._classify_hits = 0
+        self._classify_near_hits = 0
+        self._classify_misses = 0
         
         # 验证Ollama连接
         self._verify_connection()
@@ -103,8 +216,7 @@ class AIAnalyzer:
     def _call_ollama(
         self, 
         model: str, 
-        system_prompt: str, 
-        user_prompt: str,
+        messages: Messages,
         temperature: float = None,
         max_tokens: int = None
     ) -> ModelResponse:
@@ -113,36 +225,33 @@ class AIAnalyzer:
         
         Args:
             model: 模型名称
-            system_prompt: 系统提示
-            user_prompt: 用户提示
+            messages: PromptBuilder生成的消息列表
             temperature: 温度参数
             max_tokens: 最大token数
             
         Returns:
             ModelResponse对象
         """
-        # 检查缓存
-        cache_key = hashlib.md5(
-            f"{model}{system_prompt}{user_prompt}".encode()
-        ).hexdigest()
+        temperature = temperature or self.ollama_config.temperature
+        max_tokens = max_tokens or self.ollama_config.max_tokens
         
-        if cache_key in self._cache:
+        # 检查缓存
+        key = cache_key(model, messages, temperature, max_tokens)
+        cached = self._cache.get(key)
+        if cached is not None:
             logger.debug("使用缓存响应")
-            return self._cache[cache_key]
+            return cached
         
         # 准备请求
         url = f"{self.ollama_config.host}/api/chat"
         
         payload = {
             "model": model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            "messages": messages,
             "stream": False,
             "options": {
-                "temperature": temperature or self.ollama_config.temperature,
-                "num_predict": max_tokens or self.ollama_config.max_tokens
+                "temperature": temperature,
+                "num_predict": max_tokens
             }
         }
         
@@ -173,7 +282,7 @@ class AIAnalyzer:
                 )
                 
                 # 缓存成功响应
-                self._cache[cache_key] = model_response
+                self._cache.set(key, model_response, temperature)
                 
                 logger.debug(f"模型调用成功: {model}, {elapsed:.2f}s")
                 return model_response
@@ -251,6 +360,34 @@ class AIAnalyzer:
         
         return None
     
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """
+        调用Ollama嵌入接口
+        
+        Returns:
+            嵌入向量, 失败返回None (并停用语义缓存, 避免每页都请求失败的接口)
+        """
+        try:
+            response = requests.post(
+                f"{self.ollama_config.host}/api/embed",
+                json={"model": self.ollama_config.embedding_model, "input": text},
+                timeout=self.ollama_config.timeout
+            )
+            if response.status_code == 200:
+                embeddings = response.json().get('embeddings') or []
+                if embeddings:
+                    return embeddings[0]
+            error = f"HTTP {response.status_code}"
+        except Exception as e:
+            error = str(e)
+        
+        logger.warning(
+            f"嵌入模型调用失败: {self.ollama_config.embedding_model} - {error}, "
+            f"停用语义缓存"
+        )
+        self._semantic_cache = None
+        return None
+    
     # ========== 0.5b模型功能 ==========
     
     def classify_page(
@@ -269,15 +406,28 @@ class AIAnalyzer:
             
         Returns:
             分类结果字典
+        
+        模板化页面的预览文本常常相同或几乎相同, 分类结果按标题+预览文本的指纹缓存:
+        完全相同直接命中, 否则SimHash汉明距离不超过CLASSIFY_SIMHASH_DISTANCE也视为命中;
+        预览文本不足CLASSIFY_CACHE_MIN_TOKENS个词时不查也不写缓存
         """
+        cacheable = len(_TOKEN_RE.findall(text_preview)) >= CLASSIFY_CACHE_MIN_TOKENS
+        if cacheable:
+            cache_text = f"{title}\n{text_preview}"
+            fp = _hash64(cache_text.encode('utf-8'))
+            simhash = _simhash64(cache_text)
+            
+            cached = self._lookup_classification(fp, simhash)
+            if cached is not None:
+                return {**cached, 'cached': True}
+        
         prompt = self.prompt_builder.build_classification_prompt(
             title, text_preview
         )
         
         response = self._call_ollama(
             model=self.ollama_config.small_model,
-            system_prompt=prompt['system'],
-            user_prompt=prompt['user'],
+            messages=prompt,
             temperature=0.1,
             max_tokens=256
         )
@@ -286,9 +436,11 @@ class AIAnalyzer:
             result = response.parsed
             result['model'] = self.ollama_config.small_model
             result['elapsed'] = response.elapsed
+            if cacheable:
+                self._store_classification(fp, simhash, result)
             return result
         
-        # 默认返回
+        # 默认返回 (失败结果不缓存)
         return {
             'category': 'other',
             'confidence': 0.5,
@@ -298,6 +450,34 @@ class AIAnalyzer:
             'elapsed': response.elapsed
         }
     
+    def _lookup_classification(self, fp: int, simhash: int) -> Optional[Dict]:
+        """按指纹查找分类缓存, 先精确匹配, 再按SimHash查找近似重复"""
+        with self._classify_lock:
+            result = self._classify_cache.get(fp)
+            if result is not None:
+                self._classify_hits += 1
+                return result
+            
+            for band, index in enumerate(self._simhash_bands):
+                key = simhash >> (band * _SIMHASH_BAND_BITS) & 0xFFFF
+                for other, result in index.get(key, ()):
+                    if bin(simhash ^ other).count('1') <= CLASSIFY_SIMHASH_DISTANCE:
+                        self._classify_near_hits += 1
+                        return result
+            
+            self._classify_misses += 1
+            return None
+    
+    def _store_classification(self, fp: int, simhash: int, result: Dict):
+        """写入分类缓存"""
+        with self._classify_lock:
+            if len(self._classify_cache) >= CLASSIFY_CACHE_SIZE:
+                return
+            self._classify_cache[fp] = result
+            for band, index in enumerate(self._simhash_bands):
+                key = simhash >> (band * _SIMHASH_BAND_BITS) & 0xFFFF
+                index.setdefault(key, []).append((simhash, result))
+    
     def quick_relevance_check(self, text: str) -> bool:
         """
         快速相关性判断 (使用0.5b模型)
@@ -315,8 +495,7 @@ class AIAnalyzer:
         
         response = self._call_ollama(
             model=self.ollama_config.small_model,
-            system_prompt=prompt['system'],
-            user_prompt=prompt['user'],
+            messages=prompt,
             temperature=0.1,
             max_tokens=10
         )
@@ -334,6 +513,8 @@ class AIAnalyzer:
         """
         链接评分 (使用0.5b模型)
         
+        链接较多时拆成多批, 各批并发请求, 再按链接编号合并评分
+        
         Args:
             links: 链接列表
             
@@ -343,24 +524,40 @@ class AIAnalyzer:
         if not links:
             return []
         
-        prompt = self.prompt_builder.build_link_priority_prompt(links)
+        prompts = self.prompt_builder.build_link_priority_prompts(links)
         
-        response = self._call_ollama(
-            model=self.ollama_config.small_model,
-            system_prompt=prompt['system'],
-            user_prompt=prompt['user'],
-            temperature=0.1,
-            max_tokens=512
-        )
+        def score_batch(prompt: Messages) -> ModelResponse:
+            return self._call_ollama(
+                model=self.ollama_config.small_model,
+                messages=prompt,
+                temperature=0.1,
+                max_tokens=512
+            )
         
-        if response.success and response.parsed:
-            scores = response.parsed.get('scores', [])
-            
-            # 合并评分到原始链接
-            score_map = {s['url']: s.get('score', 1) for s in scores}
-            
-            for link in links:
-                link['ai_score'] = score_map.get(link['url'], 1)
+        if len(prompts) == 1:
+            responses = [score_batch(prompts[0])]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(len(prompts), LINK_SCORE_WORKERS)
+            ) as executor:
+                responses = list(executor.map(score_batch, prompts))
+        
+        # 合并各批评分 (编号即链接在links中的下标)
+        score_map = {}
+        succeeded = False
+        for response in responses:
+            if not (response.success and response.parsed):
+                continue
+            succeeded = True
+            for s in response.parsed.get('scores', []):
+                try:
+                    score_map[int(s['id'])] = s.get('score', 1)
+                except (KeyError, TypeError, ValueError):
+                    continue
+        
+        if succeeded:
+            for i, link in enumerate(links):
+                link['ai_score'] = score_map.get(i, 1)
             
             # 按评分排序
             links.sort(key=lambda x: x.get('ai_score', 0), reverse=True)
@@ -389,15 +586,33 @@ class AIAnalyzer:
             
         Returns:
             分析结果字典
+        
+        启用语义缓存时, 标题和正文开头与已分析页面足够相似则直接复用其结果
+        (结果中 cached='semantic', similarity为相似度; 不含原页面的model/elapsed)
         """
+        semantic_cache = self._semantic_cache
+        embedding = None
+        if semantic_cache is not None:
+            embedding = self._embed(f"{title} {content[:1024]}")
+            if embedding is not None:
+                hit = semantic_cache.lookup(embedding)
+                if hit is not None:
+                    similarity, cached = hit
+                    return {
+                        **cached,
+                        'url': url,
+                        'title': title,
+                        'cached': 'semantic',
+                        'similarity': similarity
+                    }
+        
         prompt = self.prompt_builder.build_content_analysis_prompt(
             title, url, content
         )
         
         response = self._call_ollama(
             model=self.ollama_config.large_model,
-            system_prompt=prompt['system'],
-            user_prompt=prompt['user'],
+            messages=prompt,
             temperature=0.2,
             max_tokens=1024
         )
@@ -408,6 +623,11 @@ class AIAnalyzer:
             result['title'] = title
             result['model'] = self.ollama_config.large_model
             result['elapsed'] = response.elapsed
+            if embedding is not None:
+                semantic_cache.add(embedding, {
+                    k: v for k, v in result.items() 
+                    if k not in _SEMANTIC_UNCACHED_KEYS
+                })
             return result
         
         # 降级处理 - 返回基本信息
@@ -459,8 +679,7 @@ class AIAnalyzer:
         
         response = self._call_ollama(
             model=self.ollama_config.large_model,
-            system_prompt=prompt['system'],
-            user_prompt=prompt['user'],
+            messages=prompt,
             temperature=0.2,
             max_tokens=512
         )
@@ -495,8 +714,7 @@ class AIAnalyzer:
         
         response = self._call_ollama(
             model=self.ollama_config.large_model,
-            system_prompt=prompt['system'],
-            user_prompt=prompt['user'],
+            messages=prompt,
             temperature=0.3,
             max_tokens=2048
         )
@@ -534,8 +752,7 @@ class AIAnalyzer:
         
         response = self._call_ollama(
             model=self.ollama_config.small_model,
-            system_prompt=prompt['system'],
-            user_prompt=prompt['user'],
+            messages=prompt,
             temperature=0.1,
             max_tokens=50
         )
@@ -553,12 +770,40 @@ class AIAnalyzer:
     def clear_cache(self):
         """清除响应缓存"""
         self._cache.clear()
+        if self._semantic_cache is not None:
+            self._semantic_cache.clear()
+        with self._classify_lock:
+            self._classify_cache.clear()
+            for index in self._simhash_bands:
+                index.clear()
         logger.debug("响应缓存已清除")
     
+    def close(self):
+        """关闭响应缓存的磁盘存储"""
+        self._cache.close()
+    
     def get_stats(self) -> Dict:
         """获取统计信息"""
+        with self._classify_lock:
+            hits = self._classify_hits + self._classify_near_hits
+            lookups = hits + self._classify_misses
+            classify_stats = {
+                'classify_cache_size': len(self._classify_cache),
+                'classify_cache_hits': self._classify_hits,
+                'classify_cache_near_hits': self._classify_near_hits,
+                'classify_cache_misses': self._classify_misses,
+                'classify_cache_hit_rate': hits / lookups if lookups else 0.0
+            }
+        
+        semantic_stats = (
+            self._semantic_cache.get_stats() 
+            if self._semantic_cache is not None else {}
+        )
+        
         return {
-            'cache_size': len(self._cache),
+            **self._cache.get_stats(),
+            **semantic_stats,
+            **classify_stats,
             'small_model': self.ollama_config.small_model,
             'large_model': self.ollama_config.large_model
         }
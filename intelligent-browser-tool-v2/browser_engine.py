@@ -16,12 +16,18 @@
 参考: CleanRL单文件自包含设计, Selenium最佳实践2024
 """
 
+import re
 import time
+import queue
 import random
-from typing import Optional, Dict, List, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Dict, List, Tuple
 from urllib.parse import urlparse, urljoin
 import hashlib
 
+import requests
+from requests.adapters import HTTPAdapter
 from loguru import logger
 
 # 核心Selenium导入
@@ -81,6 +87,22 @@ USER_AGENTS = [
 ]
 
 
+# ============ 静态页面快速获取 ============
+
+# 需要JavaScript渲染的页面特征 (单页应用挂载点、框架数据、提示启用JS)
+_JS_APP_MARKERS = re.compile(
+    rb'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>'
+    rb'|__NEXT_DATA__|window\.__NUXT__|ng-version=|data-reactroot'
+    rb'|enable javascript|javascript is required',
+    re.IGNORECASE
+)
+
+# HTML中声明的字符集
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+_TITLE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+
 class BrowserEngine:
     """
     浏览器引擎 - 负责获取动态渲染的网页内容
@@ -573,6 +595,16 @@ class BrowserEngine:
         except Exception as e:
             logger.warning(f"设置cookies失败: {e}")
     
+    def is_alive(self) -> bool:
+        """浏览器驱动是否仍可用 (驱动崩溃或窗口被关闭时返回False)"""
+        if not self.driver:
+            return False
+        try:
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
+    
     def close(self):
         """关闭浏览器"""
         if self.driver:
@@ -598,6 +630,228 @@ class BrowserEngine:
         self.close()
 
 
+class StaticFetcher:
+    """
+    静态页面快速获取 - 基于requests.Session, 不启动浏览器
+    
+    连接池复用HTTP长连接 (keep-alive), 同一站点的后续请求无需重新握手和DNS解析;
+    只接受不依赖JavaScript渲染的HTML页面, 其他情况返回None, 由调用方回退到Selenium
+    
+    使用示例:
+        fetcher = StaticFetcher(config, pool_size=4)
+        result = fetcher.fetch_page(url) or browser.fetch_page(url)
+    """
+    
+    def __init__(self, config: Config, pool_size: int = 4):
+        """
+        初始化静态获取器
+        
+        Args:
+            config: 全局配置对象
+            pool_size: 连接池大小, 一般取工作线程数
+        """
+        self.config = config
+        self.max_bytes = config.crawl.static_fetch_max_bytes
+        self.timeout = config.selenium.page_load_timeout
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, 
+            pool_maxsize=pool_size * 4
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': random.choice(USER_AGENTS),
+            'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9,zh-CN;q=0.8'
+        })
+    
+    def fetch_page(self, url: str) -> Optional[Dict]:
+        """
+        获取静态HTML页面
+        
+        Args:
+            url: 目标URL
+            
+        Returns:
+            与BrowserEngine.fetch_page相同格式的字典;
+            非HTML、过大、需要JS渲染或请求失败时返回None
+        """
+        try:
+            start_time = time.time()
+            
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                if response.status_code != 200:
+                    return None
+                
+                content_type = response.headers.get('Content-Type', '')
+                if 'html' not in content_type.lower():
+                    return None
+                
+                length = response.headers.get('Content-Length')
+                if length and length.isdigit() and int(length) > self.max_bytes:
+                    return None
+                
+                # 边读边检查大小, 超过上限立即放弃
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=65536):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        return None
+                
+                body = b''.join(chunks)
+                final_url = response.url
+            
+            if _JS_APP_MARKERS.search(body):
+                logger.debug(f"页面需要JavaScript渲染: {url}")
+                return None
+            
+            # 优先使用响应头声明的字符集, 其次是HTML中的声明
+            if 'charset=' in content_type.lower():
+                charset = requests.utils.get_encoding_from_headers(response.headers)
+            else:
+                match = _META_CHARSET.search(body[:4096])
+                charset = match.group(1).decode('ascii') if match else 'utf-8'
+            try:
+                html = body.decode(charset, errors='replace')
+            except LookupError:
+                html = body.decode('utf-8', errors='replace')
+            
+            title_match = _TITLE.search(html)
+            title = ' '.join(title_match.group(1).split()) if title_match else ''
+            
+            elapsed = time.time() - start_time
+            
+            logger.success(
+                f"页面获取成功 (静态) - {title[:50]}... "
+                f"({len(html):,} bytes, {elapsed:.2f}s)"
+            )
+            
+            return {
+                'url': url,
+                'final_url': final_url,
+                'title': title,
+                'html': html,
+                'html_length': len(html),
+                'fetch_time': elapsed,
+                'success': True,
+                'content_hash': hashlib.md5(html.encode()).hexdigest()[:16],
+                'fetcher': 'static'
+            }
+            
+        except requests.RequestException as e:
+            logger.debug(f"静态获取失败, 回退到浏览器: {url} - {e}")
+            return None
+    
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+
+class BrowserPool:
+    """
+    浏览器实例池 - 多个工作线程共享
+    
+    按需创建浏览器, 最多 size 个; 池中无空闲实例且已达上限时, borrow() 阻塞等待归还.
+    使用中抛出异常或归还时健康检查失败的浏览器会被关闭, 空出的名额由下一个借用者重新创建
+    
+    使用示例:
+        pool = BrowserPool(config, size=4)
+        with pool.borrow() as browser:
+            result = browser.fetch_page(url)
+        pool.close()
+    """
+    
+    def __init__(self, config: Config, size: int = 4):
+        """
+        初始化浏览器池
+        
+        Args:
+            config: 全局配置对象
+            size: 浏览器实例上限
+        """
+        self.config = config
+        self.size = max(1, size)
+        self._idle: queue.Queue = queue.Queue()
+        self._browsers: List[BrowserEngine] = []
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> BrowserEngine:
+        """取出一个空闲浏览器, 必要时创建新实例"""
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                browser = self._create_or_wait()
+            # 空闲队列中的None表示有浏览器被丢弃, 名额已空出, 重新尝试创建
+            if browser is not None:
+                return browser
+    
+    def _create_or_wait(self) -> Optional[BrowserEngine]:
+        """未达上限时创建新浏览器, 否则阻塞等待归还 (可能取到None, 见discard)"""
+        with self._lock:
+            create = len(self._browsers) < self.size
+            if create:
+                # 先占位, 创建浏览器较慢, 不在锁内进行
+                self._browsers.append(None)
+        
+        if not create:
+            return self._idle.get()
+        
+        try:
+            browser = BrowserEngine(self.config)
+        except Exception:
+            with self._lock:
+                self._browsers.remove(None)
+            raise
+        with self._lock:
+            self._browsers[self._browsers.index(None)] = browser
+        return browser
+    
+    def release(self, browser: BrowserEngine):
+        """归还浏览器 (驱动已不可用时改为丢弃)"""
+        if not browser.is_alive():
+            logger.warning("浏览器驱动已不可用, 关闭并重新创建")
+            self.discard(browser)
+            return
+        self._idle.put(browser)
+    
+    def discard(self, browser: BrowserEngine):
+        """关闭浏览器并释放其名额, 唤醒一个等待中的借用者去创建新实例"""
+        with self._lock:
+            if browser in self._browsers:
+                self._browsers.remove(browser)
+        browser.close()
+        self._idle.put(None)
+    
+    @contextmanager
+    def borrow(self) -> Iterator[BrowserEngine]:
+        """借用浏览器的上下文管理器, 退出时自动归还; 使用中抛出异常时丢弃该浏览器"""
+        browser = self.acquire()
+        try:
+            yield browser
+        except BaseException:
+            self.discard(browser)
+            raise
+        self.release(browser)
+    
+    def close(self):
+        """关闭池中所有浏览器"""
+        with self._lock:
+            browsers = [b for b in self._browsers if b is not None]
+            self._browsers.clear()
+        for browser in browsers:
+            browser.close()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+
 # ============ 辅助函数 ============
 
 def normalize_url(url: str, base_url: str = None) -> str:
@@ -614,8 +868,10 @@ def normalize_url(url: str, base_url: str = None) -> str:
     if base_url and not url.startswith(('http://', 'https://')):
         url = urljoin(base_url, url)
     
-    # 移除锚点
-    url = url.split('#')[0]
+    # 移除锚点 (多数URL没有锚点, 用find代替split, 不构造列表)
+    hash_pos = url.find('#')
+    if hash_pos >= 0:
+        url = url[:hash_pos]
     
     # 移除尾部斜杠
     url = url.rstrip('/')
@@ -26,6 +26,12 @@ class OllamaConfig:
     temperature: float = 0.1           # 低温度保证稳定性
     max_tokens: int = 2048
     timeout: int = 60
+    
+    # 内容分析缓存策略: "exact" 只按请求精确匹配; "semantic-similarity" 另外用
+    # 嵌入模型计算 标题+正文开头 的向量, 余弦相似度超过阈值时复用已有分析结果
+    analysis_cache_strategy: str = "exact"
+    embedding_model: str = "nomic-embed-text"
+    semantic_cache_threshold: float = 0.92
 
 
 @dataclass
@@ -73,6 +79,17 @@ class CrawlConfig:
     request_delay: float = 1.5
     max_retries: int = 3
     retry_delay: float = 2.0
+    max_workers: int = 4  # 并发爬取线程数 (浏览器池最多同样数量的浏览器)
+    analysis_workers: int = 2  # 并发分析线程数 (分类/分析/推荐的模型调用)
+    
+    # URL队列持久化目录 (需要rocksdict), 设置后已访问集合与待爬URL保存在RocksDB,
+    # 中断后用同一目录重新运行即可续爬
+    frontier_path: Optional[str] = None
+    
+    # 静态页面快速获取: 先用HTTP长连接直接请求, 只有非HTML、过大或
+    # 需要JavaScript渲染的页面才交给Selenium
+    static_fetch: bool = True
+    static_fetch_max_bytes: int = 2 * 1024 * 1024
     
     # URL过滤
     allowed_domains: List[str] = field(default_factory=list)
@@ -105,6 +122,27 @@ class StorageConfig:
     enable_cache: bool = True
     cache_dir: str = ".cache"
     cache_ttl: int = 3600  # 秒
+    
+    # LLM响应缓存: 磁盘层 (需要diskcache) 位于 cache_dir/llm_cache_dir,
+    # 只有温度不超过 llm_cache_max_temperature 的确定性调用写入磁盘
+    llm_cache_dir: str = "llm"
+    llm_cache_ttl: int = 7 * 24 * 3600  # 秒
+    llm_cache_max_temperature: float = 0.1
+    
+    # 索引压缩节流: 变更即时追加到 index.jsonl,
+    # 超过间隔或累计足够多的变更才重写 index.json
+    index_flush_interval: float = 30.0  # 秒
+    index_flush_batch: int = 200        # 条
+    
+    # 原始HTML压缩 (需要zstandard): 先保存若干页面作为样本训练字典,
+    # 之后用字典压缩, 同站点页面共享的导航/脚本等模板几乎不占空间
+    raw_compression: bool = True
+    zstd_level: int = 3
+    zstd_dict_samples: int = 128  # 训练字典所需的页面数
+    
+    # 后台写入线程: 页面文件写入与爬取重叠, 队列满时保存方法阻塞
+    background_writes: bool = True
+    write_queue_size: int = 1000
 
 
 @dataclass
@@ -143,8 +181,12 @@ class Config:
         """验证配置参数"""
         assert self.ollama.temperature >= 0 and self.ollama.temperature <= 2, \
             "温度应在 0-2 之间"
+        assert self.ollama.analysis_cache_strategy in ["exact", "semantic-similarity"], \
+            f"不支持的分析缓存策略: {self.ollama.analysis_cache_strategy}"
         assert self.crawl.max_pages > 0, "最大页面数必须大于0"
         assert self.crawl.max_depth > 0, "最大深度必须大于0"
+        assert self.crawl.max_workers > 0, "并发线程数必须大于0"
+        assert self.crawl.analysis_workers > 0, "分析线程数必须大于0"
         assert self.selenium.browser_type in ["chrome", "firefox", "edge"], \
             f"不支持的浏览器类型: {self.selenium.browser_type}"
     
@@ -11,20 +11,112 @@
 """
 
 from typing import Dict, List, Optional, Any, Tuple
-from urllib.parse import urljoin, urlparse
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin, urlparse, urlsplit, SplitResult
 import hashlib
 import json
+import os
 import re
 
 import trafilatura
+from trafilatura.deduplication import content_fingerprint
 from trafilatura.settings import use_config
 from loguru import logger
 from lxml import html as lxml_html
+from lxml import etree
 from lxml.etree import _Element
 
 from config import Config, TrafilaturaConfig
 
 
+# ============ 可选依赖检测 ============
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+try:
+    from selectolax.parser import HTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+
+# ============ 链接分类规则 ============
+
+# 按顺序匹配, 命中多个类别时取靠前的类别
+LINK_CATEGORY_PATTERNS: Dict[str, List[str]] = {
+    'admission': ['/admission', '/apply', '/application', '/enroll'],
+    'academic': ['/program', '/course', '/academic', '/degree', '/major'],
+    'research': ['/research', '/publication', '/paper', '/lab'],
+    'faculty': ['/faculty', '/people', '/staff', '/professor'],
+    'international': ['/international', '/global', '/abroad'],
+    'financial': ['/financial', '/tuition', '/scholarship', '/aid'],
+    'news': ['/news', '/blog', '/article', '/press'],
+    'event': ['/event', '/conference', '/seminar'],
+    'about': ['/about', '/history', '/mission']
+}
+
+LINK_CATEGORIES: List[str] = list(LINK_CATEGORY_PATTERNS)
+
+# 无需解析即可判定为无效的链接前缀
+NON_HTTP_PREFIXES: Tuple[str, ...] = ('javascript:', 'mailto:', 'tel:', 'data:')
+
+# 可直接JSON序列化的基本类型
+_PRIMITIVE = (str, int, float, bool, type(None))
+
+# 预编译的锚点XPath
+_ANCHOR_HREF_XPATH = etree.XPath('//a[@href]/@href', smart_strings=False)
+
+# 一次XSLT转换输出所有锚点的 normalize-space() 文本, 每个一行;
+# 归一化后的文本不含换行, 换行可以安全地作为分隔符 (libxml2只支持XPath 1.0,
+# 无法用单个XPath表达式返回每个节点的字符串)
+_ANCHOR_TEXTS_XSLT = etree.XSLT(etree.XML(
+    '<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">'
+    '<xsl:output method="text" encoding="UTF-8"/>'
+    '<xsl:template match="/">'
+    '<xsl:for-each select="//a[@href]">'
+    '<xsl:value-of select="normalize-space(.)"/><xsl:text>&#10;</xsl:text>'
+    '</xsl:for-each>'
+    '</xsl:template>'
+    '</xsl:stylesheet>'
+))
+
+# 与XPath normalize-space() 相同的空白字符集
+_XML_WS = re.compile(r'[ \t\r\n]+')
+
+# 任意空白
+_WS = re.compile(r'\s+')
+
+# 词数统计的分段大小 (字符)
+_WORD_COUNT_WINDOW = 1 << 16
+
+
+def _word_count(text: str) -> int:
+    """
+    统计词数, 结果与 len(text.split()) 相同
+    
+    按固定窗口分段split, 每段在空白处切开,
+    避免为长文本一次性生成包含所有词的列表
+    """
+    text_length = len(text)
+    if text_length <= _WORD_COUNT_WINDOW:
+        return len(text.split())
+    
+    count = 0
+    start = 0
+    while start < text_length:
+        end = start + _WORD_COUNT_WINDOW
+        if end < text_length:
+            match = _WS.search(text, end)
+            end = match.start() if match else text_length
+        count += len(text[start:end].split())
+        start = end
+    return count
+
+
 class ContentProcessor:
     """
     内容处理器 - 负责从HTML中提取结构化内容
@@ -50,6 +142,7 @@ class ContentProcessor:
         self.config = config
         self.traf_config = config.trafilatura
         self._init_trafilatura_config()
+        self._build_automata()
         
         logger.info("内容处理器初始化完成")
     
@@ -62,6 +155,63 @@ class ContentProcessor:
         newconfig.set("DEFAULT", "MIN_OUTPUT_SIZE", 
                      str(self.traf_config.min_text_length))
         self.trafilatura_config = newconfig
+        
+        # 每页调用参数固定, 初始化时一次构建
+        tc = self.traf_config
+        self._extract_kwargs = dict(
+            include_comments=tc.extract_comments,
+            include_tables=tc.include_tables,
+            include_images=tc.include_images,
+            include_links=tc.include_links,
+            config=self.trafilatura_config,
+            with_metadata=True,
+            favor_recall=tc.favor_recall,
+            favor_precision=tc.favor_precision
+        )
+    
+    def _build_automata(self):
+        """
+        将排除/分类/优先模式编译为Aho-Corasick自动机
+        
+        每个URL只需一次线性扫描即可得到全部命中,
+        未安装pyahocorasick时, 排除模式回退到预编译的正则交替式,
+        分类/优先模式回退到逐个子串匹配
+        """
+        self._exclude_ac = None
+        self._exclude_re = None
+        self._classify_ac = None
+        self._priority_ac = None
+        
+        if not HAS_AHOCORASICK:
+            patterns = [p for p in self.config.crawl.exclude_patterns if p]
+            if patterns:
+                self._exclude_re = re.compile('|'.join(map(re.escape, patterns)))
+            return
+        
+        self._exclude_ac = ahocorasick.Automaton()
+        for pattern in self.config.crawl.exclude_patterns:
+            self._exclude_ac.add_word(pattern, pattern)
+        
+        # 值为类别序号, 同一关键词出现在多个类别时保留靠前的类别
+        self._classify_ac = ahocorasick.Automaton()
+        for cat_id, keywords in enumerate(LINK_CATEGORY_PATTERNS.values()):
+            for kw in keywords:
+                if not self._classify_ac.exists(kw):
+                    self._classify_ac.add_word(kw, cat_id)
+        
+        self._priority_ac = ahocorasick.Automaton()
+        for pattern in self.config.crawl.priority_patterns:
+            self._priority_ac.add_word(pattern, pattern)
+        
+        for automaton in (self._exclude_ac, self._classify_ac, self._priority_ac):
+            if len(automaton):
+                automaton.make_automaton()
+    
+    def _ac_contains(self, automaton, text: str) -> bool:
+        """自动机中是否有任一模式出现在text中"""
+        if not len(automaton):
+            return False
+        return next(automaton.iter(text), None) is not None
     
     def extract_content(
         self, 
@@ -82,29 +232,61 @@ class ContentProcessor:
             logger.warning("HTML内容为空")
             return None
         
+        return self._extract(html_content, url)
+    
+    def extract_content_batch(
+        self, 
+        pages: List[Tuple[str, Optional[str]]],
+        workers: Optional[int] = None
+    ) -> List[Optional[Dict]]:
+        """
+        多进程批量提取内容
+        
+        lxml解析之外的链接处理和字典构建受GIL限制,
+        使用进程池使批量提取随CPU核数扩展
+        
+        Args:
+            pages: (html_content, url) 列表
+            workers: 进程数, 默认为CPU核数
+            
+        Returns:
+            与pages顺序一致的提取结果列表
+        """
+        if not pages:
+            return []
+        
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(pages) == 1:
+            return [self.extract_content(html, url) for html, url in pages]
+        
+        # 每个工作进程只初始化一次自己的处理器
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.config,)
+        ) as executor:
+            return list(executor.map(_extract_in_worker, pages, chunksize=8))
+    
+    def _extract(
+        self, 
+        html_content: str, 
+        url: Optional[str]
+    ) -> Optional[Dict]:
+        """执行实际的提取流程"""
         try:
             # ========== 使用Trafilatura提取内容 ==========
-            extracted_json = trafilatura.extract(
-                html_content,
-                output_format='json',
-                include_comments=self.traf_config.extract_comments,
-                include_tables=self.traf_config.include_tables,
-                include_images=self.traf_config.include_images,
-                include_links=self.traf_config.include_links,
-                url=url,
-                config=self.trafilatura_config,
-                with_metadata=True,
-                favor_recall=self.traf_config.favor_recall,
-                favor_precision=self.traf_config.favor_precision
+            # 直接获取文档对象, 省去JSON序列化再解析的往返
+            document = trafilatura.bare_extraction(
+                html_content, url=url, **self._extract_kwargs
             )
             
-            if not extracted_json:
+            if not document:
                 logger.warning(f"Trafilatura提取失败: {url}")
                 # 尝试使用baseline方法
                 return self._fallback_extraction(html_content, url)
             
             # ========== 解析结果 ==========
-            result = json.loads(extracted_json)
+            result = self._document_to_dict(document)
             
             if 'text' not in result or not result['text']:
                 logger.warning(f"未提取到文本内容: {url}")
@@ -127,12 +309,14 @@ class ContentProcessor:
             result['text_preview'] = self._generate_preview(text)
             
             # ========== 添加统计信息 ==========
+            # 文本只编码一次, 供哈希等字节级处理复用
+            text_bytes = text.encode('utf-8')
             result['stats'] = {
                 'text_length': len(text),
-                'word_count': len(text.split()),
+                'word_count': _word_count(text),
                 'num_links': len(links),
                 'num_chunks': len(result.get('chunks', [])),
-                'content_hash': self._hash_content(text),
+                'content_hash': self._hash_content(text_bytes),
                 'internal_links': len([l for l in links if l.get('is_internal')]),
                 'external_links': len([l for l in links if not l.get('is_internal')])
             }
@@ -151,6 +335,34 @@ class ContentProcessor:
             logger.error(f"内容提取时发生错误: {e}")
             return self._fallback_extraction(html_content, url)
     
+    def _document_to_dict(self, document: Any) -> Dict:
+        """
+        将bare_extraction结果转换为与JSON输出相同结构的字典
+        
+        trafilatura 1.x 返回dict, 2.x 返回Document对象
+        """
+        result = document if isinstance(document, dict) else document.as_dict()
+        
+        # bare_extraction不计算指纹, 按trafilatura.extract的方式补上 (标题 + 原始文本)
+        if result.get('fingerprint') is None and result.get('raw_text') is not None:
+            result['fingerprint'] = content_fingerprint(
+                f"{result.get('title')} {result['raw_text']}"
+            )
+        
+        # 与 output_format='json' 保持一致的字段名和格式
+        result['source'] = result.pop('url', None)
+        result['source-hostname'] = result.pop('sitename', None)
+        result['excerpt'] = result.pop('description', None)
+        result['categories'] = ';'.join(result.get('categories') or [])
+        result['tags'] = ';'.join(result.get('tags') or [])
+        result['comments'] = result.get('comments') or ''
+        
+        # 去掉lxml树, 避免后续序列化时再转换
+        result.pop('body', None)
+        result.pop('commentsbody', None)
+        
+        return result
+    
     def _fallback_extraction(
         self, 
         html_content: str, 
@@ -211,17 +423,22 @@ class ContentProcessor:
         Returns:
             链接列表
         """
-        links = []
+        # 按列存储中间结果, 只为去重后的链接构造字典
+        urls: List[str] = []
+        urls_lower: List[str] = []
+        texts: List[str] = []
+        internal_flags: List[bool] = []
+        seen = set()
         
         try:
-            tree = lxml_html.fromstring(html_content)
             base_domain = urlparse(base_url).netloc if base_url else ""
+            base_suffix = '.' + base_domain
+            # 同一页面的链接域名高度重复, 按域名缓存内外部判定
+            internal_by_domain: Dict[str, Any] = {}
             
-            for element in tree.xpath('//a[@href]'):
-                href = element.get('href')
-                text = element.text_content().strip()
-                
-                if not href:
+            for href, text in self._iter_anchors(html_content):
+                # 片段、纯查询和非HTTP协议的href在拼接前直接排除
+                if not href or href[0] in '#?' or href.startswith(NON_HTTP_PREFIXES):
                     continue
                 
                 # 解析相对URL
@@ -230,37 +447,107 @@ class ContentProcessor:
                 else:
                     full_url = href
                 
-                # 验证和分类链接
-                if self._is_valid_link(full_url):
-                    link_domain = urlparse(full_url).netloc
+                # 验证链接 (每个URL只解析一次), 重复链接保留首次出现
+                try:
+                    split = urlsplit(full_url)
+                except ValueError:
+                    continue
+                url_lower = full_url.lower()
+                if not self._is_valid_link(full_url, split, url_lower):
+                    continue
+                
+                dedup_key = self._dedup_key(full_url)
+                if dedup_key in seen:
+                    continue
+                seen.add(dedup_key)
+                
+                link_domain = split.netloc
+                is_internal = internal_by_domain.get(link_domain)
+                if is_internal is None:
                     is_internal = base_domain and (
                         link_domain == base_domain or
-                        link_domain.endswith('.' + base_domain) or
+                        link_domain.endswith(base_suffix) or
                         base_domain.endswith('.' + link_domain)
                     )
-                    
-                    links.append({
-                        'url': full_url,
-                        'text': text[:200] if text else "",
-                        'type': self._classify_link(full_url),
-                        'is_internal': is_internal,
-                        'priority': self._get_link_priority(full_url, text)
-                    })
-            
-            # 去重并按优先级排序
-            unique_links = self._deduplicate_links(links)
-            unique_links.sort(key=lambda x: x['priority'], reverse=True)
+                    internal_by_domain[link_domain] = is_internal
+                
+                urls.append(full_url)
+                urls_lower.append(url_lower)
+                texts.append(text)
+                internal_flags.append(is_internal)
+            
+            # 按优先级稳定排序(降序)
+            priorities = [
+                self._get_link_priority(u, t, url_lower=ul)
+                for u, ul, t in zip(urls, urls_lower, texts)
+            ]
+            order = sorted(
+                range(len(urls)), key=priorities.__getitem__, reverse=True
+            )
             
-            return unique_links
+            return [
+                {
+                    'url': urls[i],
+                    'text': texts[i][:200] if texts[i] else "",
+                    'type': self._classify_link(urls[i], url_lower=urls_lower[i]),
+                    'is_internal': internal_flags[i],
+                    'priority': priorities[i]
+                }
+                for i in order
+            ]
             
         except Exception as e:
             logger.warning(f"链接提取失败: {e}")
             return []
     
-    def _is_valid_link(self, url: str) -> bool:
-        """检查链接是否有效"""
+    def _iter_anchors(self, html_content: str) -> List[Tuple[str, str]]:
+        """
+        枚举所有 <a href> 的 (href, 归一化文本)
+        
+        只需标签和属性, 安装了selectolax时使用更快的lexbor解析器,
+        否则由lxml的预编译XPath取href、一次XSLT转换取全部锚点文本
+        """
+        if HAS_SELECTOLAX:
+            tree = HTMLParser(html_content)
+            return [
+                (
+                    node.attributes.get('href') or '',
+                    _XML_WS.sub(' ', node.text()).strip(' \t\r\n')
+                )
+                for node in tree.css('a[href]')
+            ]
+        
+        tree = lxml_html.fromstring(html_content)
+        hrefs = _ANCHOR_HREF_XPATH(tree)
+        anchor_texts = str(_ANCHOR_TEXTS_XSLT(tree)).split('\n')
+        return list(zip(hrefs, anchor_texts))
+    
+    @staticmethod
+    def _is_http_candidate(url: str) -> bool:
+        """最廉价的前缀检查, 多数无效链接无需解析即可排除"""
+        if not url or url[0] in '#?' or url.startswith(NON_HTTP_PREFIXES):
+            return False
+        return '://' in url[:8]
+    
+    def _is_valid_link(
+        self, 
+        url: str, 
+        split: Optional[SplitResult] = None,
+        url_lower: Optional[str] = None
+    ) -> bool:
+        """
+        检查链接是否有效
+        
+        Args:
+            url: 链接URL
+            split: 已解析的urlsplit结果（可选, 避免重复解析; 调用方已做过前缀检查）
+            url_lower: 已转小写的URL（可选）
+        """
+        if split is None and not self._is_http_candidate(url):
+            return False
+        
         try:
-            parsed = urlparse(url)
+            parsed = split if split is not None else urlsplit(url)
             
             if not parsed.scheme or not parsed.netloc:
                 return False
@@ -269,39 +556,43 @@ class ContentProcessor:
                 return False
             
             # 检查排除模式
-            url_lower = url.lower()
-            for pattern in self.config.crawl.exclude_patterns:
-                if pattern in url_lower:
-                    return False
+            if url_lower is None:
+                url_lower = url.lower()
+            if self._exclude_ac is not None:
+                return not self._ac_contains(self._exclude_ac, url_lower)
+            if self._exclude_re is not None:
+                return self._exclude_re.search(url_lower) is None
             
             return True
             
         except:
             return False
     
-    def _classify_link(self, url: str) -> str:
+    def _classify_link(self, url: str, url_lower: Optional[str] = None) -> str:
         """链接分类"""
-        url_lower = url.lower()
-        
-        patterns = {
-            'admission': ['/admission', '/apply', '/application', '/enroll'],
-            'academic': ['/program', '/course', '/academic', '/degree', '/major'],
-            'research': ['/research', '/publication', '/paper', '/lab'],
-            'faculty': ['/faculty', '/people', '/staff', '/professor'],
-            'international': ['/international', '/global', '/abroad'],
-            'financial': ['/financial', '/tuition', '/scholarship', '/aid'],
-            'news': ['/news', '/blog', '/article', '/press'],
-            'event': ['/event', '/conference', '/seminar'],
-            'about': ['/about', '/history', '/mission']
-        }
-        
-        for category, keywords in patterns.items():
+        if url_lower is None:
+            url_lower = url.lower()
+        
+        if self._classify_ac is not None:
+            # 一次扫描得到所有命中, 取序号最小(最靠前)的类别
+            cat_id = min(
+                (cid for _, cid in self._classify_ac.iter(url_lower)),
+                default=None
+            )
+            return LINK_CATEGORIES[cat_id] if cat_id is not None else 'general'
+        
+        for category, keywords in LINK_CATEGORY_PATTERNS.items():
             if any(kw in url_lower for kw in keywords):
                 return category
         
         return 'general'
     
-    def _get_link_priority(self, url: str, text: str) -> int:
+    def _get_link_priority(
+        self, 
+        url: str, 
+        text: str, 
+        url_lower: Optional[str] = None
+    ) -> int:
         """
         计算链接优先级
         
@@ -310,13 +601,18 @@ class ContentProcessor:
         低优先级: 其他链接
         """
         priority = 0
-        url_lower = url.lower()
+        if url_lower is None:
+            url_lower = url.lower()
         
         # 检查优先模式
-        for pattern in self.config.crawl.priority_patterns:
-            if pattern in url_lower:
+        if self._priority_ac is not None:
+            if self._ac_contains(self._priority_ac, url_lower):
                 priority += 10
-                break
+        else:
+            for pattern in self.config.crawl.priority_patterns:
+                if pattern in url_lower:
+                    priority += 10
+                    break
         
         # 有意义的链接文本
         if text and len(text) > 10:
@@ -331,14 +627,18 @@ class ContentProcessor:
         
         return priority
     
+    @staticmethod
+    def _dedup_key(url: str) -> str:
+        """规范化URL用于去重"""
+        return url.rstrip('/').split('?')[0].split('#')[0]
+    
     def _deduplicate_links(self, links: List[Dict]) -> List[Dict]:
         """链接去重"""
         seen = set()
         unique = []
         
         for link in links:
-            # 规范化URL用于去重
-            url = link['url'].rstrip('/').split('?')[0].split('#')[0]
+            url = self._dedup_key(link['url'])
             
             if url not in seen:
                 seen.add(url)
@@ -411,8 +711,13 @@ class ContentProcessor:
         if not text:
             return ""
         
-        # 清理文本
-        text = re.sub(r'\s+', ' ', text).strip()
+        # 只归一化开头部分, 预留4倍长度以抵消空白折叠
+        head_length = max_length * 4
+        text_head = _WS.sub(' ', text[:head_length]).strip()
+        if len(text_head) <= max_length and len(text) > head_length:
+            # 空白过多导致素材不足, 退回全文归一化
+            text_head = _WS.sub(' ', text).strip()
+        text = text_head
         
         if len(text) <= max_length:
             return text
@@ -428,19 +733,27 @@ class ContentProcessor:
         
         return preview
     
-    def _hash_content(self, text: str) -> str:
-        """生成内容哈希值"""
-        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+    def _hash_content(self, text_bytes: bytes) -> str:
+        """生成内容哈希值 (输入为UTF-8编码后的文本)"""
+        return hashlib.sha256(text_bytes).hexdigest()[:16]
     
     def _make_json_serializable(self, obj: Any) -> Any:
         """确保对象可JSON序列化"""
-        if isinstance(obj, _Element):
-            from lxml import etree
+        # 绝大多数节点是基本类型, 直接返回不再递归
+        if isinstance(obj, _PRIMITIVE):
+            return obj
+        elif isinstance(obj, _Element):
             return etree.tostring(obj, encoding='unicode', method='text')
         elif isinstance(obj, dict):
-            return {k: self._make_json_serializable(v) for k, v in obj.items()}
+            return {
+                k: v if isinstance(v, _PRIMITIVE) else self._make_json_serializable(v)
+                for k, v in obj.items()
+            }
         elif isinstance(obj, (list, tuple)):
-            return [self._make_json_serializable(item) for item in obj]
+            return [
+                item if isinstance(item, _PRIMITIVE) else self._make_json_serializable(item)
+                for item in obj
+            ]
         elif hasattr(obj, '__dict__'):
             return str(obj)
         else:
@@ -481,6 +794,23 @@ class ContentProcessor:
         return text.strip()
 
 
+# ============ 多进程工作函数 ============
+
+_worker_processor: Optional[ContentProcessor] = None
+
+
+def _init_worker(config: Config):
+    """进程池初始化: 每个工作进程创建一个处理器实例"""
+    global _worker_processor
+    _worker_processor = ContentProcessor(config)
+
+
+def _extract_in_worker(page: Tuple[str, Optional[str]]) -> Optional[Dict]:
+    """在工作进程中提取单个页面"""
+    html_content, url = page
+    return _worker_processor.extract_content(html_content, url)
+
+
 if __name__ == "__main__":
     # 测试内容处理器
     from config import get_fast_config
@@ -10,22 +10,228 @@
 参考: Skills文件格式规范
 """
 
+import os
+import sys
+import re
 import json
 import hashlib
 import shutil
-from typing import Dict, List, Optional, Any
+import time
+import atexit
+import queue
+import threading
+from functools import lru_cache, wraps
+from typing import Dict, List, Optional, Any, Set, Tuple, Iterable, Iterator
+from collections import OrderedDict, Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 
 from loguru import logger
 
 from config import Config
 
 
-@dataclass
+# 读缓存容量 (文件数), 以及可缓存的原始HTML大小上限
+READ_CACHE_SIZE = 256
+RAW_CACHE_MAX_CHARS = 64 * 1024
+
+# 批量读取文件的线程数
+BULK_READ_WORKERS = 8
+
+# 时间戳缓存时长 (秒), 同一批保存共用一个时间戳
+TIMESTAMP_RESOLUTION = 0.1
+
+# 超过该大小的文件交给缓冲文件对象分块写入
+DIRECT_WRITE_MAX_BYTES = 1024 * 1024
+
+# zstd压缩字典大小, 以及每个训练样本截取的最大字节数
+ZSTD_DICT_SIZE = 100_000
+ZSTD_SAMPLE_MAX_BYTES = 128 * 1024
+
+# 原始HTML压缩方式, 记录在 PageRecord.metadata['compression'], 无此字段即未压缩
+RAW_COMPRESSION_ZSTD = 'zstd-v1'
+RAW_COMPRESSION_ZSTD_DICT = 'zstd-dict-v1'
+
+# 文件名标题清理: 连续的非字母数字字符(含下划线)折叠为一个下划线
+_SANITIZE_RE = re.compile(r'[\W_]+')
+
+
+# ============ 可选依赖检测 ============
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import zstandard as zstd
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """序列化为带缩进的UTF-8 JSON字节, 优先使用orjson"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _json_compact(obj: Any) -> bytes:
+    """序列化为无缩进的紧凑JSON字节, 用于流水线内部读写的页面数据"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _strip_meta(obj: Dict) -> Dict:
+    """去掉已有的 _meta (如重新保存读回的数据), 由保存时重新生成"""
+    if '_meta' not in obj:
+        return obj
+    return {k: v for k, v in obj.items() if k != '_meta'}
+
+
+def _append_meta(body: bytes, meta: Dict) -> bytes:
+    """把 _meta 拼接到已序列化的紧凑JSON对象末尾, 不必重新编码整个对象"""
+    meta_bytes = _json_compact(meta)
+    if body == b'{}':
+        return b'{"_meta":' + meta_bytes + b'}'
+    return body[:-1] + b',"_meta":' + meta_bytes + b'}'
+
+
+def _json_line(obj: Any) -> bytes:
+    """序列化为单行紧凑JSON (以换行结尾), 用于追加日志"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+@lru_cache(maxsize=4096)
+def _url_hash(url: str) -> str:
+    """
+    URL短哈希, 用于文件名
+    
+    保持md5前8位不变, 以便同一URL在新旧版本中得到相同文件名;
+    同一URL会在各阶段重复计算, 因此缓存结果
+    """
+    return hashlib.md5(url.encode('utf-8')).hexdigest()[:8]
+
+
+def _content_hash(data: bytes) -> str:
+    """内容哈希 (16位十六进制), blake2b比md5更快"""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _write_bytes(filepath: str, data: bytes):
+    """
+    写入已编码的字节
+    
+    小文件直接通过文件描述符os.write, 绕过TextIOWrapper的分块编码;
+    大文件使用二进制文件对象
+    """
+    if len(data) > DIRECT_WRITE_MAX_BYTES:
+        with open(filepath, 'wb') as f:
+            f.write(data)
+        return
+    
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(filepath: str, data: bytes):
+    """
+    先写入同目录的临时文件, 再os.replace原子替换
+    
+    崩溃或并发读取时只会看到旧文件或新文件, 不会读到写了一半的内容
+    """
+    _write_atomic_chunks(filepath, (data,))
+
+
+def _write_atomic_chunks(filepath: str, chunks: Iterable[bytes]):
+    """同_write_atomic, 逐块写入, 无需先在内存中拼出完整内容"""
+    tmp = f"{filepath}.tmp"
+    with open(tmp, 'wb') as f:
+        f.writelines(chunks)
+    os.replace(tmp, filepath)
+
+
+def _read_bytes(filepath: str) -> Optional[bytes]:
+    """读取文件字节, 文件不存在时返回None (不额外stat)"""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _json_loads(data: bytes) -> Any:
+    """解析JSON字节, 优先使用orjson"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _to_score(value: Any) -> float:
+    """把模型输出的相关性评分转为float (字符串、None等无法转换时为0.0)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _normalize_analysis(analysis: Dict) -> Dict:
+    """
+    规范化读回的分析结果
+    
+    - relevance_score 统一为float (旧数据中可能是字符串或缺失), 使用方直接比较数值
+    - 驻留高度重复的短字符串 (类别、事实/实体类型): 每个页面都会解析出一份新的
+      'admission'/'deadline' 等字符串, 驻留后所有页面共享同一对象,
+      减少内存占用, 比较和字典查找也更快
+    """
+    score = analysis.get('relevance_score')
+    if type(score) is not float:
+        analysis['relevance_score'] = _to_score(score)
+    
+    category = analysis.get('category')
+    if isinstance(category, str):
+        analysis['category'] = sys.intern(category)
+    
+    for field in ('facts', 'entities'):
+        items = analysis.get(field)
+        if isinstance(items, list):
+            for item in items:
+                if isinstance(item, dict):
+                    item_type = item.get('type')
+                    if isinstance(item_type, str):
+                        item['type'] = sys.intern(item_type)
+    return analysis
+
+
+def _synchronized(method):
+    """在实例的 _save_lock 下执行方法, 供多个爬取线程同时调用"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._save_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# __slots__ 数据类需要 Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class PageRecord:
-    """页面记录"""
+    """页面记录 (索引中可能有数千条, 使用__slots__减少内存)"""
     url: str
     filename: str
     category: str
@@ -35,8 +241,25 @@ class PageRecord:
     content_hash: str
     metadata: Dict = None
     
+    def __post_init__(self):
+        # 类别和状态只有少数几种取值, 驻留后所有记录共享同一字符串
+        if isinstance(self.category, str):
+            self.category = sys.intern(self.category)
+        if isinstance(self.status, str):
+            self.status = sys.intern(self.status)
+    
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # 扁平记录, 直接构造字典, 避免asdict的递归深拷贝
+        return {
+            'url': self.url,
+            'filename': self.filename,
+            'category': self.category,
+            'title': self.title,
+            'timestamp': self.timestamp,
+            'status': self.status,
+            'content_hash': self.content_hash,
+            'metadata': self.metadata
+        }
 
 
 class DataManager:
@@ -46,8 +269,10 @@ class DataManager:
     目录结构:
     output/
     ├── 01_raw/              # 原始HTML
-    │   ├── index.json       # 页面索引
-    │   └── *.html           # HTML文件
+    │   ├── index.json       # 页面索引 (压缩快照)
+    │   ├── index.jsonl      # 索引追加日志
+    │   ├── zstd.dict        # 原始HTML压缩字典
+    │   └── *.html(.zst)     # HTML文件 (安装zstandard时压缩存储)
     ├── 02_extracted/        # 提取的内容
     │   ├── index.json
     │   └── *.json           # 提取的JSON
@@ -84,16 +309,89 @@ class DataManager:
         self.analyzed_dir = self.base_dir / self.storage.analyzed_dir
         self.reports_dir = self.base_dir / self.storage.reports_dir
         
+        # 目录字符串, 热路径用os.path.join拼接文件路径, 比Path的/运算快
+        self._raw_dir_str = str(self.raw_dir)
+        self._extracted_dir_str = str(self.extracted_dir)
+        self._analyzed_dir_str = str(self.analyzed_dir)
+        
         # 索引
         self._raw_index: Dict[str, PageRecord] = {}
         self._extracted_index: Dict[str, PageRecord] = {}
         self._analyzed_index: Dict[str, PageRecord] = {}
         
+        # 阶段分派表, 只构建一次
+        self._stage_dirs: Dict[str, Path] = {
+            'raw': self.raw_dir,
+            'extracted': self.extracted_dir,
+            'analyzed': self.analyzed_dir,
+            'reports': self.reports_dir
+        }
+        self._stage_indexes: Dict[str, Dict[str, PageRecord]] = {
+            'raw': self._raw_index,
+            'extracted': self._extracted_index,
+            'analyzed': self._analyzed_index
+        }
+        
+        # 最近读写文件的LRU缓存: 路径 -> JSON字节 / 小HTML文本
+        # JSON缓存字节而非字典, 每次解析出新对象, 调用方可以安全修改
+        self._read_cache: "OrderedDict[str, Any]" = OrderedDict()
+        
+        # 分析结果的类别二级索引: 类别 -> {url: None} (保持插入顺序), 以及各类别计数
+        self._analyzed_by_cat: Dict[str, Dict[str, None]] = defaultdict(dict)
+        self._category_counts: Counter = Counter()
+        
+        # 各阶段目录中已存在的文件路径, 读取前无需stat
+        self._existing_files: Set[str] = set()
+        
+        # 时间戳缓存
+        self._ts_cached = ""
+        self._ts_cached_at = float('-inf')
+        
+        # 尚未压缩进 index.json 的变更数, 按节流策略批量压缩
+        self._dirty: Dict[str, int] = {'raw': 0, 'extracted': 0, 'analyzed': 0}
+        self._last_flush_ts = time.monotonic()
+        
+        # 后台写入: 保存方法只负责编码并更新内存索引, 文件写入和索引日志追加
+        # 由写入线程完成; 尚未落盘的文件内容暂存在 _pending 中供读取
+        self._write_q: "queue.Queue[Optional[tuple]]" = queue.Queue(
+            maxsize=self.storage.write_queue_size
+        )
+        self._writer: Optional[threading.Thread] = None
+        self._pending: Dict[str, bytes] = {}
+        self._index_lock = threading.Lock()   # 保护索引字典的修改与快照, 以及 _pending
+        self._flush_lock = threading.RLock()  # 保护变更计数与压缩
+        self._save_lock = threading.RLock()   # 串行化公开的保存/读取接口 (编码、缓存、压缩器)
+        
+        # 原始HTML的zstd压缩: 未训练字典前收集样本, 训练后改用字典压缩
+        self._zstd_dict = None
+        self._zstd_compressor = None
+        self._zstd_decompressor = None
+        self._zstd_samples: Optional[List[bytes]] = []
+        
         # 初始化
         self._setup_directories()
         self._load_indexes()
+        if HAS_ZSTD:
+            self._init_zstd()
         self._save_metadata()
         
+        # 索引追加日志: 每次保存追加一行, 无缓冲以便崩溃后可恢复
+        self._log_fh = {
+            stage: open(self._get_stage_dir(stage) / 'index.jsonl', 'ab', buffering=0)
+            for stage in self._dirty
+        }
+        # 上次未正常关闭时, 先把重放的日志压缩掉 (同时清除可能损坏的尾行)
+        self.flush()
+        
+        if self.storage.background_writes:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name='DataManagerWriter', daemon=True
+            )
+            self._writer.start()
+        
+        # 退出时压缩剩余变更
+        atexit.register(self.close)
+        
         logger.info(f"数据管理器初始化完成 - 基础目录: {self.base_dir}")
     
     def _setup_directories(self):
@@ -106,23 +404,117 @@ class DataManager:
         ]:
             dir_path.mkdir(parents=True, exist_ok=True)
     
+    def _init_zstd(self):
+        """加载已训练的压缩字典 (若有), 创建压缩器和解压器"""
+        data = _read_bytes(str(self.raw_dir / 'zstd.dict'))
+        if data:
+            self._zstd_dict = zstd.ZstdCompressionDict(data)
+            self._zstd_samples = None
+        self._make_zstd_codecs()
+    
+    def _make_zstd_codecs(self):
+        """按当前字典创建压缩器/解压器; 带字典的解压器也能解无字典的帧"""
+        if self._zstd_dict is not None:
+            self._zstd_decompressor = zstd.ZstdDecompressor(dict_data=self._zstd_dict)
+        else:
+            self._zstd_decompressor = zstd.ZstdDecompressor()
+        
+        if not self.storage.raw_compression:
+            return
+        if self._zstd_dict is not None:
+            self._zstd_compressor = zstd.ZstdCompressor(
+                level=self.storage.zstd_level, dict_data=self._zstd_dict
+            )
+        else:
+            self._zstd_compressor = zstd.ZstdCompressor(level=self.storage.zstd_level)
+    
+    def _train_zstd_dict(self):
+        """用已收集的原始HTML样本训练压缩字典并持久化 (只尝试一次)"""
+        samples, self._zstd_samples = self._zstd_samples, None
+        try:
+            zdict = zstd.train_dictionary(ZSTD_DICT_SIZE, samples)
+        except zstd.ZstdError as e:
+            logger.warning(f"训练压缩字典失败, 继续使用无字典压缩: {e}")
+            return
+        
+        _write_atomic(str(self.raw_dir / 'zstd.dict'), zdict.as_bytes())
+        self._zstd_dict = zdict
+        self._make_zstd_codecs()
+        logger.info(f"压缩字典训练完成 - 样本数: {len(samples)}")
+    
     def _load_indexes(self):
-        """加载现有索引"""
-        for stage, index in [
+        """
+        加载现有索引
+        
+        三个阶段互相独立, 使用线程并发读取和解析;
+        每个线程只写自己的局部结果, 结束后在当前线程合并, 无需加锁
+        """
+        stages = [
             ('raw', self._raw_index),
             ('extracted', self._extracted_index),
             ('analyzed', self._analyzed_index)
-        ]:
-            index_file = self._get_stage_dir(stage) / 'index.json'
-            if index_file.exists():
-                try:
-                    with open(index_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    for url, record in data.items():
-                        index[url] = PageRecord(**record)
+        ]
+        
+        with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+            futures = [
+                (stage, index, executor.submit(self._load_one_index, stage))
+                for stage, index in stages
+            ]
+            for stage, index, future in futures:
+                loaded, existing, replayed = future.result()
+                index.update(loaded)
+                self._existing_files.update(existing)
+                if replayed:
+                    self._dirty[stage] = replayed
+                if index:
                     logger.debug(f"加载 {stage} 索引: {len(index)} 条记录")
-                except Exception as e:
-                    logger.warning(f"加载索引失败 {stage}: {e}")
+        
+        for url, record in self._analyzed_index.items():
+            self._analyzed_by_cat[record.category][url] = None
+            self._category_counts[record.category] += 1
+    
+    def _load_one_index(self, stage: str) -> Tuple[Dict[str, PageRecord], Set[str], int]:
+        """
+        加载单个阶段的索引: 先读 index.json 快照, 再重放 index.jsonl 日志
+        
+        Returns:
+            (索引, 目录中已有文件路径, 重放的日志条数)
+        """
+        index: Dict[str, PageRecord] = {}
+        existing: Set[str] = set()
+        replayed = 0
+        stage_dir = self._get_stage_dir(stage)
+        
+        # 一次scandir记录已有文件
+        with os.scandir(stage_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    existing.add(entry.path)
+        
+        index_file = stage_dir / 'index.json'
+        if index_file.exists():
+            try:
+                with open(index_file, 'rb') as f:
+                    data = _json_loads(f.read())
+                for url, record in data.items():
+                    index[url] = PageRecord(**record)
+            except Exception as e:
+                logger.warning(f"加载索引失败 {stage}: {e}")
+        
+        # 日志中的记录覆盖快照 (同一URL以最后一次写入为准)
+        log_file = stage_dir / 'index.jsonl'
+        if log_file.exists():
+            with open(log_file, 'rb') as f:
+                for line in f:
+                    try:
+                        record = _json_loads(line)
+                        index[record['url']] = PageRecord(**record)
+                        replayed += 1
+                    except Exception:
+                        # 崩溃时可能留下不完整的最后一行
+                        logger.warning(f"跳过损坏的索引日志行 {stage}")
+        
+        return index, existing, replayed
     
     def _save_index(self, stage: str):
         """保存索引"""
@@ -130,44 +522,232 @@ class DataManager:
         index_file = self._get_stage_dir(stage) / 'index.json'
         
         try:
-            data = {url: record.to_dict() for url, record in index.items()}
-            with open(index_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # 取快照后在锁外编码, 保存线程可继续更新索引
+            with self._index_lock:
+                items = list(index.items())
+            _write_atomic_chunks(str(index_file), self._iter_index_json(items))
         except Exception as e:
             logger.warning(f"保存索引失败 {stage}: {e}")
     
+    @staticmethod
+    def _iter_index_json(index: List[Tuple[str, PageRecord]]) -> Iterator[bytes]:
+        """
+        逐条编码索引为JSON对象 (每条记录一行)
+        
+        不构造 {url: dict} 临时字典, 峰值内存只多出一条记录
+        """
+        yield b'{'
+        sep = b'\n'
+        for url, record in index:
+            yield sep
+            yield _json_compact(url)
+            yield b':'
+            yield _json_compact(record.to_dict())
+            sep = b',\n'
+        yield b'\n}\n'
+    
+    def _append_index(self, stage: str, record: PageRecord):
+        """追加一条索引记录到日志, 并按节流策略压缩"""
+        try:
+            self._log_fh[stage].write(_json_line(record.to_dict()))
+        except Exception as e:
+            logger.warning(f"写入索引日志失败 {stage}: {e}")
+        self._maybe_flush(stage)
+    
+    def _maybe_flush(self, stage: str):
+        """
+        标记索引已变更, 满足节流条件时才压缩
+        
+        条件: 距上次压缩超过 index_flush_interval 秒,
+        或未压缩的变更数达到 index_flush_batch
+        """
+        with self._flush_lock:
+            self._dirty[stage] += 1
+            
+            elapsed = time.monotonic() - self._last_flush_ts
+            pending = sum(self._dirty.values())
+            if (elapsed >= self.storage.index_flush_interval or 
+                    pending >= self.storage.index_flush_batch):
+                self._compact_dirty()
+    
+    def flush(self):
+        """等待后台写入完成, 并将所有有变更的阶段压缩进 index.json"""
+        if self._writer is not None:
+            self._write_q.join()
+        self._compact_dirty()
+    
+    def _compact_dirty(self):
+        """压缩所有有变更的阶段 (写入线程内调用, 不等待队列)"""
+        with self._flush_lock:
+            for stage, pending in self._dirty.items():
+                if pending:
+                    self.compact(stage)
+            self._last_flush_ts = time.monotonic()
+    
+    def compact(self, stage: str):
+        """重写 index.json 快照并清空该阶段的追加日志"""
+        with self._flush_lock:
+            self._save_index(stage)
+            log_fh = self._log_fh.get(stage)
+            if log_fh is not None and not log_fh.closed:
+                log_fh.truncate(0)
+            self._dirty[stage] = 0
+    
+    def _submit_write(self, stage: str, filepath: str, payload: bytes, record: PageRecord):
+        """提交文件写入和索引日志追加; 未启用后台写入时同步执行"""
+        if self._writer is None:
+            self._write_job(stage, filepath, payload, record)
+            return
+        with self._index_lock:
+            self._pending[filepath] = payload
+        self._write_q.put((stage, filepath, payload, record))
+    
+    def _write_job(self, stage: str, filepath: str, payload: bytes, record: PageRecord):
+        """写入文件后再追加索引日志, 保证日志中的记录都有对应文件"""
+        _write_bytes(filepath, payload)
+        self._append_index(stage, record)
+    
+    def _writer_loop(self):
+        """后台写入线程: 依次处理队列中的写入任务, 收到None时退出"""
+        while True:
+            job = self._write_q.get()
+            try:
+                if job is None:
+                    return
+                self._write_job(*job)
+            except Exception as e:
+                logger.error(f"后台写入失败 {job[1]}: {e}")
+            finally:
+                if job is not None:
+                    # 同一路径可能已有更新的待写内容, 只移除本次写入的
+                    with self._index_lock:
+                        if self._pending.get(job[1]) is job[2]:
+                            del self._pending[job[1]]
+                self._write_q.task_done()
+    
+    def _read_file(self, filepath: str) -> Optional[bytes]:
+        """读取文件字节, 优先返回尚未落盘的待写内容"""
+        data = self._pending.get(filepath)
+        if data is not None:
+            return data
+        return _read_bytes(filepath)
+    
+    def close(self):
+        """等待后台写入, 压缩剩余变更并关闭日志文件 (可重复调用)"""
+        self.flush()
+        if self._writer is not None:
+            self._write_q.put(None)
+            self._writer.join()
+            self._writer = None
+        for log_fh in self._log_fh.values():
+            if not log_fh.closed:
+                log_fh.close()
+    
     def _save_metadata(self):
-        """保存任务元数据"""
+        """
+        保存任务元数据
+        
+        沿用已有文件中的created_at, 内容未变化时不重写文件
+        """
+        metadata_file = self.base_dir / 'metadata.json'
+        old_bytes = _read_bytes(str(metadata_file)) or b''
+        
+        created_at = None
+        if old_bytes:
+            try:
+                created_at = _json_loads(old_bytes).get('created_at')
+            except Exception:
+                pass
+        
         metadata = {
             'task_name': self.config.task_name,
             'start_url': self.config.start_url,
             'user_intent': self.config.user_intent,
-            'created_at': datetime.now().isoformat(),
+            'created_at': created_at or self._now_iso(),
             'config': self.config.to_dict()
         }
         
-        metadata_file = self.base_dir / 'metadata.json'
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        new_bytes = _json_dumps(metadata)
+        if new_bytes == old_bytes:
+            return
+        
+        _write_atomic(str(metadata_file), new_bytes)
     
     def _get_stage_dir(self, stage: str) -> Path:
         """获取阶段目录"""
-        stage_map = {
-            'raw': self.raw_dir,
-            'extracted': self.extracted_dir,
-            'analyzed': self.analyzed_dir,
-            'reports': self.reports_dir
-        }
-        return stage_map.get(stage, self.base_dir)
+        return self._stage_dirs.get(stage, self.base_dir)
     
     def _get_index(self, stage: str) -> Dict[str, PageRecord]:
         """获取索引"""
-        index_map = {
-            'raw': self._raw_index,
-            'extracted': self._extracted_index,
-            'analyzed': self._analyzed_index
-        }
-        return index_map.get(stage, {})
+        return self._stage_indexes.get(stage, {})
+    
+    def _now_iso(self) -> str:
+        """当前时间的ISO字符串, 在TIMESTAMP_RESOLUTION秒内复用"""
+        now = time.monotonic()
+        if now - self._ts_cached_at > TIMESTAMP_RESOLUTION:
+            self._ts_cached = datetime.now().isoformat()
+            self._ts_cached_at = now
+        return self._ts_cached
+    
+    def _cache_get(self, key: str) -> Optional[Any]:
+        """读取缓存并更新LRU顺序"""
+        value = self._read_cache.get(key)
+        if value is not None:
+            self._read_cache.move_to_end(key)
+        return value
+    
+    def _cache_put(self, key: str, value: Any):
+        """写入缓存, 超出容量时淘汰最久未用的条目"""
+        self._read_cache[key] = value
+        self._read_cache.move_to_end(key)
+        if len(self._read_cache) > READ_CACHE_SIZE:
+            self._read_cache.popitem(last=False)
+    
+    def _read_json(self, key: str) -> Optional[Dict]:
+        """读取JSON文件, 经过读缓存"""
+        data = self._cache_get(key)
+        if data is None:
+            if key not in self._existing_files:
+                return None
+            data = self._read_file(key)
+            if data is None:
+                # 文件已被外部删除
+                self._existing_files.discard(key)
+                return None
+            self._cache_put(key, data)
+        return _json_loads(data)
+    
+    def _read_json_many(self, keys: List[str]) -> List[Dict]:
+        """
+        批量读取JSON文件
+        
+        缓存未命中的文件由线程池并发读取, 使磁盘I/O相互重叠;
+        缓存只在当前线程中访问
+        """
+        keys = [key for key in keys if key in self._existing_files]
+        blobs = [self._cache_get(key) for key in keys]
+        missing = [i for i, data in enumerate(blobs) if data is None]
+        
+        if len(missing) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(BULK_READ_WORKERS, len(missing))
+            ) as executor:
+                loaded = list(executor.map(self._read_file, [keys[i] for i in missing]))
+        else:
+            loaded = [self._read_file(keys[i]) for i in missing]
+        
+        for i, data in zip(missing, loaded):
+            if data is not None:
+                self._cache_put(keys[i], data)
+                blobs[i] = data
+        
+        results = []
+        for data in blobs:
+            if data is not None:
+                parsed = _json_loads(data)
+                if parsed:
+                    results.append(parsed)
+        return results
     
     def _generate_filename(
         self, 
@@ -181,17 +761,12 @@ class DataManager:
         格式: {category}_{hash}_{sanitized_title}
         """
         # URL哈希
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
+        url_hash = _url_hash(url)
         
         # 清理标题
         if title:
             # 只保留字母数字和下划线
-            sanitized = ''.join(
-                c if c.isalnum() or c == ' ' else '_' 
-                for c in title[:30]
-            )
-            sanitized = sanitized.replace(' ', '_').lower()
-            sanitized = '_'.join(filter(None, sanitized.split('_')))
+            sanitized = _SANITIZE_RE.sub('_', title[:30]).strip('_').lower()
         else:
             sanitized = "page"
         
@@ -199,6 +774,7 @@ class DataManager:
     
     # ========== 原始HTML存储 ==========
     
+    @_synchronized
     def save_raw(
         self, 
         url: str, 
@@ -223,46 +799,128 @@ class DataManager:
         if not filename:
             filename = self._generate_filename(url, title, category)
         
-        filepath = self.raw_dir / f"{filename}.html"
-        
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(html)
+            # 一次性编码, 哈希基于未压缩内容
+            data = html.encode('utf-8')
+            content_hash = _content_hash(data)
+            
+            # 重复爬取且内容未变化时跳过写入
+            old = self._raw_index.get(url)
+            if old is not None:
+                old_path = self._raw_path(
+                    old.filename, (old.metadata or {}).get('compression')
+                )
+                if self._is_unchanged('raw', url, filename, content_hash, old_path):
+                    logger.debug(f"内容未变化, 跳过保存: {os.path.basename(old_path)}")
+                    return old_path
             
-            # 更新索引
+            metadata = None
+            
+            if self._zstd_compressor is not None:
+                if self._zstd_samples is not None:
+                    self._zstd_samples.append(data[:ZSTD_SAMPLE_MAX_BYTES])
+                    if len(self._zstd_samples) >= self.storage.zstd_dict_samples:
+                        self._train_zstd_dict()
+                compression = (
+                    RAW_COMPRESSION_ZSTD_DICT if self._zstd_dict is not None
+                    else RAW_COMPRESSION_ZSTD
+                )
+                metadata = {'compression': compression}
+                payload = self._zstd_compressor.compress(data)
+            else:
+                compression = None
+                payload = data
+            
+            filepath = self._raw_path(filename, compression)
             record = PageRecord(
                 url=url,
                 filename=filename,
                 category=category,
                 title=title,
-                timestamp=datetime.now().isoformat(),
+                timestamp=self._now_iso(),
                 status='raw',
-                content_hash=hashlib.md5(html.encode()).hexdigest()[:16]
+                content_hash=content_hash,
+                metadata=metadata
             )
-            self._raw_index[url] = record
-            self._save_index('raw')
             
-            logger.debug(f"保存原始HTML: {filename}.html")
-            return str(filepath)
+            # 先更新内存索引再提交写入: 写入线程压缩索引时快照中已包含本条记录
+            with self._index_lock:
+                self._raw_index[url] = record
+            self._existing_files.add(filepath)
+            self._submit_write('raw', filepath, payload, record)
+            
+            # 只缓存小页面, 避免大HTML撑大内存
+            if len(html) < RAW_CACHE_MAX_CHARS:
+                self._cache_put(filepath, html)
+            else:
+                self._read_cache.pop(filepath, None)
+            
+            logger.debug(f"保存原始HTML: {os.path.basename(filepath)}")
+            return filepath
             
         except Exception as e:
             logger.error(f"保存HTML失败: {e}")
             return ""
     
+    def _is_unchanged(
+        self, 
+        stage: str, 
+        url: str, 
+        filename: str, 
+        data_hash: str, 
+        filepath: str
+    ) -> bool:
+        """同一URL以相同文件名重新保存, 且内容哈希未变、文件仍在时, 可跳过写入"""
+        old = self._get_index(stage).get(url)
+        if old is None or old.filename != filename:
+            return False
+        if stage == 'raw':
+            old_hash = old.content_hash
+        else:
+            old_hash = (old.metadata or {}).get('data_hash')
+        return old_hash == data_hash and filepath in self._existing_files
+    
+    def _raw_path(self, filename: str, compression: Optional[str]) -> str:
+        """原始HTML文件路径, 压缩存储的文件带 .zst 后缀"""
+        suffix = '.html.zst' if compression else '.html'
+        return os.path.join(self._raw_dir_str, filename + suffix)
+    
+    @_synchronized
     def get_raw(self, url: str) -> Optional[str]:
         """获取原始HTML"""
         record = self._raw_index.get(url)
         if not record:
             return None
         
-        filepath = self.raw_dir / f"{record.filename}.html"
-        if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return f.read()
-        return None
+        compression = (record.metadata or {}).get('compression')
+        key = self._raw_path(record.filename, compression)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        if key not in self._existing_files:
+            return None
+        
+        if compression and self._zstd_decompressor is None:
+            logger.warning(f"读取压缩的HTML需要安装zstandard: {key}")
+            return None
+        
+        data = self._read_file(key)
+        if data is None:
+            self._existing_files.discard(key)
+            return None
+        
+        if compression:
+            data = self._zstd_decompressor.decompress(data)
+        html = data.decode('utf-8')
+        
+        if len(html) < RAW_CACHE_MAX_CHARS:
+            self._cache_put(key, html)
+        return html
     
     # ========== 提取内容存储 ==========
     
+    @_synchronized
     def save_extracted(
         self, 
         url: str, 
@@ -291,53 +949,60 @@ class DataManager:
                 content.get('category', 'general')
             )
         
-        filepath = self.extracted_dir / f"{filename}.json"
+        filepath = os.path.join(self._extracted_dir_str, filename + '.json')
         
         try:
-            # 添加元数据
-            content['_meta'] = {
+            # 正文只编码一次: 哈希用于判断是否变化, 再拼接元数据 (不修改调用方的字典)
+            body = _json_compact(_strip_meta(content))
+            data_hash = _content_hash(body)
+            if self._is_unchanged('extracted', url, filename, data_hash, filepath):
+                logger.debug(f"内容未变化, 跳过保存: {filename}.json")
+                return filepath
+            
+            data = _append_meta(body, {
                 'url': url,
-                'extracted_at': datetime.now().isoformat(),
+                'extracted_at': self._now_iso(),
                 'filename': filename
-            }
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(content, f, indent=2, ensure_ascii=False)
-            
-            # 更新索引
+            })
             record = PageRecord(
                 url=url,
                 filename=filename,
                 category=content.get('category', 'general'),
                 title=content.get('title', ''),
-                timestamp=datetime.now().isoformat(),
+                timestamp=self._now_iso(),
                 status='extracted',
-                content_hash=content.get('stats', {}).get('content_hash', '')
+                content_hash=content.get('stats', {}).get('content_hash', ''),
+                metadata={'data_hash': data_hash}
             )
-            self._extracted_index[url] = record
-            self._save_index('extracted')
+            
+            # 先更新内存索引再提交写入
+            with self._index_lock:
+                self._extracted_index[url] = record
+            self._existing_files.add(filepath)
+            self._submit_write('extracted', filepath, data, record)
+            self._cache_put(filepath, data)
             
             logger.debug(f"保存提取内容: {filename}.json")
-            return str(filepath)
+            return filepath
             
         except Exception as e:
             logger.error(f"保存提取内容失败: {e}")
             return ""
     
+    @_synchronized
     def get_extracted(self, url: str) -> Optional[Dict]:
         """获取提取的内容"""
         record = self._extracted_index.get(url)
         if not record:
             return None
         
-        filepath = self.extracted_dir / f"{record.filename}.json"
-        if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return None
+        return self._read_json(
+            os.path.join(self._extracted_dir_str, record.filename + '.json')
+        )
     
     # ========== 分析结果存储 ==========
     
+    @_synchronized
     def save_analyzed(
         self, 
         url: str, 
@@ -369,88 +1034,104 @@ class DataManager:
                 analysis.get('category', 'general')
             )
         
-        filepath = self.analyzed_dir / f"{filename}.json"
+        filepath = os.path.join(self._analyzed_dir_str, filename + '.json')
+        
+        # 相关性评分统一保存为float (模型可能输出字符串), 不修改调用方的字典
+        if type(analysis.get('relevance_score')) is not float:
+            analysis = {
+                **analysis, 
+                'relevance_score': _to_score(analysis.get('relevance_score'))
+            }
         
         try:
-            # 添加元数据
-            analysis['_meta'] = {
+            # 正文只编码一次: 哈希用于判断是否变化, 再拼接元数据 (不修改调用方的字典)
+            body = _json_compact(_strip_meta(analysis))
+            data_hash = _content_hash(body)
+            if self._is_unchanged('analyzed', url, filename, data_hash, filepath):
+                logger.debug(f"内容未变化, 跳过保存: {filename}.json")
+                return filepath
+            
+            data = _append_meta(body, {
                 'url': url,
-                'analyzed_at': datetime.now().isoformat(),
+                'analyzed_at': self._now_iso(),
                 'filename': filename
-            }
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(analysis, f, indent=2, ensure_ascii=False)
-            
-            # 更新索引
+            })
             category = analysis.get('category', 'general')
             record = PageRecord(
                 url=url,
                 filename=filename,
                 category=category,
                 title=analysis.get('title', ''),
-                timestamp=datetime.now().isoformat(),
+                timestamp=self._now_iso(),
                 status='analyzed',
                 content_hash='',
                 metadata={
                     'relevance_score': analysis.get('relevance_score', 0),
-                    'model': analysis.get('model', '')
+                    'model': analysis.get('model', ''),
+                    'data_hash': data_hash
                 }
             )
-            self._analyzed_index[url] = record
-            self._save_index('analyzed')
+            
+            # 先更新内存索引再提交写入
+            self._update_category_index(url, category)
+            with self._index_lock:
+                self._analyzed_index[url] = record
+            self._existing_files.add(filepath)
+            self._submit_write('analyzed', filepath, data, record)
+            self._cache_put(filepath, data)
             
             logger.debug(f"保存分析结果: {filename}.json")
-            return str(filepath)
+            return filepath
             
         except Exception as e:
             logger.error(f"保存分析结果失败: {e}")
             return ""
     
+    @_synchronized
     def get_analyzed(self, url: str) -> Optional[Dict]:
         """获取分析结果"""
         record = self._analyzed_index.get(url)
         if not record:
             return None
         
-        filepath = self.analyzed_dir / f"{record.filename}.json"
-        if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return None
+        return self._read_json(
+            os.path.join(self._analyzed_dir_str, record.filename + '.json')
+        )
     
     # ========== 报告存储 ==========
     
+    @_synchronized
     def save_report(
         self, 
         name: str, 
-        content: str, 
+        content: Any, 
         category: str = None,
-        format: str = 'md'
+        format: str = 'md',
+        pretty: bool = True
     ) -> str:
         """
         保存报告
         
         Args:
             name: 报告名称
-            content: 报告内容
+            content: 报告内容 (文本, 或将序列化为JSON的字典/列表)
             category: 分类目录
             format: 文件格式
+            pretty: 非文本内容是否以缩进格式输出 (报告面向阅读, 默认缩进)
             
         Returns:
             保存的文件路径
         """
-        if category:
-            report_dir = self.reports_dir / category
-            report_dir.mkdir(parents=True, exist_ok=True)
-        else:
-            report_dir = self.reports_dir
-        
-        filepath = report_dir / f"{name}.{format}"
+        filepath = self.get_report_path(name, category, format)
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            if isinstance(content, str):
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(content)
+            else:
+                data = _json_dumps(content) if pretty else _json_compact(content)
+                with open(filepath, 'wb') as f:
+                    f.write(data)
             
             logger.debug(f"保存报告: {filepath}")
             return str(filepath)
@@ -459,34 +1140,74 @@ class DataManager:
             logger.error(f"保存报告失败: {e}")
             return ""
     
+    def get_report_path(
+        self, 
+        name: str, 
+        category: str = None, 
+        format: str = 'md'
+    ) -> Path:
+        """
+        获取报告文件路径 (需要时创建分类目录)
+        
+        Args:
+            name: 报告名称
+            category: 分类目录
+            format: 文件格式
+            
+        Returns:
+            报告文件路径
+        """
+        if category:
+            report_dir = self.reports_dir / category
+            report_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            report_dir = self.reports_dir
+        
+        return report_dir / f"{name}.{format}"
+    
     # ========== 查询和统计 ==========
     
+    @_synchronized
     def get_all_analyzed(self) -> List[Dict]:
         """获取所有分析结果"""
-        results = []
-        for url in self._analyzed_index:
-            data = self.get_analyzed(url)
-            if data:
-                results.append(data)
-        return results
+        analyzed_dir = self._analyzed_dir_str
+        pages = self._read_json_many([
+            os.path.join(analyzed_dir, record.filename + '.json')
+            for record in self._analyzed_index.values()
+        ])
+        return [_normalize_analysis(page) for page in pages]
     
+    @_synchronized
     def get_by_category(self, category: str) -> List[Dict]:
         """按类别获取分析结果"""
-        results = []
-        for url, record in self._analyzed_index.items():
-            if record.category == category:
-                data = self.get_analyzed(url)
-                if data:
-                    results.append(data)
-        return results
+        urls = self._analyzed_by_cat.get(category, ())
+        analyzed_dir = self._analyzed_dir_str
+        pages = self._read_json_many([
+            os.path.join(analyzed_dir, self._analyzed_index[url].filename + '.json')
+            for url in urls
+        ])
+        return [_normalize_analysis(page) for page in pages]
+    
+    def _update_category_index(self, url: str, category: str):
+        """更新类别二级索引 (URL重新分析且类别变化时从旧类别移除)"""
+        old_record = self._analyzed_index.get(url)
+        if old_record is not None:
+            if old_record.category == category:
+                return
+            old_category = old_record.category
+            self._analyzed_by_cat[old_category].pop(url, None)
+            self._category_counts[old_category] -= 1
+            if self._category_counts[old_category] <= 0:
+                del self._category_counts[old_category]
+                self._analyzed_by_cat.pop(old_category, None)
+        
+        self._analyzed_by_cat[category][url] = None
+        self._category_counts[category] += 1
     
     def get_stats(self) -> Dict:
         """获取统计信息"""
         # 按类别统计
-        category_stats = {}
-        for record in self._analyzed_index.values():
-            cat = record.category
-            category_stats[cat] = category_stats.get(cat, 0) + 1
+        category_stats = dict(self._category_counts)
         
         return {
             'total_raw': len(self._raw_index),
@@ -512,15 +1233,15 @@ class DataManager:
         
         return [url for url in from_index if url not in to_index]
     
-    def export_summary(self) -> Dict:
-        """导出摘要"""
+    def export_summary(self, stats: Optional[Dict] = None) -> Dict:
+        """导出摘要 (可传入已获取的统计信息)"""
         summary = {
             'task': {
                 'name': self.config.task_name,
                 'intent': self.config.user_intent,
                 'start_url': self.config.start_url
             },
-            'stats': self.get_stats(),
+            'stats': stats if stats is not None else self.get_stats(),
             'pages': []
         }
         
@@ -532,7 +1253,10 @@ class DataManager:
                 'timestamp': record.timestamp
             }
             if record.metadata:
-                page_info.update(record.metadata)
+                # data_hash只用于跳过未变化的写入, 不导出
+                page_info.update(
+                    (k, v) for k, v in record.metadata.items() if k != 'data_hash'
+                )
             summary['pages'].append(page_info)
         
         return summary
@@ -565,6 +1289,7 @@ if __name__ == "__main__":
         analysis={'title': 'Test', 'summary': 'Analysis'}
     )
     
+    manager.close()
     print(json.dumps(manager.get_stats(), indent=2))
     
     # 清理测试目录
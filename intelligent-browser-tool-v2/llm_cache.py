@@ -0,0 +1,336 @@
+"""
+LLM响应缓存 - 按请求内容精确匹配的模型响应缓存
+
+设计理念:
+- 精确匹配: 对 (模型, 消息, 温度, 最大token数, 工具) 计算SHA-256作为键
+- 两级存储: 进程内字典缓存本次运行的所有响应;
+  低温度的确定性调用 (分类/链接评分/快速判断/文件命名) 另外写入磁盘, 跨运行复用
+- 磁盘层可选: 需要diskcache, 未安装时只使用内存层
+- 语义缓存: 嵌入向量余弦相似度超过阈值时复用近似重复页面的分析结果
+- 命中统计: 记录命中/未命中次数
+
+参考: diskcache最佳实践
+"""
+
+import hashlib
+import json
+import math
+import operator
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# ============ 可选依赖检测 ============
+
+try:
+    import diskcache
+    HAS_DISKCACHE = True
+except ImportError:
+    HAS_DISKCACHE = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _json_key_bytes(obj: Any) -> bytes:
+    """按键排序序列化为UTF-8 JSON字节 (计算缓存键用), 优先使用orjson"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False).encode('utf-8')
+
+
+def _json_line(obj: Any) -> bytes:
+    """序列化为一行JSON (含换行符), 优先使用orjson"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def _json_loads(data: bytes) -> Any:
+    """解析JSON字节, 优先使用orjson"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def cache_key(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: Optional[int] = None,
+    tools: Optional[List[Dict]] = None
+) -> str:
+    """
+    计算LLM请求的缓存键
+    
+    Args:
+        model: 模型名称
+        messages: 消息列表
+        temperature: 温度参数
+        max_tokens: 最大token数 (影响输出是否被截断)
+        tools: 工具定义
+    
+    Returns:
+        SHA-256十六进制摘要
+    """
+    payload = {
+        'model': model,
+        'messages': messages,
+        'temperature': temperature,
+        'max_tokens': max_tokens,
+        'tools': tools
+    }
+    return hashlib.sha256(_json_key_bytes(payload)).hexdigest()
+
+
+class LLMCache:
+    """
+    LLM响应缓存 (线程安全)
+    
+    内存层缓存所有成功响应; 温度不超过 persist_max_temperature 的响应
+    同时写入磁盘层 (带过期时间), 之后的运行可直接复用
+    
+    使用示例:
+        cache = LLMCache(directory="./output/.cache/llm", ttl=86400)
+        key = cache_key(model, messages, temperature)
+        response = cache.get(key)
+        if response is None:
+            response = call_model(...)
+            cache.set(key, response, temperature)
+    """
+    
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        ttl: Optional[float] = None,
+        persist_max_temperature: float = 0.1
+    ):
+        """
+        初始化LLM响应缓存
+        
+        Args:
+            directory: 磁盘缓存目录, None表示只使用内存
+            ttl: 磁盘缓存条目的过期时间 (秒), None表示不过期
+            persist_max_temperature: 写入磁盘的调用允许的最高温度
+        """
+        self.ttl = ttl
+        self.persist_max_temperature = persist_max_temperature
+        
+        self._memory: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        
+        self._disk = None
+        if directory:
+            if HAS_DISKCACHE:
+                self._disk = diskcache.Cache(directory)
+            else:
+                logger.warning("未安装diskcache, LLM响应缓存只保存在内存中")
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        查找缓存的响应 (先内存后磁盘, 磁盘命中时载入内存)
+        
+        Returns:
+            缓存的响应, 未命中返回None
+        """
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._hits += 1
+                return value
+        
+        if self._disk is not None:
+            value = self._disk.get(key)
+        
+        with self._lock:
+            if value is None:
+                self._misses += 1
+                return None
+            self._memory[key] = value
+            self._hits += 1
+            return value
+    
+    def set(self, key: str, value: Any, temperature: float):
+        """
+        写入缓存
+        
+        Args:
+            key: cache_key()计算的键
+            value: 响应 (需可pickle)
+            temperature: 该调用使用的温度, 决定是否写入磁盘
+        """
+        with self._lock:
+            self._memory[key] = value
+        
+        if self._disk is not None and temperature <= self.persist_max_temperature:
+            self._disk.set(key, value, expire=self.ttl)
+    
+    def clear(self):
+        """清空内存和磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+    
+    def close(self):
+        """关闭磁盘缓存"""
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+    
+    def get_stats(self) -> Dict:
+        """获取缓存统计"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'llm_cache_size': len(self._memory),
+                'llm_cache_hits': self._hits,
+                'llm_cache_misses': self._misses,
+                'llm_cache_hit_rate': self._hits / lookups if lookups else 0.0,
+                'llm_cache_persistent': self._disk is not None
+            }
+
+
+class SemanticCache:
+    """
+    语义相似度缓存 - 按嵌入向量的余弦相似度复用近似重复请求的结果
+    
+    同一站点的模板化页面 (镜像页、标签页变体) 正文几乎相同, 但精确匹配的键不同;
+    嵌入向量写入时归一化, 相似度即点积, 查询时线性扫描 (条目数有上限).
+    设置path时条目追加写入JSONL文件, 下次运行载入
+    
+    使用示例:
+        cache = SemanticCache(threshold=0.92, path="./output/.cache/semantic.jsonl")
+        hit = cache.lookup(embedding)
+        if hit is None:
+            cache.add(embedding, result)
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 2048,
+        path: Optional[str] = None
+    ):
+        """
+        初始化语义缓存
+        
+        Args:
+            threshold: 余弦相似度超过该值视为命中
+            max_entries: 条目上限, 写满后不再加入新条目
+            path: 持久化JSONL文件路径, None表示只在内存中
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        
+        self._entries: List[Tuple[List[float], Any]] = []
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        
+        if path:
+            # 输出目录可能在配置初始化后才改变 (--output), 缓存目录不一定已存在
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            if os.path.exists(path):
+                self._load()
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[List[float]]:
+        """归一化为单位向量, 零向量返回None"""
+        norm = math.sqrt(sum(x * x for x in embedding))
+        if not norm:
+            return None
+        return [x / norm for x in embedding]
+    
+    def _load(self):
+        """从JSONL文件载入条目 (跳过损坏的行)"""
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if len(self._entries) >= self.max_entries:
+                    break
+                try:
+                    entry = _json_loads(line)
+                    self._entries.append((entry['embedding'], entry['value']))
+                except (ValueError, KeyError):
+                    continue
+        logger.debug(f"语义缓存载入 {len(self._entries)} 条")
+    
+    def lookup(self, embedding: List[float]) -> Optional[Tuple[float, Any]]:
+        """
+        查找最相似的条目
+        
+        Returns:
+            (相似度, 缓存的值), 最高相似度不超过阈值返回None
+        """
+        query = self._normalize(embedding)
+        
+        # 条目只追加不修改, 复制引用列表后在锁外扫描
+        with self._lock:
+            entries = self._entries[:]
+        
+        best_sim = -1.0
+        best_value = None
+        if query is not None:
+            for vector, value in entries:
+                if len(vector) != len(query):
+                    continue
+                sim = sum(map(operator.mul, query, vector))
+                if sim > best_sim:
+                    best_sim, best_value = sim, value
+        
+        with self._lock:
+            if best_sim > self.threshold:
+                self._hits += 1
+                return best_sim, best_value
+            self._misses += 1
+            return None
+    
+    def add(self, embedding: List[float], value: Any):
+        """
+        写入条目
+        
+        Args:
+            embedding: 嵌入向量
+            value: 缓存的值 (需可JSON序列化)
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                return
+            self._entries.append((vector, value))
+            if self.path:
+                # 持久化失败只影响下次运行的命中, 不影响本次结果
+                try:
+                    with open(self.path, 'ab') as f:
+                        f.write(_json_line({'embedding': vector, 'value': value}))
+                except OSError as e:
+                    logger.warning(f"语义缓存写入失败: {self.path} - {e}")
+    
+    def clear(self):
+        """清空内存条目并删除持久化文件"""
+        with self._lock:
+            self._entries.clear()
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+    
+    def get_stats(self) -> Dict:
+        """获取缓存统计"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'semantic_cache_size': len(self._entries),
+                'semantic_cache_hits': self._hits,
+                'semantic_cache_misses': self._misses,
+                'semantic_cache_hit_rate': self._hits / lookups if lookups else 0.0
+            }
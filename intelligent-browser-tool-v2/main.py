@@ -12,7 +12,7 @@
 1. 加载配置和用户意图
 2. 初始化各组件
 3. 获取起始页面
-4. 循环: 提取 -> 分类 -> 分析 -> 发现新URL
+4. 循环: 提取 -> 分类 -> 分析 -> 发现新URL (多个工作线程并发处理页面)
 5. 生成报告
 
 URL队列策略:
@@ -27,14 +27,22 @@ URL队列策略:
     python main.py --url https://www.stanford.edu --max-pages 20 --headless
 """
 
+import os
 import sys
 import time
 import argparse
+import re
 import json
 import heapq
+import hashlib
+import math
 import random
-import traceback
-from typing import Dict, List, Set, Optional, Tuple
+import struct
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from functools import lru_cache
+from typing import Callable, Dict, List, Set, Optional, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, field
@@ -44,25 +52,128 @@ from loguru import logger
 
 # 项目模块
 from config import Config, get_stanford_config, get_fast_config, get_deep_config
-from browser_engine import BrowserEngine, normalize_url, is_same_domain
+from browser_engine import BrowserPool, StaticFetcher, normalize_url, is_same_domain
 from content_processor import ContentProcessor
 from ai_analyzer import AIAnalyzer
 from data_manager import DataManager
 from report_generator import ReportGenerator
 from prompts import load_intent_from_file
 
-import traceback
+# ============ 可选依赖检测 ============
 
-def get_err_message():
-    exc_type, exc_value, exc_traceback = sys.exc_info()
-    error_message = repr(
-        traceback.format_exception(exc_type, exc_value, exc_traceback)
-    )
-    return error_message
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+try:
+    from rocksdict import Rdict, Options as RocksOptions, WriteBatch
+    HAS_ROCKSDICT = True
+except ImportError:
+    HAS_ROCKSDICT = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _json_bytes(obj) -> bytes:
+    """序列化为紧凑的UTF-8 JSON字节, 优先使用orjson"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data: bytes):
+    """解析JSON字节, 优先使用orjson"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
 
 # ============ URL优先级队列 ============
 
-@dataclass(order=True)
+# 探索时从堆顶的多少个候选中随机选择
+EXPLORATION_CANDIDATES = 11
+
+# 域名礼貌策略: 每次出队最多检查多少个内部堆中的URL (域名冷却中的转入延迟队列)
+POLITENESS_SCAN = 32
+
+# 链接类型的优先级加成
+TYPE_BONUS: Dict[str, float] = {
+    'admission': 3.0,
+    'international': 2.5,
+    'financial': 2.0,
+    'academic': 1.5,
+    'research': 1.0,
+    'faculty': 0.5,
+    'news': -0.5,
+    'navigation': -1.0,
+    'general': 0.0
+}
+
+# 按URL关键词即可判定为高价值的链接类型, 直接入队, 不经过AI推荐
+FAST_ACCEPT_TYPES = frozenset({'admission', 'international', 'financial'})
+
+# 每个页面送入AI推荐的候选链接上限 (链接已按优先级降序排列)
+LLM_LINK_CANDIDATES = 20
+
+# 批量入队的元素: (normalized, url, depth, priority, source_url, link_type, ai_score, reason)
+FrontierItem = Tuple[str, str, int, float, str, str, float, str]
+
+
+def url_fingerprint(normalized: str) -> int:
+    """
+    规范化URL的64位指纹
+    
+    去重集合只保存整数而非完整URL字符串, 内存占用约减半;
+    在十万级URL规模下64位哈希的碰撞概率可以忽略
+    """
+    data = normalized.encode('utf-8', 'surrogatepass')
+    if HAS_XXHASH:
+        return xxhash.xxh64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+# 协议名 (RFC 3986: 字母开头, 后接字母、数字、+、-、.)
+_SCHEME_RE = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*')
+
+# 域名部分的结束字符
+_NETLOC_END = ('/', '?', '#')
+
+
+@lru_cache(maxsize=8192)
+def get_url_domain(url: str) -> str:
+    """
+    获取URL的域名 (去掉www.), 结果与 urlparse(url).netloc.replace('www.', '') 相同
+    
+    同一URL在过滤、入队、出队时都要取域名, 缓存解析结果;
+    未命中缓存时直接扫描 "//" 之后到第一个 "/", "?", "#" 之间的部分,
+    不构造完整的ParseResult
+    """
+    start = url.find('//')
+    if start < 0:
+        return ''
+    # "//" 之前只能是协议名加冒号 (或为空, 即协议相对URL), 否则没有域名部分
+    if start and (url[start - 1] != ':' or not _SCHEME_RE.fullmatch(url, 0, start - 1)):
+        return ''
+    start += 2
+    end = len(url)
+    for sep in _NETLOC_END:
+        i = url.find(sep, start, end)
+        if i >= 0:
+            end = i
+    return url[start:end].replace('www.', '')
+
+@dataclass(eq=False)
 class PrioritizedURL:
     """
     优先级URL数据类
@@ -70,14 +181,241 @@ class PrioritizedURL:
     优先级计算: 
     - 负数表示高优先级 (heapq是最小堆)
     - 考虑: AI评分, 深度, 类型, 随机因子
+    
+    队列内部的堆保存 (priority, seq, PrioritizedURL) 元组, 比较在C层完成;
+    这里的 __lt__ 只比较优先级, 供外部排序使用
     """
     priority: float
-    url: str = field(compare=False)
-    depth: int = field(compare=False)
-    source_url: str = field(compare=False, default="")
-    link_type: str = field(compare=False, default="general")
-    ai_score: float = field(compare=False, default=0.0)
-    reason: str = field(compare=False, default="")
+    url: str
+    depth: int
+    source_url: str = ""
+    link_type: str = "general"
+    ai_score: float = 0.0
+    reason: str = ""
+    # 规范化URL, 入队时计算一次, 出队和去重时直接复用
+    normalized: str = field(default="", repr=False)
+    # 持久化存储中的键 (未启用持久化时为空)
+    store_key: bytes = field(default=b"", repr=False)
+    
+    def __lt__(self, other: 'PrioritizedURL') -> bool:
+        return self.priority < other.priority
+
+
+# 持久化已访问集合前的布隆过滤器: 容量100万, 误判率1% 时约1.2MB
+VISITED_BLOOM_CAPACITY = 1_000_000
+VISITED_BLOOM_ERROR_RATE = 0.01
+
+# 内部堆的元素: (priority, seq, PrioritizedURL), seq保证同优先级时不比较对象
+HeapEntry = Tuple[float, int, PrioritizedURL]
+
+
+class _BloomFilter:
+    """
+    布隆过滤器 - 整数指纹的近似成员判断
+    
+    不存在的指纹绝大多数一次位检查即可排除, 只有判定"可能存在"时才需要精确查找;
+    k个位置由64位指纹的高低32位双重哈希导出, 无需额外计算哈希
+    """
+    
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        Args:
+            capacity: 预计元素数量, 超出后误判率上升但结果仍然正确 (由精确查找兜底)
+            error_rate: 目标误判率
+        """
+        self.num_bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+    
+    def _positions(self, fp: int):
+        h1 = fp & 0xFFFFFFFF
+        h2 = (fp >> 32) | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+    
+    def add(self, fp: int):
+        bits = self._bits
+        for pos in self._positions(fp):
+            bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, fp: int) -> bool:
+        bits = self._bits
+        for pos in self._positions(fp):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+    
+    def clear(self):
+        self._bits = bytearray(len(self._bits))
+
+
+class _FrontierStore:
+    """
+    URL队列的RocksDB持久化存储 (基于rocksdict)
+    
+    两个列族:
+    - visited: 已访问URL指纹 (8字节) -> 空值
+    - frontier: (优先级, 序号) 编码的有序键 -> 待爬URL, 按键顺序即按优先级顺序
+    
+    RocksDB自身支持并发读写, 这里不额外加锁; 调用方负责与内存状态的一致性
+    
+    已访问判断先查内存中的布隆过滤器, 新发现的链接大多未访问过,
+    可直接排除而无需查询数据库
+    """
+    
+    def __init__(self, path: str):
+        Path(path).mkdir(parents=True, exist_ok=True)
+        options = RocksOptions(raw_mode=True)
+        options.create_if_missing(True)
+        options.create_missing_column_families(True)
+        self._db = Rdict(
+            path,
+            options=options,
+            column_families={
+                'visited': RocksOptions(raw_mode=True),
+                'frontier': RocksOptions(raw_mode=True)
+            }
+        )
+        self._visited = self._db.get_column_family('visited')
+        self._frontier = self._db.get_column_family('frontier')
+        self._visited_cf = self._db.get_column_family_handle('visited')
+        self._frontier_cf = self._db.get_column_family_handle('frontier')
+        
+        self._visited_bloom = _BloomFilter(VISITED_BLOOM_CAPACITY, VISITED_BLOOM_ERROR_RATE)
+        self.visited_count = 0
+        for key in self._visited.keys():
+            self._visited_bloom.add(int.from_bytes(key, 'big'))
+            self.visited_count += 1
+        # 续爬时序号从已有最大值之后开始, 避免覆盖已有的键
+        last_seq = max(
+            (struct.unpack('>Q', key[8:])[0] for key in self._frontier.keys()),
+            default=-1
+        )
+        self._seq = itertools.count(last_seq + 1)
+    
+    @staticmethod
+    def _fp_key(fp: int) -> bytes:
+        return fp.to_bytes(8, 'big')
+    
+    @staticmethod
+    def _frontier_key(priority: float, seq: int) -> bytes:
+        """
+        编码 (优先级, 序号) 为按字节序排序的键
+        
+        IEEE 754 浮点数: 正数翻转符号位, 负数翻转全部位, 字节序即与数值顺序一致
+        """
+        bits = struct.unpack('>Q', struct.pack('>d', priority))[0]
+        if bits >> 63:
+            bits ^= 0xFFFFFFFFFFFFFFFF
+        else:
+            bits |= 1 << 63
+        return struct.pack('>QQ', bits, seq)
+    
+    @staticmethod
+    def _key_priority(key: bytes) -> float:
+        """从存储键还原优先级 (_frontier_key的逆变换)"""
+        bits = struct.unpack('>Q', key[:8])[0]
+        if bits >> 63:
+            bits &= (1 << 63) - 1
+        else:
+            bits ^= 0xFFFFFFFFFFFFFFFF
+        return struct.unpack('>d', struct.pack('>Q', bits))[0]
+    
+    def is_visited(self, fp: int) -> bool:
+        if fp not in self._visited_bloom:
+            return False
+        return self._visited.get(self._fp_key(fp)) is not None
+    
+    def add_visited(self, fp: int):
+        if self.is_visited(fp):
+            return
+        self._visited[self._fp_key(fp)] = b''
+        self._visited_bloom.add(fp)
+        self.visited_count += 1
+    
+    def push(self, p_url: PrioritizedURL) -> bytes:
+        """写入待爬URL, 返回其存储键"""
+        key = self._frontier_key(p_url.priority, next(self._seq))
+        self._frontier[key] = _json_bytes([
+            p_url.url, p_url.depth, p_url.source_url,
+            p_url.link_type, p_url.ai_score, p_url.reason
+        ])
+        return key
+    
+    def commit_pop(self, key: bytes, fp: int):
+        """出队: 在同一批次中删除待爬URL并标记为已访问"""
+        is_new = not self.is_visited(fp)
+        batch = WriteBatch(raw_mode=True)
+        if key:
+            batch.delete(key, self._frontier_cf)
+        batch.put(self._fp_key(fp), b'', self._visited_cf)
+        self._db.write(batch)
+        if is_new:
+            self._visited_bloom.add(fp)
+            self.visited_count += 1
+    
+    def iter_pending(self):
+        """按优先级顺序遍历待爬URL, 产出PrioritizedURL"""
+        for key, value in self._frontier.items():
+            url, depth, source_url, link_type, ai_score, reason = _json_loads(value)
+            yield PrioritizedURL(
+                priority=self._key_priority(key),
+                url=url,
+                depth=depth,
+                source_url=source_url,
+                link_type=link_type,
+                ai_score=ai_score,
+                reason=reason,
+                normalized=normalize_url(url),
+                store_key=key
+            )
+    
+    def clear(self):
+        for cf in (self._visited, self._frontier):
+            for key in list(cf.keys()):
+                del cf[key]
+        self._visited_bloom.clear()
+        self.visited_count = 0
+    
+    def close(self):
+        # 列族句柄持有数据库引用, 需先释放才能真正关闭
+        del self._visited, self._frontier, self._visited_cf, self._frontier_cf
+        self._db.close()
+
+
+class _ShardedCounter:
+    """
+    按线程分片的计数器
+    
+    每个线程只递增自己的分片, 无需加锁; 读取时汇总所有分片
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[List[int]] = []
+        self._shards_lock = threading.Lock()
+    
+    def incr(self, n: int = 1):
+        """递增当前线程的分片"""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = [0]
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        shard[0] += n
+    
+    @property
+    def value(self) -> int:
+        """所有分片之和"""
+        with self._shards_lock:
+            return sum(shard[0] for shard in self._shards)
+    
+    def reset(self):
+        """清零所有分片"""
+        with self._shards_lock:
+            for shard in self._shards:
+                shard[0] = 0
 
 
 class URLFrontier:
@@ -90,13 +428,34 @@ class URLFrontier:
     3. 域名多样性: 避免过度集中
     4. 深度控制: 防止过深爬取
     5. 去重: 避免重复访问
+    
+    线程安全 (MultiQueue 松弛优先级队列):
+    - URL分散在 k 个内部堆中, 每个堆有自己的锁; add() 随机选一个堆,
+      pop() 随机取两个堆, 从堆顶优先级更高的那个出队
+    - 出队顺序只是近似按优先级, 对聚焦爬虫足够, 换来的是线程间几乎不争用
+    - _visited_lock 保护已访问/在队列中的URL指纹集合和域名计数, 不与堆锁嵌套
+    
+    域名礼貌策略 (politeness_delay > 0): 同一域名两次出队至少间隔 politeness_delay 秒;
+    出队时域名仍在冷却中的URL转入该域名的延迟队列 (每域名一个小堆), 冷却结束后
+    与内部堆一起按优先级竞争. _domain_lock 保护延迟队列和各域名的下次可访问时间
+    
+    容量限制: 每个内部堆最多保留 max_size / num_queues 个URL, 超出一定余量后
+    只保留优先级最高的部分, 被淘汰的低优先级URL移出队列集合 (之后可被重新发现)
+    
+    持久化 (storage_path, 需要rocksdict): 已访问集合只保存在RocksDB, 所有待爬URL
+    也写入RocksDB, 内存堆只是其中优先级最高的工作集; 被淘汰的URL留在磁盘上,
+    内存堆取空后再从磁盘按优先级补充. 重新打开同一目录即可从中断处续爬
     """
     
     def __init__(
         self, 
         exploration_rate: float = 0.2,
         depth_penalty: float = 0.1,
-        max_depth: int = 5
+        max_depth: int = 5,
+        num_queues: int = 4,
+        max_size: int = 10_000,
+        storage_path: Optional[str] = None,
+        politeness_delay: float = 0.0
     ):
         """
         初始化URL边界
@@ -105,20 +464,113 @@ class URLFrontier:
             exploration_rate: 探索率 (0-1), 随机选择的概率
             depth_penalty: 深度惩罚系数
             max_depth: 最大深度
+            num_queues: 内部堆数量, 一般取工作线程数的2倍
+            max_size: 队列容量上限, 平均分配到各内部堆
+            storage_path: RocksDB持久化目录, None表示仅在内存中
+            politeness_delay: 同一域名两次出队的最小间隔 (秒), 0表示不限制
         """
-        self._heap: List[PrioritizedURL] = []
-        self._visited: Set[str] = set()
-        self._in_queue: Set[str] = set()
+        self._heaps: List[List[HeapEntry]] = [[] for _ in range(max(1, num_queues))]
+        self._heap_locks: List[threading.Lock] = [threading.Lock() for _ in self._heaps]
+        # 单个堆的容量, 超过 _heap_trim_at 时截断回 _heap_bound (摊销截断开销)
+        self._heap_bound = max(1, max_size // len(self._heaps))
+        self._heap_trim_at = self._heap_bound + max(1, self._heap_bound // 4)
+        self._seq = itertools.count()
+        # 去重集合保存规范化URL的指纹 (url_fingerprint), 而非URL字符串
+        self._visited_hashes: Set[int] = set()
+        self._in_queue_hashes: Set[int] = set()
         self._domain_counts: Dict[str, int] = {}
         
+        self._visited_lock = threading.Lock()
+        
         self.exploration_rate = exploration_rate
         self.depth_penalty = depth_penalty
         self.max_depth = max_depth
         
-        # 统计
-        self.total_added = 0
-        self.total_popped = 0
-        self.duplicates_skipped = 0
+        # 域名礼貌策略: 冷却中域名的延迟队列 (只保留非空的) 和下次可访问时间 (monotonic)
+        self.politeness_delay = politeness_delay
+        self._domain_queues: Dict[str, List[HeapEntry]] = {}
+        self._domain_next_fetch: Dict[str, float] = {}
+        self._deferred_hashes: Set[int] = set()
+        self._domain_lock = threading.Lock()
+        
+        # 统计 (分片计数, 递增不加锁)
+        self._total_added = _ShardedCounter()
+        self._total_popped = _ShardedCounter()
+        self._duplicates_skipped = _ShardedCounter()
+        self._evicted = _ShardedCounter()
+        
+        # 持久化存储
+        self._store: Optional[_FrontierStore] = None
+        self._refill_lock = threading.Lock()
+        if storage_path:
+            if HAS_ROCKSDICT:
+                self._store = _FrontierStore(storage_path)
+                self._rehydrate()
+            else:
+                logger.warning("未安装rocksdict, URL队列不会持久化")
+    
+    def _rehydrate(self):
+        """从持久化存储恢复队列集合和域名计数, 并载入优先级最高的工作集"""
+        pending = 0
+        for p_url in self._store.iter_pending():
+            self._in_queue_hashes.add(url_fingerprint(p_url.normalized))
+            domain = self._get_domain(p_url.url)
+            self._domain_counts[domain] = self._domain_counts.get(domain, 0) + 1
+            pending += 1
+        
+        if pending or self._store.visited_count:
+            self._refill()
+            logger.info(
+                f"从持久化队列恢复: 已访问 {self._store.visited_count}, "
+                f"待爬 {pending}"
+            )
+    
+    def _refill(self) -> bool:
+        """
+        内存堆全部为空时, 从持久化存储按优先级载入下一批URL
+        
+        Returns:
+            是否载入了URL
+        """
+        with self._refill_lock:
+            if any(self._heaps):
+                return True
+            
+            # 已在延迟队列中的URL仍是磁盘上的待爬URL, 补充时跳过
+            with self._domain_lock:
+                deferred = set(self._deferred_hashes)
+            pending = (
+                p_url for p_url in self._store.iter_pending()
+                if url_fingerprint(p_url.normalized) not in deferred
+            )
+            batch = [
+                (p_url.priority, next(self._seq), p_url)
+                for p_url in itertools.islice(
+                    pending, 
+                    self._heap_bound * len(self._heaps)
+                )
+            ]
+            # 有序列表本身满足堆性质, 轮流分配后各堆仍然有序
+            for i, lock in enumerate(self._heap_locks):
+                with lock:
+                    self._heaps[i].extend(batch[i::len(self._heaps)])
+            return bool(batch)
+    
+    @property
+    def total_added(self) -> int:
+        return self._total_added.value
+    
+    @property
+    def total_popped(self) -> int:
+        return self._total_popped.value
+    
+    @property
+    def duplicates_skipped(self) -> int:
+        return self._duplicates_skipped.value
+    
+    @property
+    def evicted(self) -> int:
+        return self._evicted.value
     
     def add(
         self,
@@ -145,45 +597,148 @@ class URLFrontier:
         Returns:
             是否成功添加
         """
-        # 规范化URL
-        normalized = normalize_url(url)
+        return self.add_prepared(
+            normalize_url(url), url, depth, priority,
+            source_url, link_type, ai_score, reason
+        )
+    
+    def add_prepared(
+        self,
+        normalized: str,
+        url: str,
+        depth: int,
+        priority: float = 0.0,
+        source_url: str = "",
+        link_type: str = "general",
+        ai_score: float = 0.0,
+        reason: str = ""
+    ) -> bool:
+        """
+        添加已规范化的URL到队列 (参数同add, normalized为normalize_url(url)的结果)
         
-        # 检查是否已访问或在队列中
-        if normalized in self._visited or normalized in self._in_queue:
-            self.duplicates_skipped += 1
-            return False
+        Returns:
+            是否成功添加
+        """
+        return bool(self.add_batch([(
+            normalized, url, depth, priority,
+            source_url, link_type, ai_score, reason
+        )]))
+    
+    def add_batch(self, items: List[FrontierItem]) -> List[PrioritizedURL]:
+        """
+        批量添加已规范化的URL
         
-        # 深度检查
-        if depth > self.max_depth:
-            return False
+        每个元素为 (normalized, url, depth, priority, source_url, link_type, ai_score, reason);
+        整批只获取一次去重锁, 按内部堆分组后每个堆只加锁一次,
+        分组较大时直接 extend + heapify (O(n)), 否则逐个 heappush
         
-        # 计算最终优先级 (负数，因为heapq是最小堆)
-        final_priority = self._calculate_priority(
-            priority, depth, link_type, ai_score
-        )
+        Returns:
+            成功添加的URL列表
+        """
+        # 检查是否已访问或在队列中, 未重复则占位, 并发添加同一URL只有一个成功
+        fps = [url_fingerprint(item[0]) for item in items]
+        accepted = []
+        duplicates = 0
+        with self._visited_lock:
+            for item, fp in zip(items, fps):
+                if fp in self._in_queue_hashes or self._is_visited_fp(fp):
+                    duplicates += 1
+                elif item[2] <= self.max_depth:
+                    self._in_queue_hashes.add(fp)
+                    accepted.append(item)
+        if duplicates:
+            self._duplicates_skipped.incr(duplicates)
+        if not accepted:
+            return []
         
-        # 创建优先级URL对象
-        p_url = PrioritizedURL(
-            priority=final_priority,
-            url=url,
-            depth=depth,
-            source_url=source_url,
-            link_type=link_type,
-            ai_score=ai_score,
-            reason=reason
-        )
+        # 最终优先级: -(base + ai_score*2 + type_bonus - depth*depth_penalty),
+        # 负数因为heapq是最小堆, 越小越优先
+        depth_penalty = self.depth_penalty
+        type_bonus = TYPE_BONUS.get
+        added = [
+            PrioritizedURL(
+                priority=-(priority + ai_score * 2 
+                           + type_bonus(link_type, 0.0) 
+                           - depth * depth_penalty),
+                url=url,
+                depth=depth,
+                source_url=source_url,
+                link_type=link_type,
+                ai_score=ai_score,
+                reason=reason,
+                normalized=normalized
+            )
+            for normalized, url, depth, priority, source_url, link_type, ai_score, reason in accepted
+        ]
+        if self._store is not None:
+            for p_url in added:
+                p_url.store_key = self._store.push(p_url)
         
-        # 添加到堆
-        heapq.heappush(self._heap, p_url)
-        self._in_queue.add(normalized)
+        # 从随机位置开始轮流分配到各内部堆
+        seq = self._seq
+        entries = [(p_url.priority, next(seq), p_url) for p_url in added]
+        n = len(self._heaps)
+        offset = random.randrange(n)
+        evicted = []
+        for k in range(min(n, len(entries))):
+            i = (offset + k) % n
+            group = entries[k::n]
+            with self._heap_locks[i]:
+                heap = self._heaps[i]
+                if len(group) * 8 > len(heap):
+                    heap.extend(group)
+                    heapq.heapify(heap)
+                else:
+                    for entry in group:
+                        heapq.heappush(heap, entry)
+                if len(heap) > self._heap_trim_at:
+                    evicted.extend(entry[2] for entry in self._trim_heap(heap))
         
         # 更新域名计数
-        domain = self._get_domain(url)
-        self._domain_counts[domain] = self._domain_counts.get(domain, 0) + 1
+        domains = [self._get_domain(p_url.url) for p_url in added]
+        with self._visited_lock:
+            for domain in domains:
+                self._domain_counts[domain] = self._domain_counts.get(domain, 0) + 1
         
-        self.total_added += 1
+        self._total_added.incr(len(added))
         
-        return True
+        if evicted:
+            if self._store is None:
+                self._release_evicted(evicted)
+            else:
+                # 被淘汰的URL仍保存在磁盘上, 内存堆取空后再载入
+                self._evicted.incr(len(evicted))
+        
+        return added
+    
+    def _trim_heap(self, heap: List[HeapEntry]) -> List[HeapEntry]:
+        """
+        截断单个内部堆, 只保留优先级最高的 _heap_bound 个URL (调用方持有该堆的锁)
+        
+        heapq是最小堆, heappushpop只能弹出堆顶 (优先级最高者), 无法直接淘汰
+        最差的URL; 因此允许堆超出容量一定余量, 再一次性截断, 摊销后每次添加仍为 O(log n)
+        
+        Returns:
+            被淘汰的URL列表
+        """
+        heap.sort()
+        evicted = heap[self._heap_bound:]
+        del heap[self._heap_bound:]
+        # 有序列表本身满足堆性质, 无需重新heapify
+        return evicted
+    
+    def _release_evicted(self, evicted: List[PrioritizedURL]):
+        """将被淘汰的URL移出队列集合并更新域名计数, 之后再次发现时可重新入队"""
+        fps = [url_fingerprint(p_url.normalized) for p_url in evicted]
+        domains = [self._get_domain(p_url.url) for p_url in evicted]
+        with self._visited_lock:
+            for fp in fps:
+                self._in_queue_hashes.discard(fp)
+            for domain in domains:
+                self._domain_counts[domain] = max(0, self._domain_counts.get(domain, 1) - 1)
+        
+        self._evicted.incr(len(evicted))
+        logger.debug(f"队列已满, 淘汰 {len(evicted)} 个低优先级URL")
     
     def pop(self) -> Optional[PrioritizedURL]:
         """
@@ -192,135 +747,352 @@ class URLFrontier:
         Returns:
             下一个要访问的URL，队列空返回None
         """
-        if not self._heap:
-            return None
+        explore = random.random() < self.exploration_rate
+        refilled = False
         
-        # 探索/利用策略
-        if random.random() < self.exploration_rate and len(self._heap) > 1:
-            # 探索: 随机选择
-            idx = random.randint(0, min(len(self._heap) - 1, 10))
-            # 交换到堆顶然后pop
-            self._heap[0], self._heap[idx] = self._heap[idx], self._heap[0]
-            heapq.heapify(self._heap)
+        while True:
+            if self.politeness_delay > 0:
+                p_url = self._pop_polite(explore)
+            else:
+                p_url = self._pop_any(explore)
+            if p_url is None:
+                # 内存堆已空, 尝试从持久化存储补充 (每次出队最多一次,
+                # 礼貌策略下返回None也可能只是所有域名都在冷却中)
+                if self._store is not None and not refilled and self._refill():
+                    refilled = True
+                    continue
+                return None
+            
+            # 更新状态: 标记已访问并移出队列集合 (同一锁内, 并发的add()不会重复入队)
+            fp = url_fingerprint(p_url.normalized)
+            domain = self._get_domain(p_url.url)
+            with self._visited_lock:
+                if self._store is not None:
+                    # 从磁盘补充时可能载入了已在内存堆中的URL, 重复的直接丢弃
+                    if self._store.is_visited(fp):
+                        continue
+                    self._store.commit_pop(p_url.store_key, fp)
+                else:
+                    self._visited_hashes.add(fp)
+                self._in_queue_hashes.discard(fp)
+                self._domain_counts[domain] = max(0, self._domain_counts.get(domain, 1) - 1)
+            
+            self._total_popped.incr()
+            
+            return p_url
+    
+    def _pop_any(self, explore: bool) -> Optional[PrioritizedURL]:
+        """从内部堆中出队一个URL, 所有堆都为空返回None"""
+        p_url = None
         
-        # 获取最高优先级URL
-        p_url = heapq.heappop(self._heap)
+        # 随机取两个堆, 从堆顶更优的那个出队; 锁被占用时换一对重试
+        for _ in range(2 * len(self._heaps)):
+            i = self._choose_heap()
+            if i is None:
+                break
+            if not self._heap_locks[i].acquire(blocking=False):
+                continue
+            try:
+                p_url = self._pop_from(self._heaps[i], explore)
+            finally:
+                self._heap_locks[i].release()
+            if p_url is not None:
+                return p_url
         
-        # 更新状态
-        normalized = normalize_url(p_url.url)
-        self._in_queue.discard(normalized)
-        self._visited.add(normalized)
+        # 回退: 依次检查每个堆, 保证队列非空时一定能取到URL
+        for heap, lock in zip(self._heaps, self._heap_locks):
+            with lock:
+                p_url = self._pop_from(heap, explore)
+            if p_url is not None:
+                return p_url
+        return None
+    
+    def _pop_polite(self, explore: bool) -> Optional[PrioritizedURL]:
+        """
+        按域名礼貌策略出队 (politeness_delay > 0 时使用)
         
-        # 更新域名计数
-        domain = self._get_domain(p_url.url)
-        self._domain_counts[domain] = max(0, self._domain_counts.get(domain, 1) - 1)
+        已结束冷却的延迟队列与内部堆按优先级竞争: 延迟队列中最优的可访问URL
+        不差于所有堆顶时直接取出, 否则从内部堆出队; 堆中取出的URL若域名已可访问
+        则直接返回 (探索时保留随机选择), 仍在冷却中则放入其域名的延迟队列, 继续检查,
+        最多检查 POLITENESS_SCAN 个. 没有可访问的URL时返回None (见next_ready_in)
+        """
+        for _ in range(POLITENESS_SCAN):
+            if not explore:
+                with self._domain_lock:
+                    ready = self._best_ready(time.monotonic())
+                    if ready is not None:
+                        top = self._peek_heaps()
+                        if top is None or ready[1][0] <= top:
+                            return self._claim(ready, time.monotonic())
+            
+            p_url = self._pop_any(explore)
+            now = time.monotonic()
+            with self._domain_lock:
+                if p_url is None:
+                    ready = self._best_ready(now)
+                    return self._claim(ready, now) if ready is not None else None
+                
+                domain = self._get_domain(p_url.url)
+                if self._domain_next_fetch.get(domain, 0.0) > now:
+                    self._defer(domain, p_url)
+                    continue
+                
+                # 取堆顶期间其他线程可能让更优的延迟URL结束冷却
+                ready = self._best_ready(now)
+                if ready is not None and not explore and ready[1][0] < p_url.priority:
+                    self._defer(domain, p_url)
+                    return self._claim(ready, now)
+                
+                self._domain_next_fetch[domain] = now + self.politeness_delay
+                return p_url
         
-        self.total_popped += 1
+        with self._domain_lock:
+            now = time.monotonic()
+            ready = self._best_ready(now)
+            return self._claim(ready, now) if ready is not None else None
+    
+    def _defer(self, domain: str, p_url: PrioritizedURL):
+        """放入域名的延迟队列 (调用方持有_domain_lock), 已在延迟队列中的重复URL直接丢弃"""
+        fp = url_fingerprint(p_url.normalized)
+        if fp in self._deferred_hashes:
+            return
+        self._deferred_hashes.add(fp)
+        heapq.heappush(
+            self._domain_queues.setdefault(domain, []),
+            (p_url.priority, next(self._seq), p_url)
+        )
+    
+    def _peek_heaps(self) -> Optional[float]:
+        """
+        所有内部堆堆顶中的最高优先级 (堆都为空返回None)
         
+        不加锁读取, 结果只用于与延迟队列比较
+        """
+        best = None
+        for heap in self._heaps:
+            try:
+                top = heap[0][0]
+            except IndexError:
+                continue
+            if best is None or top < best:
+                best = top
+        return best
+    
+    def _best_ready(self, now: float) -> Optional[Tuple[str, HeapEntry]]:
+        """
+        已结束冷却的域名中优先级最高的延迟URL (调用方持有_domain_lock)
+        
+        Returns:
+            (域名, 延迟队列堆顶), 没有可访问的域名返回None
+        """
+        best_domain = None
+        best_entry = None
+        next_fetch = self._domain_next_fetch
+        for domain, queue in self._domain_queues.items():
+            if next_fetch.get(domain, 0.0) <= now and (
+                best_entry is None or queue[0] < best_entry
+            ):
+                best_domain, best_entry = domain, queue[0]
+        if best_domain is None:
+            return None
+        return best_domain, best_entry
+    
+    def _claim(self, ready: Tuple[str, HeapEntry], now: float) -> PrioritizedURL:
+        """
+        取出 _best_ready 选中的延迟URL, 并设置该域名的下次可访问时间
+        (调用方持有_domain_lock)
+        """
+        domain, _ = ready
+        queue = self._domain_queues[domain]
+        p_url = heapq.heappop(queue)[2]
+        if not queue:
+            del self._domain_queues[domain]
+        self._deferred_hashes.discard(url_fingerprint(p_url.normalized))
+        self._domain_next_fetch[domain] = now + self.politeness_delay
         return p_url
     
-    def _calculate_priority(
-        self,
-        base_priority: float,
-        depth: int,
-        link_type: str,
-        ai_score: float
-    ) -> float:
-        """
-        计算最终优先级
-        
-        公式: -(base + ai_score + type_bonus - depth_penalty)
-        负数因为heapq是最小堆
-        """
-        # 类型加成
-        type_bonuses = {
-            'admission': 3.0,
-            'international': 2.5,
-            'financial': 2.0,
-            'academic': 1.5,
-            'research': 1.0,
-            'faculty': 0.5,
-            'news': -0.5,
-            'navigation': -1.0,
-            'general': 0.0
-        }
-        type_bonus = type_bonuses.get(link_type, 0.0)
+    def next_ready_in(self) -> Optional[float]:
+        """
+        延迟队列中最早结束冷却的域名还需等待的秒数
         
-        # 深度惩罚
-        depth_cost = depth * self.depth_penalty
+        Returns:
+            等待秒数 (已可访问为0), 延迟队列为空返回None
+        """
+        with self._domain_lock:
+            if not self._domain_queues:
+                return None
+            earliest = min(
+                self._domain_next_fetch.get(domain, 0.0) 
+                for domain in self._domain_queues
+            )
+        return max(0.0, earliest - time.monotonic())
+    
+    def _choose_heap(self) -> Optional[int]:
+        """
+        随机取两个内部堆, 返回堆顶优先级更高者的下标 (两个都为空返回None)
         
-        # 最终优先级 (负数，越小越优先)
-        final = -(base_priority + ai_score * 2 + type_bonus - depth_cost)
+        不加锁读取堆顶, 结果只用于选择, 出队时在锁内重新检查
+        """
+        if len(self._heaps) == 1:
+            return 0 if self._heaps[0] else None
         
-        return final
-    
-    def _get_domain(self, url: str) -> str:
-        """获取URL的域名"""
+        i, j = random.sample(range(len(self._heaps)), 2)
         try:
-            return urlparse(url).netloc.replace('www.', '')
-        except Exception:
-            return ""
+            top_i = self._heaps[i][0][0] if self._heaps[i] else None
+            top_j = self._heaps[j][0][0] if self._heaps[j] else None
+        except IndexError:
+            # 读取期间被其他线程取空
+            return i
+        
+        if top_i is None:
+            return j if top_j is not None else None
+        if top_j is None or top_i <= top_j:
+            return i
+        return j
     
-    def mark_visited(self, url: str):
-        """标记URL为已访问"""
-        normalized = normalize_url(url)
-        self._visited.add(normalized)
+    def _pop_from(
+        self, 
+        heap: List[HeapEntry], 
+        explore: bool
+    ) -> Optional[PrioritizedURL]:
+        """
+        从单个内部堆出队 (调用方持有该堆的锁)
+        
+        利用: 直接取堆顶; 探索: 弹出前几个候选, 随机选一个, 其余放回,
+        每次只需 O(k log n), 无需重建整个堆
+        """
+        if not heap:
+            return None
+        
+        # 获取最高优先级URL
+        if not explore or len(heap) == 1:
+            return heapq.heappop(heap)[2]
+        
+        # 探索: 在堆顶候选中随机选择
+        candidates = [
+            heapq.heappop(heap) 
+            for _ in range(min(len(heap), EXPLORATION_CANDIDATES))
+        ]
+        chosen = candidates.pop(random.randrange(len(candidates)))
+        for entry in candidates:
+            heapq.heappush(heap, entry)
+        return chosen[2]
     
-    def is_visited(self, url: str) -> bool:
-        """检查URL是否已访问"""
-        normalized = normalize_url(url)
-        return normalized in self._visited
+    def _get_domain(self, url: str) -> str:
+        """获取URL的域名"""
+        return get_url_domain(url) or ""
+    
+    def _is_visited_fp(self, fp: int) -> bool:
+        """指纹是否已访问 (调用方持有_visited_lock)"""
+        if self._store is not None:
+            return self._store.is_visited(fp)
+        return fp in self._visited_hashes
+    
+    def mark_visited(self, url: str, normalized: Optional[str] = None):
+        """标记URL为已访问 (可传入已规范化的URL, 避免重复规范化)"""
+        if normalized is None:
+            normalized = normalize_url(url)
+        fp = url_fingerprint(normalized)
+        with self._visited_lock:
+            if self._store is not None:
+                self._store.add_visited(fp)
+            else:
+                self._visited_hashes.add(fp)
+    
+    def is_visited(self, url: str, normalized: Optional[str] = None) -> bool:
+        """检查URL是否已访问 (可传入已规范化的URL, 避免重复规范化)"""
+        if normalized is None:
+            normalized = normalize_url(url)
+        fp = url_fingerprint(normalized)
+        with self._visited_lock:
+            return self._is_visited_fp(fp)
     
     def get_visited_count(self) -> int:
         """获取已访问URL数量"""
-        return len(self._visited)
+        with self._visited_lock:
+            if self._store is not None:
+                return self._store.visited_count
+            return len(self._visited_hashes)
     
     def get_queue_size(self) -> int:
-        """获取队列大小"""
-        return len(self._heap)
+        """获取队列大小 (各内部堆与延迟队列长度之和; 持久化时为磁盘上的待爬URL数)"""
+        if self._store is not None:
+            return len(self._in_queue_hashes)
+        return sum(len(heap) for heap in self._heaps) + len(self._deferred_hashes)
     
     def is_empty(self) -> bool:
         """检查队列是否为空"""
-        return len(self._heap) == 0
+        if self._store is not None:
+            return not self._in_queue_hashes
+        return not any(self._heaps) and not self._deferred_hashes
     
     def clear(self):
         """清空队列"""
-        self._heap.clear()
-        self._visited.clear()
-        self._in_queue.clear()
-        self._domain_counts.clear()
-        self.total_added = 0
-        self.total_popped = 0
-        self.duplicates_skipped = 0
+        for heap, lock in zip(self._heaps, self._heap_locks):
+            with lock:
+                heap.clear()
+        with self._domain_lock:
+            self._domain_queues.clear()
+            self._domain_next_fetch.clear()
+            self._deferred_hashes.clear()
+        with self._visited_lock:
+            self._visited_hashes.clear()
+            self._in_queue_hashes.clear()
+            self._domain_counts.clear()
+            if self._store is not None:
+                self._store.clear()
+        self._total_added.reset()
+        self._total_popped.reset()
+        self._duplicates_skipped.reset()
+        self._evicted.reset()
+    
+    def close(self):
+        """关闭持久化存储 (未启用持久化时无操作)"""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
     
     def get_stats(self) -> Dict:
         """获取队列统计"""
+        queue_size = self.get_queue_size()
+        visited_count = self.get_visited_count()
+        with self._visited_lock:
+            unique_domains = len(self._domain_counts)
+        with self._domain_lock:
+            deferred = len(self._deferred_hashes)
+        
         return {
-            'queue_size': len(self._heap),
-            'visited_count': len(self._visited),
+            'queue_size': queue_size,
+            'visited_count': visited_count,
             'total_added': self.total_added,
             'total_popped': self.total_popped,
             'duplicates_skipped': self.duplicates_skipped,
-            'unique_domains': len(self._domain_counts)
+            'evicted_low_priority': self.evicted,
+            'unique_domains': unique_domains,
+            'deferred_by_politeness': deferred
         }
     
     def peek_top(self, n: int = 5) -> List[Dict]:
         """查看队列前N个URL (不移除)"""
-        # 复制堆以避免修改
-        temp_heap = self._heap.copy()
-        result = []
+        # 各内部堆和延迟队列只取前n个 (nsmallest不复制整个堆), 再合并取全局前n个
+        candidates = []
+        for heap, lock in zip(self._heaps, self._heap_locks):
+            with lock:
+                candidates.extend(heapq.nsmallest(n, heap))
+        with self._domain_lock:
+            for queue in self._domain_queues.values():
+                candidates.extend(heapq.nsmallest(n, queue))
         
-        for _ in range(min(n, len(temp_heap))):
-            p_url = heapq.heappop(temp_heap)
-            result.append({
+        return [
+            {
                 'url': p_url.url,
                 'priority': -p_url.priority,  # 还原为正数
                 'depth': p_url.depth,
                 'type': p_url.link_type,
                 'ai_score': p_url.ai_score
-            })
-        
-        return result
+            }
+            for _, _, p_url in heapq.nsmallest(n, candidates)
+        ]
 
 
 # ============ 全局状态 (CleanRL风格) ============
@@ -329,34 +1101,182 @@ URL_FRONTIER: URLFrontier = URLFrontier()
 EXTRACTED_DATA: List[Dict] = []
 ANALYZED_DATA: List[Dict] = []
 
+# 工作线程共享的浏览器池和静态页面获取器, 在main()中创建
+BROWSER_POOL: Optional[BrowserPool] = None
+STATIC_FETCHER: Optional[StaticFetcher] = None
+
+
+# 日志文件按大小轮转的阈值 (字节), 轮转文件的保留时间 (秒)
+LOG_ROTATION_SIZE = 10 * 1000 * 1000
+LOG_RETENTION = 7 * 86400.0
+
+
+# 与根目录logger_config.py中的实现保持一致 (本工具可单独运行, 不依赖上层包)
+class BatchedFileSink:
+    """
+    批量写入的日志文件sink
+    
+    loguru的文件处理器按行缓冲, 每条记录一次write系统调用。这里记录先追加到
+    内存缓冲区, 由后台线程每隔flush_interval秒、或缓冲区超过buffer_size时
+    一次写入; WARNING及以上级别的记录立即写入。
+    支持按大小轮转 (轮转文件命名与loguru一致: 名称.时间戳.后缀) 和按时间/个数清理。
+    
+    sink本身已是异步的, 添加时使用 enqueue=False; loguru移除处理器 (包括退出时)
+    会调用stop(), 写出剩余内容。
+    
+    使用示例:
+        sink = BatchedFileSink("logs/app.log", rotation_size=10_000_000, retention=7 * 86400)
+        logger.add(sink, format=FILE_FORMAT, level="DEBUG")
+    """
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        rotation_size: Optional[int] = None,
+        retention: Optional[Union[int, float]] = None,
+        flush_interval: float = 0.2,
+        buffer_size: int = 64 * 1024
+    ):
+        """
+        初始化批量写入sink
+        
+        Args:
+            path: 日志文件路径
+            rotation_size: 文件超过该字节数时轮转, None表示不轮转
+            retention: 轮转文件的保留策略, int表示保留个数, float表示保留秒数
+            flush_interval: 后台写入间隔 (秒)
+            buffer_size: 缓冲区超过该字节数时立即写入
+        """
+        self.path = Path(path)
+        self.rotation_size = rotation_size
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        
+        self._buffer = bytearray()
+        self._buffer_lock = threading.Lock()
+        # 写文件和轮转在同一把锁下进行, 后台线程和立即写入不会交错
+        self._io_lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = self._open()
+        self._size = os.fstat(self._fd).st_size
+        
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="log-flush", daemon=True
+        )
+        self._thread.start()
+    
+    def _open(self) -> int:
+        return os.open(str(self.path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    
+    def write(self, message: str):
+        """追加一条记录 (由loguru调用)"""
+        data = message.encode('utf-8')
+        record = getattr(message, 'record', None)
+        urgent = record is not None and record['level'].no >= 30
+        
+        with self._buffer_lock:
+            self._buffer += data
+            urgent = urgent or len(self._buffer) >= self.buffer_size
+        
+        if urgent:
+            self.flush_buffer()
+    
+    def flush_buffer(self):
+        """把缓冲区内容一次写入文件, 需要时先轮转"""
+        with self._io_lock:
+            with self._buffer_lock:
+                if not self._buffer:
+                    return
+                data = bytes(self._buffer)
+                self._buffer.clear()
+            
+            if (self.rotation_size is not None and self._size 
+                    and self._size + len(data) > self.rotation_size):
+                self._rotate()
+            
+            view = memoryview(data)
+            while view:
+                written = os.write(self._fd, view)
+                view = view[written:]
+            self._size += len(data)
+    
+    def _rotate(self):
+        """关闭当前文件, 改名为带时间戳的文件后重新打开, 再按保留策略清理"""
+        os.close(self._fd)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        os.replace(
+            self.path, 
+            self.path.with_name(f"{self.path.stem}.{timestamp}{self.path.suffix}")
+        )
+        self._fd = self._open()
+        self._size = 0
+        
+        if self.retention is not None:
+            self._cleanup()
+    
+    def _cleanup(self):
+        """删除超出保留策略的轮转文件"""
+        rotated = [
+            p for p in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}")
+            if p != self.path
+        ]
+        try:
+            rotated.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+            if isinstance(self.retention, int):
+                expired = rotated[self.retention:]
+            else:
+                cutoff = time.time() - self.retention
+                expired = [p for p in rotated if p.stat().st_mtime < cutoff]
+            for p in expired:
+                p.unlink()
+        except OSError:
+            pass
+    
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush_buffer()
+    
+    def stop(self):
+        """停止后台线程, 写出剩余内容并关闭文件 (由loguru调用)"""
+        self._stop_event.set()
+        self._thread.join()
+        self.flush_buffer()
+        os.close(self._fd)
+
 
 def setup_logging(config: Config):
     """配置日志系统"""
     # 移除默认处理器
     logger.remove()
     
-    # 控制台输出
+    # 控制台输出 (stderr不是终端时不着色, 使用无颜色标记的格式)
+    is_tty = sys.stderr.isatty()
     logger.add(
         sys.stderr,
-        format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}",
+        format=(
+            "<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}"
+            if is_tty else "{time:HH:mm:ss} | {level: <8} | {message}"
+        ),
         level=config.log_level,
-        colorize=True
+        colorize=is_tty
     )
     
     # 文件输出
     log_file = Path(config.storage.base_dir) / config.log_file
     logger.add(
-        log_file,
+        BatchedFileSink(log_file, rotation_size=LOG_ROTATION_SIZE, retention=LOG_RETENTION),
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
-        level="DEBUG",
-        rotation="10 MB"
+        level="DEBUG"
     )
     
     logger.info("日志系统初始化完成")
 
 
-def parse_args() -> argparse.Namespace:
-    """解析命令行参数"""
+def _build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
     parser = argparse.ArgumentParser(
         description='智能浏览器工具 - 基于AI的网页内容分析',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -419,11 +1339,31 @@ def parse_args() -> argparse.Namespace:
         help='最大爬取深度 (默认: 3)'
     )
     
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=4,
+        help='并发爬取线程数 (默认: 4)'
+    )
+    
+    parser.add_argument(
+        '--analysis-workers',
+        type=int,
+        default=2,
+        help='并发分析线程数, 即同时进行的模型调用数 (默认: 2)'
+    )
+    
     parser.add_argument(
         '--delay',
         type=float,
         default=1.5,
-        help='请求间隔秒数 (默认: 1.5)'
+        help='同一域名的请求间隔秒数 (默认: 1.5)'
+    )
+    
+    parser.add_argument(
+        '--frontier-path',
+        type=str,
+        help='URL队列持久化目录 (需要rocksdict), 重复使用同一目录可断点续爬'
     )
     
     # 探索/利用参数
@@ -476,6 +1416,19 @@ def parse_args() -> argparse.Namespace:
         help='分析模型 (默认: qwen3:1.7b)'
     )
     
+    parser.add_argument(
+        '--analysis-cache',
+        type=str,
+        choices=['exact', 'semantic-similarity'],
+        help='内容分析缓存策略, semantic-similarity 复用近似重复页面的分析结果 (默认: exact)'
+    )
+    
+    parser.add_argument(
+        '--embedding-model',
+        type=str,
+        help='语义缓存使用的嵌入模型 (默认: nomic-embed-text)'
+    )
+    
     # 其他
     parser.add_argument(
         '--verbose', '-v',
@@ -489,7 +1442,16 @@ def parse_args() -> argparse.Namespace:
         help='仅显示配置，不执行爬取'
     )
     
-    return parser.parse_args()
+    return parser
+
+
+# 解析器只在导入时构建一次, 测试/批量调用 parse_args 时直接复用
+_PARSER = _build_parser()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    return _PARSER.parse_args(argv)
 
 
 def build_config(args: argparse.Namespace) -> Config:
@@ -521,9 +1483,18 @@ def build_config(args: argparse.Namespace) -> Config:
     if args.max_depth:
         config.crawl.max_depth = args.max_depth
     
+    if args.workers:
+        config.crawl.max_workers = args.workers
+    
+    if args.analysis_workers:
+        config.crawl.analysis_workers = args.analysis_workers
+    
     if args.delay:
         config.crawl.request_delay = args.delay
     
+    if args.frontier_path:
+        config.crawl.frontier_path = args.frontier_path
+    
     if args.headless:
         config.selenium.headless = True
     elif args.no_headless:
@@ -541,6 +1512,12 @@ def build_config(args: argparse.Namespace) -> Config:
     if args.large_model:
         config.ollama.large_model = args.large_model
     
+    if args.analysis_cache:
+        config.ollama.analysis_cache_strategy = args.analysis_cache
+    
+    if args.embedding_model:
+        config.ollama.embedding_model = args.embedding_model
+    
     if args.verbose:
         config.log_level = "DEBUG"
     
@@ -554,41 +1531,90 @@ def build_config(args: argparse.Namespace) -> Config:
 
 def should_visit_url(url: str, config: Config) -> bool:
     """判断URL是否应该访问"""
-    # 检查是否已访问
+    # 检查是否已访问 (is_visited内部会规范化URL)
     if URL_FRONTIER.is_visited(url):
         return False
     
-    # 规范化URL
-    url_normalized = normalize_url(url)
-    if URL_FRONTIER.is_visited(url_normalized):
-        return False
-    
+    return is_allowed_url(url, config)
+
+
+def is_allowed_url(url: str, config: Config) -> bool:
+    """判断URL是否满足域名限制和排除模式 (不检查是否已访问)"""
+    return _is_allowed(get_url_domain(url), url.lower(), config)
+
+
+def _is_allowed(domain: Optional[str], url_lower: str, config: Config) -> bool:
+    """根据已解析的域名和小写URL检查域名限制和排除模式"""
     # 检查域名限制
-    try:
-        domain = urlparse(url).netloc.replace('www.', '')
-    except Exception:
+    if domain is None:
         return False
     
-    if config.crawl.allowed_domains:
-        allowed = any(
-            d in domain or domain.endswith('.' + d)
-            for d in config.crawl.allowed_domains
-        )
-        if not allowed:
-            return False
+    allowed_domains = config.crawl.allowed_domains
+    if allowed_domains and not _domain_allowed(domain, tuple(allowed_domains)):
+        return False
     
     # 检查排除模式
-    url_lower = url.lower()
-    for pattern in config.crawl.exclude_patterns:
-        if pattern in url_lower:
-            return False
+    return not get_exclude_matcher(tuple(config.crawl.exclude_patterns))(url_lower)
+
+
+@lru_cache(maxsize=4096)
+def _domain_allowed(domain: str, allowed_domains: Tuple[str, ...]) -> bool:
+    """
+    域名是否满足域名限制
+    
+    同一站点的链接域名高度重复, 按 (域名, 允许的域名) 缓存判断结果,
+    每个域名只扫描一次允许列表
+    """
+    return any(d in domain or domain.endswith('.' + d) for d in allowed_domains)
+
+
+@lru_cache(maxsize=8)
+def get_exclude_matcher(patterns: Tuple[str, ...]) -> Callable[[str], bool]:
+    """
+    将排除模式编译为一个多模式匹配器, 返回 matcher(url_lower) -> 是否命中任一模式
     
-    return True
+    优先使用Aho-Corasick自动机 (pyahocorasick), 否则回退到预编译的正则交替式;
+    两者都只需对URL做一次线性扫描, 开销与模式数量无关
+    """
+    patterns = tuple(p.lower() for p in patterns if p)
+    if not patterns:
+        return lambda url_lower: False
+    
+    if HAS_AHOCORASICK:
+        automaton = ahocorasick.Automaton()
+        for pattern in patterns:
+            automaton.add_word(pattern, pattern)
+        automaton.make_automaton()
+        return lambda url_lower: next(automaton.iter(url_lower), None) is not None
+    
+    regex = re.compile('|'.join(map(re.escape, patterns)))
+    return lambda url_lower: regex.search(url_lower) is not None
+
+
+def _prepare_link(link: Dict, config: Config) -> Dict:
+    """
+    预先计算链接的规范化URL、域名、小写URL和过滤结果, 缓存在链接字典上
+    
+    之后的去重、过滤和入队都复用这些字段, 每个链接只解析一次
+    """
+    url = link['url']
+    link['_normalized'] = normalize_url(url)
+    link['_domain'] = get_url_domain(url)
+    link['_url_lower'] = url.lower()
+    link['_allowed'] = _is_allowed(link['_domain'], link['_url_lower'], config)
+    return link
+
+
+def should_visit_url_prepared(link: Dict, config: Config) -> bool:
+    """判断已预处理 (_prepare_link) 的链接是否应该访问"""
+    if not link['_allowed']:
+        return False
+    return not URL_FRONTIER.is_visited(link['url'], normalized=link['_normalized'])
 
 
 def crawl_page(
     p_url: PrioritizedURL,
-    browser: BrowserEngine,
+    browser_pool: BrowserPool,
     processor: ContentProcessor,
     analyzer: AIAnalyzer,
     data_manager: DataManager,
@@ -598,15 +1624,18 @@ def crawl_page(
     爬取单个页面的完整流程
     
     步骤:
-    1. Selenium获取页面
+    1. 获取页面 (静态HTML直接请求, 否则从浏览器池借用Selenium)
     2. Trafilatura提取内容
     3. 0.5b模型分类
     4. 3b/4b模型深度分析 (如果需要)
     5. 3b/4b模型推荐URL并添加到队列
     
+    等价于依次执行 fetch_page_content (1-2) 和 analyze_page (3-5);
+    main() 中两个阶段在不同的线程池中流水线执行
+    
     Args:
         p_url: 优先级URL对象
-        browser: 浏览器引擎
+        browser_pool: 浏览器池
         processor: 内容处理器
         analyzer: AI分析器
         data_manager: 数据管理器
@@ -615,19 +1644,46 @@ def crawl_page(
     Returns:
         页面分析结果
     """
+    fetched = fetch_page_content(p_url, browser_pool, processor, data_manager, config)
+    if fetched is None:
+        return None
+    
+    content, title = fetched
+    return analyze_page(p_url, content, title, analyzer, data_manager, config)
+
+
+def fetch_page_content(
+    p_url: PrioritizedURL,
+    browser_pool: BrowserPool,
+    processor: ContentProcessor,
+    data_manager: DataManager,
+    config: Config
+) -> Optional[Tuple[Dict, str]]:
+    """
+    获取阶段: 获取页面并提取内容 (步骤1-2)
+    
+    Returns:
+        (提取的内容, 页面标题), 失败返回None
+    """
     url = p_url.url
     depth = p_url.depth
     
-    logger.info(f"{'='*60}")
-    logger.info(
+    logger.debug(
         f"[深度 {depth} | 优先级 {-p_url.priority:.2f}] "
         f"处理: {url[:60]}..."
     )
     
     # ========== Step 1: 获取页面 ==========
-    logger.info("Step 1: 使用Selenium获取页面...")
+    logger.debug("Step 1: 获取页面...")
     
-    page_result = browser.fetch_page(url)
+    page_result = None
+    if STATIC_FETCHER is not None:
+        page_result = STATIC_FETCHER.fetch_page(url)
+    
+    if page_result is None:
+        logger.debug("使用Selenium获取页面...")
+        with browser_pool.borrow() as browser:
+            page_result = browser.fetch_page(url)
     
     if not page_result or not page_result.get('success'):
         logger.warning(f"页面获取失败: {url}")
@@ -640,7 +1696,7 @@ def crawl_page(
     data_manager.save_raw(url, html, title)
     
     # ========== Step 2: 提取内容 ==========
-    logger.info("Step 2: 使用Trafilatura提取内容...")
+    logger.debug("Step 2: 使用Trafilatura提取内容...")
     
     content = processor.extract_content(html, url)
     
@@ -655,8 +1711,33 @@ def crawl_page(
     
     EXTRACTED_DATA.append(content)
     
+    return content, title
+
+
+def analyze_page(
+    p_url: PrioritizedURL,
+    content: Dict,
+    title: str,
+    analyzer: AIAnalyzer,
+    data_manager: DataManager,
+    config: Config
+) -> Dict:
+    """
+    分析阶段: 页面分类、深度分析并发现新URL (步骤3-5)
+    
+    各步骤的结果汇总为 events, 每个页面只输出一条INFO日志;
+    步骤细节使用DEBUG级别
+    
+    Returns:
+        页面分析结果
+    """
+    url = p_url.url
+    depth = p_url.depth
+    header = f"[深度 {depth} | 优先级 {-p_url.priority:.2f}] {url[:60]}"
+    events = []
+    
     # ========== Step 3: 页面分类 (0.5b模型) ==========
-    logger.info("Step 3: 使用0.5b模型进行页面分类...")
+    logger.debug("Step 3: 使用0.5b模型进行页面分类...")
     
     classification = analyzer.classify_page(
         title=content.get('title', title),
@@ -667,10 +1748,7 @@ def crawl_page(
     should_extract = classification.get('should_extract', True)
     confidence = classification.get('confidence', 0)
     
-    logger.info(
-        f"分类结果: {category} (置信度: {confidence:.2f}, "
-        f"深度分析: {'是' if should_extract else '否'})"
-    )
+    events.append(f"分类: {category} (置信度: {confidence:.2f})")
     
     content['category'] = category
     content['classification'] = classification
@@ -679,7 +1757,7 @@ def crawl_page(
     analysis = None
     
     if should_extract or confidence < 0.6:
-        logger.info("Step 4: 使用3b/4b模型进行深度分析...")
+        logger.debug("Step 4: 使用3b/4b模型进行深度分析...")
         
         analysis = analyzer.analyze_content(
             title=content.get('title', title),
@@ -700,12 +1778,13 @@ def crawl_page(
         data_manager.save_analyzed(url, analysis)
         ANALYZED_DATA.append(analysis)
         
-        logger.info(
-            f"分析完成 - 相关性: {analysis.get('relevance_score', 0):.2f}, "
+        events.append(
+            f"相关性: {analysis.get('relevance_score', 0):.2f}, "
             f"关键点: {len(analysis.get('key_points', []))}"
         )
     else:
-        logger.info("Step 4: 跳过深度分析 (页面类型不需要)")
+        logger.debug("Step 4: 跳过深度分析 (页面类型不需要)")
+        events.append("跳过深度分析")
         
         # 保存基本分析
         analysis = {
@@ -720,83 +1799,128 @@ def crawl_page(
     
     # ========== Step 5: 发现新URL (智能队列管理) ==========
     if depth < config.crawl.max_depth:
-        logger.info("Step 5: 分析链接并添加到优先级队列...")
+        logger.debug("Step 5: 分析链接并添加到优先级队列...")
         
-        links = content.get('links', [])
+        # 每个链接只解析一次, 结果缓存在链接字典上
+        links = [_prepare_link(l, config) for l in content.get('links', [])]
         
         # 过滤已访问的链接
         unvisited_links = [
             l for l in links 
-            if should_visit_url(l['url'], config)
+            if should_visit_url_prepared(l, config)
         ]
+        prepared = {l['url']: l for l in unvisited_links}
         
         if unvisited_links:
-            # 使用AI推荐URL
-            recommended = analyzer.recommend_urls(
-                current_url=url,
-                summary=analysis.get('summary', content.get('text_preview', '')),
-                links=unvisited_links,
-                visited_urls=set()  # 已在should_visit_url中检查
-            )
+            # 高价值类型的链接 (内容处理器已按URL关键词分类) 直接入队
+            fast_accept = [
+                l for l in unvisited_links 
+                if l.get('type') in FAST_ACCEPT_TYPES
+            ]
+            needs_llm = [
+                l for l in unvisited_links 
+                if l.get('type') not in FAST_ACCEPT_TYPES
+            ]
+            fast_added = URL_FRONTIER.add_batch([
+                (
+                    link['_normalized'], link['url'], depth + 1,
+                    link.get('priority', 0), url, link['type'],
+                    0, 'fast_accept'
+                )
+                for link in fast_accept
+            ])
+            
+            # 其余链接只取优先级最高的一部分交给AI推荐, prompt长度与页面链接数无关
+            recommended = []
+            if needs_llm:
+                recommended = analyzer.recommend_urls(
+                    current_url=url,
+                    summary=analysis.get('summary', content.get('text_preview', '')),
+                    # 候选链接已经should_visit_url_prepared按规范化指纹检查过是否访问,
+                    # 不再传visited_urls (按原始URL字符串再过滤一遍)
+                    links=needs_llm[:LLM_LINK_CANDIDATES]
+                )
             
-            # 添加推荐的URL到优先级队列
-            added_count = 0
+            # 添加推荐的URL到优先级队列 (整批入队)
+            rec_items = []
             for rec in recommended:
                 rec_url = rec.get('url')
-                if rec_url and should_visit_url(rec_url, config):
-                    # 计算优先级
+                if not rec_url:
+                    continue
+                # 模型可能返回不在候选列表中的URL, 此时现场预处理
+                link = prepared.get(rec_url) or _prepare_link({'url': rec_url}, config)
+                if should_visit_url_prepared(link, config):
                     ai_score = rec.get('priority', 0)
-                    link_type = rec.get('type', 'general')
-                    reason = rec.get('reason', '')
-                    
-                    # 添加到边界队列
-                    if URL_FRONTIER.add(
-                        url=rec_url,
-                        depth=depth + 1,
-                        priority=ai_score,
-                        source_url=url,
-                        link_type=link_type,
-                        ai_score=ai_score,
-                        reason=reason
-                    ):
-                        added_count += 1
-                        logger.debug(
-                            f"添加URL: {rec_url[:50]}... "
-                            f"(优先级: {ai_score}, 类型: {link_type})"
-                        )
+                    rec_items.append((
+                        link['_normalized'], rec_url, depth + 1, ai_score, url,
+                        rec.get('type', 'general'), ai_score, rec.get('reason', '')
+                    ))
+            
+            added = URL_FRONTIER.add_batch(rec_items)
+            added_count = len(added)
+            for added_url in added:
+                logger.debug(
+                    f"添加URL: {added_url.url[:50]}... "
+                    f"(优先级: {added_url.ai_score}, 类型: {added_url.link_type})"
+                )
             
             # 同时添加一些未被AI推荐但可能有用的链接 (探索)
             recommended_urls = {r.get('url') for r in recommended}
             exploration_links = [
-                l for l in unvisited_links 
+                l for l in needs_llm 
                 if l['url'] not in recommended_urls
             ]
             
-            # 随机添加一些探索链接
-            random.shuffle(exploration_links)
-            for link in exploration_links[:5]:  # 最多5个探索链接
-                if should_visit_url(link['url'], config):
-                    URL_FRONTIER.add(
-                        url=link['url'],
-                        depth=depth + 1,
-                        priority=link.get('priority', 0),
-                        source_url=url,
-                        link_type=link.get('type', 'general'),
-                        ai_score=0,  # 探索链接无AI评分
-                        reason='exploration'
-                    )
+            # 随机抽取最多5个探索链接 (部分洗牌, 无需打乱整个列表)
+            sampled = random.sample(
+                exploration_links, min(5, len(exploration_links))
+            )
+            URL_FRONTIER.add_batch([
+                (
+                    link['_normalized'], link['url'], depth + 1,
+                    link.get('priority', 0), url, link.get('type', 'general'),
+                    0,  # 探索链接无AI评分
+                    'exploration'
+                )
+                for link in sampled
+                if should_visit_url_prepared(link, config)
+            ])
             
-            logger.info(
-                f"添加了 {added_count} 个推荐URL, "
+            events.append(
+                f"推荐URL: {added_count}, 高价值URL: {len(fast_added)}, "
                 f"队列大小: {URL_FRONTIER.get_queue_size()}"
             )
     
+    logger.bind(url=url, depth=depth, events=events).info(
+        f"{header} | {' | '.join(events)}"
+    )
+    
     return analysis
 
 
+def fetch_task(
+    p_url: PrioritizedURL,
+    processor: ContentProcessor,
+    data_manager: DataManager,
+    config: Config
+) -> Optional[Tuple[Dict, str]]:
+    """
+    获取线程任务: 获取并提取一个页面, 需要时从浏览器池借用浏览器
+    
+    请求间隔由URL_FRONTIER按域名控制, 获取线程本身不再休眠
+    """
+    return fetch_page_content(
+        p_url=p_url,
+        browser_pool=BROWSER_POOL,
+        processor=processor,
+        data_manager=data_manager,
+        config=config
+    )
+
+
 def main():
     """主函数"""
-    global URL_FRONTIER, EXTRACTED_DATA, ANALYZED_DATA
+    global URL_FRONTIER, EXTRACTED_DATA, ANALYZED_DATA, BROWSER_POOL, STATIC_FETCHER
     
     # 解析参数
     args = parse_args()
@@ -821,9 +1945,17 @@ def main():
     logger.info(f"最大页面: {config.crawl.max_pages}")
     logger.info(f"最大深度: {config.crawl.max_depth}")
     logger.info(f"探索率: {args.exploration_rate}")
+    logger.info(
+        f"并发线程: 获取 {config.crawl.max_workers}, "
+        f"分析 {config.crawl.analysis_workers}"
+    )
     logger.info(f"输出目录: {config.storage.base_dir}")
+    if config.crawl.frontier_path:
+        logger.info(f"队列持久化: {config.crawl.frontier_path}")
     logger.info(f"小模型: {config.ollama.small_model}")
     logger.info(f"大模型: {config.ollama.large_model}")
+    if config.ollama.analysis_cache_strategy == "semantic-similarity":
+        logger.info(f"语义缓存: {config.ollama.embedding_model}")
     
     if args.dry_run:
         logger.info("Dry run模式 - 仅显示配置")
@@ -836,25 +1968,35 @@ def main():
     
     try:
         data_manager = DataManager(config)
-        browser = BrowserEngine(config)
         processor = ContentProcessor(config)
         analyzer = AIAnalyzer(config, config.user_intent)
+        # 浏览器按需创建, 每个工作线程最多占用一个
+        BROWSER_POOL = BrowserPool(config, size=config.crawl.max_workers)
+        if config.crawl.static_fetch:
+            STATIC_FETCHER = StaticFetcher(config, pool_size=config.crawl.max_workers)
     except Exception as e:
         logger.error(f"组件初始化失败: {e}")
-        logger.debug(get_err_message())
+        logger.opt(exception=True).debug("异常堆栈")
         sys.exit(1)
     
     # 初始化URL边界队列
     URL_FRONTIER = URLFrontier(
         exploration_rate=args.exploration_rate,
         depth_penalty=0.1,
-        max_depth=config.crawl.max_depth
+        max_depth=config.crawl.max_depth,
+        num_queues=2 * config.crawl.max_workers,
+        max_size=max(1000, config.crawl.max_pages * 4),
+        storage_path=config.crawl.frontier_path,
+        politeness_delay=config.crawl.request_delay
     )
     
     # 重置状态
     EXTRACTED_DATA.clear()
     ANALYZED_DATA.clear()
     
+    # 从上次运行恢复的队列条目入队时的域名限制/排除模式可能与本次不同
+    resumed_frontier = not URL_FRONTIER.is_empty()
+    
     # 添加起始URL (最高优先级)
     URL_FRONTIER.add(
         url=config.start_url,
@@ -873,69 +2015,137 @@ def main():
     start_time = time.time()
     pages_processed = 0
     
+    # 两级流水线: 获取线程池负责 获取 -> 提取, 分析线程池负责 分类 -> 分析 -> 发现URL;
+    # 页面在等待模型响应时, 获取线程已经在处理后续页面. 主线程负责分派URL并在阶段间转交
+    max_workers = config.crawl.max_workers
+    analysis_workers = config.crawl.analysis_workers
+    fetch_executor = ThreadPoolExecutor(
+        max_workers=max_workers, 
+        thread_name_prefix='fetcher'
+    )
+    analyze_executor = ThreadPoolExecutor(
+        max_workers=analysis_workers, 
+        thread_name_prefix='analyzer'
+    )
+    fetching: Dict[Future, PrioritizedURL] = {}
+    analyzing: Dict[Future, PrioritizedURL] = {}
+    
     try:
-        while not URL_FRONTIER.is_empty() and pages_processed < config.crawl.max_pages:
-            # 获取下一个URL (使用探索/利用策略)
-            p_url = URL_FRONTIER.pop()
+        while pages_processed < config.crawl.max_pages:
+            # 补充获取任务: 已完成与处理中的页面数之和不超过上限,
+            # 分析阶段积压过多时暂停获取
+            starved = False
+            while (len(fetching) < max_workers and 
+                   len(analyzing) < max_workers + analysis_workers and
+                   pages_processed + len(fetching) + len(analyzing) < config.crawl.max_pages):
+                # 获取下一个URL (使用探索/利用策略, 出队时已标记为已访问)
+                p_url = URL_FRONTIER.pop()
+                
+                if not p_url:
+                    starved = True
+                    break
+                
+                # 本次运行入队的链接在入队前已检查过域名限制和排除模式,
+                # 只有恢复的队列需要在出队时重新检查
+                if resumed_frontier and not is_allowed_url(p_url.url, config):
+                    continue
+                
+                future = fetch_executor.submit(
+                    fetch_task,
+                    p_url=p_url,
+                    processor=processor,
+                    data_manager=data_manager,
+                    config=config
+                )
+                fetching[future] = p_url
             
-            if not p_url:
-                break
+            # 队列中的URL所属域名都在冷却中时, 最多等到最早的域名结束冷却
+            ready_in = URL_FRONTIER.next_ready_in() if starved else None
             
-            # 双重检查是否应该访问
-            if not should_visit_url(p_url.url, config):
+            # 队列为空且没有处理中的页面, 爬取结束
+            if not fetching and not analyzing:
+                if ready_in is None:
+                    break
+                time.sleep(ready_in)
                 continue
             
-            # 标记为已访问
-            URL_FRONTIER.mark_visited(p_url.url)
-            
-            # 处理页面
-            result = crawl_page(
-                p_url=p_url,
-                browser=browser,
-                processor=processor,
-                analyzer=analyzer,
-                data_manager=data_manager,
-                config=config
+            # 等待任一阶段完成: 获取完成的页面转交分析, 分析完成时其发现的URL已加入队列
+            done, _ = wait(
+                list(fetching) + list(analyzing), 
+                timeout=ready_in,
+                return_when=FIRST_COMPLETED
             )
             
-            if result:
-                pages_processed += 1
+            for future in done:
+                if future in fetching:
+                    p_url = fetching.pop(future)
+                    try:
+                        fetched = future.result()
+                    except Exception as e:
+                        logger.error(f"页面获取失败: {p_url.url} - {e}")
+                        logger.opt(exception=True).debug("异常堆栈")
+                        continue
+                    
+                    if fetched:
+                        content, title = fetched
+                        analysis_future = analyze_executor.submit(
+                            analyze_page,
+                            p_url=p_url,
+                            content=content,
+                            title=title,
+                            analyzer=analyzer,
+                            data_manager=data_manager,
+                            config=config
+                        )
+                        analyzing[analysis_future] = p_url
+                    continue
+                
+                p_url = analyzing.pop(future)
                 
-                # 显示队列状态
-                if pages_processed % 5 == 0:
-                    stats = URL_FRONTIER.get_stats()
-                    logger.info(
-                        f"进度: {pages_processed}/{config.crawl.max_pages} | "
-                        f"队列: {stats['queue_size']} | "
-                        f"已访问: {stats['visited_count']}"
-                    )
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"页面处理失败: {p_url.url} - {e}")
+                    logger.opt(exception=True).debug("异常堆栈")
+                    continue
+                
+                if result:
+                    pages_processed += 1
                     
-                    # 显示队列顶部URL
-                    top_urls = URL_FRONTIER.peek_top(3)
-                    if top_urls:
-                        logger.debug("队列顶部URL:")
-                        for u in top_urls:
-                            logger.debug(
-                                f"  - {u['url'][:50]}... "
-                                f"(优先级: {u['priority']:.2f})"
-                            )
-            
-            # 请求间隔
-            if not URL_FRONTIER.is_empty():
-                delay = config.crawl.request_delay + random.uniform(-0.5, 0.5)
-                delay = max(0.5, delay)  # 至少0.5秒
-                time.sleep(delay)
+                    # 显示队列状态
+                    if pages_processed % 5 == 0:
+                        stats = URL_FRONTIER.get_stats()
+                        logger.info(
+                            f"进度: {pages_processed}/{config.crawl.max_pages} | "
+                            f"队列: {stats['queue_size']} | "
+                            f"已访问: {stats['visited_count']}"
+                        )
+                        
+                        # 显示队列顶部URL
+                        top_urls = URL_FRONTIER.peek_top(3)
+                        if top_urls:
+                            logger.debug("队列顶部URL:")
+                            for u in top_urls:
+                                logger.debug(
+                                    f"  - {u['url'][:50]}... "
+                                    f"(优先级: {u['priority']:.2f})"
+                                )
         
     except KeyboardInterrupt:
         logger.warning("用户中断爬取")
     
-    except Exception as e:
-        logger.error(f"爬取过程中发生错误: {e}")
-        logger.debug(get_err_message())
+    except Exception:
+        logger.exception("爬取过程中发生错误")
     
     finally:
-        # 关闭浏览器
-        browser.close()
+        # 等待处理中的页面完成, 再关闭浏览器
+        fetch_executor.shutdown(wait=True, cancel_futures=True)
+        analyze_executor.shutdown(wait=True, cancel_futures=True)
+        BROWSER_POOL.close()
+        if STATIC_FETCHER is not None:
+            STATIC_FETCHER.close()
+        # 压缩剩余的索引变更
+        data_manager.flush()
     
     elapsed = time.time() - start_time
     
@@ -955,11 +2165,12 @@ def main():
             if synthesized:
                 report_gen.generate_intent_report(synthesized)
         
-    except Exception as e:
-        logger.error(f"报告生成失败: {get_err_message()}")
+    except Exception:
+        logger.exception("报告生成失败")
     
     # 最终统计
     frontier_stats = URL_FRONTIER.get_stats()
+    URL_FRONTIER.close()
     
     logger.info("="*60)
     logger.info("爬取完成!")
@@ -969,12 +2180,25 @@ def main():
     logger.info(f"队列剩余: {frontier_stats['queue_size']}")
     logger.info(f"总添加URL: {frontier_stats['total_added']}")
     logger.info(f"跳过重复: {frontier_stats['duplicates_skipped']}")
+    logger.info(f"淘汰低优先级: {frontier_stats['evicted_low_priority']}")
     logger.info(f"唯一域名: {frontier_stats['unique_domains']}")
+    analyzer_stats = analyzer.get_stats()
+    logger.info(
+        f"分类缓存命中率: {analyzer_stats['classify_cache_hit_rate']:.1%} "
+        f"(精确 {analyzer_stats['classify_cache_hits']}, "
+        f"近似 {analyzer_stats['classify_cache_near_hits']})"
+    )
+    logger.info(
+        f"模型响应缓存命中率: {analyzer_stats['llm_cache_hit_rate']:.1%} "
+        f"(命中 {analyzer_stats['llm_cache_hits']}, "
+        f"未命中 {analyzer_stats['llm_cache_misses']})"
+    )
+    analyzer.close()
     logger.info(f"总耗时: {elapsed:.2f}秒")
     logger.info(f"输出目录: {config.storage.base_dir}")
     
     stats = data_manager.get_stats()
-    logger.info(f"数据统计: {json.dumps(stats, ensure_ascii=False)}")
+    logger.info(f"数据统计: {_json_bytes(stats).decode('utf-8')}")
 
 
 if __name__ == "__main__":
@@ -6,12 +6,108 @@ Prompt模板系统 - 为小模型(0.5b/3b)设计的简洁直接提示词
 - 结构化输出：要求JSON格式便于解析
 - 低温度：保证输出稳定性
 - 上下文感知：支持用户意图作为前缀
+- 前缀稳定：模板system消息在前、意图和动态内容在后，
+  相同模板的请求共享一致的前缀，便于模型服务复用前缀缓存
 
 参考: Qwen2.5最佳实践
 """
 
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+import keyword
+import os
+import re
+import string
+
+# ============ 可选依赖检测 ============
+
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+
+# ============ 按token截断 ============
+
+# 各字段的token预算 (代替按字符截断: 中文约1字1token, 英文约4字符1token)
+TITLE_TOKEN_BUDGET = 64
+PREVIEW_TOKEN_BUDGET = 128
+CONTENT_TOKEN_BUDGET = 1500
+SUMMARY_TOKEN_BUDGET = 128
+
+# 中日韩字符 (含全角标点), 估算时每个字符计1个token
+_CJK_RE = re.compile(r'[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]')
+
+_encoding = None
+
+
+def _get_encoding():
+    """
+    延迟加载tiktoken编码 (cl100k_base, 与Qwen分词器粒度接近)
+    
+    首次加载需要下载编码文件, 离线失败时返回None并改用估算
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    return _encoding or None
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    按token数截断文本
+    
+    安装tiktoken时按其分词结果截断; 否则估算: 中日韩字符每个1个token,
+    其他字符每4个1个token
+    
+    Args:
+        text: 文本
+        max_tokens: 最多保留的token数
+        
+    Returns:
+        截断后的文本
+    """
+    encoding = _get_encoding() if HAS_TIKTOKEN else None
+    if encoding is not None:
+        ids = encoding.encode(text, disallowed_special=())
+        if len(ids) <= max_tokens:
+            return text
+        # 截断点可能落在多字节字符中间, 去掉解码出的替换字符
+        return encoding.decode(ids[:max_tokens]).rstrip('\ufffd')
+    
+    # 每个字符至少1/4个token, 预算内的字符数不会超过 max_tokens * 4
+    if len(text) <= max_tokens:
+        return text
+    budget = max_tokens * 4  # 以1/4 token为单位
+    for i, ch in enumerate(text[:budget + 1]):
+        budget -= 4 if _CJK_RE.match(ch) else 1
+        if budget < 0:
+            return text[:i]
+    return text
+
+
+def _compile_template(template: str) -> Callable[..., str]:
+    """
+    把format模板编译为等价的f-string函数, 格式解析只在导入时做一次
+    
+    字段都是简单标识符时生成 lambda title, preview, **_: f'...';
+    含下标/属性等复杂字段时退回 str.format
+    """
+    fields = {
+        name for _, name, _, _ in string.Formatter().parse(template) 
+        if name is not None
+    }
+    if not all(name.isidentifier() and not keyword.iskeyword(name) for name in fields):
+        return template.format
+    
+    params = ''.join(f"{name}, " for name in sorted(fields))
+    return eval(f"lambda {params}**_: f{template!r}", {})
 
 
 @dataclass
@@ -20,15 +116,27 @@ class PromptTemplate:
     system: str
     user_template: str
     output_format: str
+    
+    def __post_init__(self):
+        self._render = _compile_template(self.user_template)
+    
+    def render(self, **fields) -> str:
+        """填充user_template (等价于 user_template.format(**fields))"""
+        return self._render(**fields)
+
+
+# 对话消息列表: [{'role': 'system'|'user', 'content': str}, ...]
+Messages = List[Dict[str, str]]
 
 
 # ============ 用户意图Prompt前缀 ============
 
+@lru_cache(maxsize=32)
 def build_intent_prefix(user_intent: str) -> str:
     """
-    构建用户意图前缀
+    构建用户意图前缀 (相同意图复用已构建的前缀)
     
-    这个前缀会添加到所有Prompt的system消息中，
+    这个前缀作为单独的system消息放在模板system消息之后，
     让模型理解用户的核心目标
     
     Args:
@@ -92,7 +200,7 @@ LINK_PRIORITY_PROMPT = PromptTemplate(
 - 1分: 略有关联
 - 0分: 无关或应跳过
 
-只输出JSON，不要解释。""",
+每个链接以[编号]开头，按编号返回评分。只输出JSON，不要解释。""",
 
     user_template="""意图: {intent}
 
@@ -103,13 +211,17 @@ LINK_PRIORITY_PROMPT = PromptTemplate(
 
     output_format="""{
   "scores": [
-    {"url": "链接1", "score": 3, "reason": "原因"},
-    {"url": "链接2", "score": 1, "reason": "原因"}
+    {"id": 0, "score": 3},
+    {"id": 1, "score": 1}
   ]
 }"""
 )
 
 
+# 链接评分每批的链接数, 链接较多时拆成多个Prompt
+LINK_PRIORITY_BATCH_SIZE = 50
+
+
 # ============ 0.5b模型 - 快速判断Prompt ============
 
 QUICK_RELEVANCE_PROMPT = PromptTemplate(
@@ -269,6 +381,11 @@ FILE_NAMING_PROMPT = PromptTemplate(
 class PromptBuilder:
     """
     Prompt构建器 - 组合意图和模板
+    
+    build_*方法返回消息列表, 按不变程度排列:
+    1. 模板system消息 (所有同类请求完全相同)
+    2. 用户意图前缀 (同一次爬取中不变)
+    3. user消息 (每次请求不同)
     """
     
     def __init__(self, user_intent: str = ""):
@@ -280,148 +397,194 @@ class PromptBuilder:
         """
         self.intent_prefix = build_intent_prefix(user_intent)
         self.user_intent = user_intent
+        
+        # (模板system, 是否带意图) -> 固定的前缀消息, 每个构建器只组装一次
+        self._prefix_cache: Dict[Tuple[str, bool], Messages] = {}
+    
+    def _build_messages(
+        self, 
+        template: PromptTemplate, 
+        user: str, 
+        with_intent: bool = True
+    ) -> Messages:
+        """
+        按 模板system -> 意图前缀 -> user 的顺序组装消息
+        
+        前缀消息在同一构建器的所有请求间共享, 调用方不应修改返回的消息字典
+        """
+        key = (template.system, with_intent)
+        prefix = self._prefix_cache.get(key)
+        if prefix is None:
+            prefix = [{'role': 'system', 'content': template.system}]
+            if with_intent and self.intent_prefix:
+                prefix.append({'role': 'system', 'content': self.intent_prefix})
+            self._prefix_cache[key] = prefix
+        
+        return [*prefix, {'role': 'user', 'content': user}]
     
     def build_classification_prompt(
         self, 
         title: str, 
         preview: str
-    ) -> Dict[str, str]:
+    ) -> Messages:
         """构建页面分类Prompt"""
         template = PAGE_CLASSIFICATION_PROMPT
         
-        return {
-            'system': self.intent_prefix + template.system,
-            'user': template.user_template.format(
-                title=title[:200],
-                preview=preview[:500]
+        return self._build_messages(
+            template,
+            template.render(
+                title=truncate_tokens(title, TITLE_TOKEN_BUDGET),
+                preview=truncate_tokens(preview, PREVIEW_TOKEN_BUDGET)
             )
-        }
+        )
     
-    def build_link_priority_prompt(
+    def build_link_priority_prompts(
         self, 
-        links: List[Dict]
-    ) -> Dict[str, str]:
-        """构建链接优先级Prompt"""
-        template = LINK_PRIORITY_PROMPT
+        links: List[Dict],
+        batch_size: int = LINK_PRIORITY_BATCH_SIZE
+    ) -> List[Messages]:
+        """
+        构建链接优先级Prompt
         
-        # 格式化链接列表
-        links_text = "\n".join([
-            f"- {l['url']}: {l.get('text', '')[:50]}"
-            for l in links[:20]  # 限制数量
-        ])
+        链接按batch_size拆分, 每批一个Prompt; 链接以其在links中的下标编号,
+        模型按编号返回评分 (比返回完整URL输出更短), 各批结果按编号合并
+        """
+        template = LINK_PRIORITY_PROMPT
+        prompts = []
         
-        return {
-            'system': self.intent_prefix + template.system,
-            'user': template.user_template.format(
-                intent=self.user_intent,
-                links=links_text
+        for start in range(0, len(links), batch_size):
+            # 格式化链接列表
+            links_text = "\n".join(
+                f"[{i}] {l['url']}: {l.get('text', '')[:50]}"
+                for i, l in enumerate(links[start:start + batch_size], start)
             )
-        }
+            
+            prompts.append(self._build_messages(
+                template,
+                template.render(
+                    intent=self.user_intent,
+                    links=links_text
+                )
+            ))
+        
+        return prompts
     
     def build_content_analysis_prompt(
         self, 
         title: str, 
         url: str, 
         content: str
-    ) -> Dict[str, str]:
+    ) -> Messages:
         """构建内容分析Prompt"""
         template = CONTENT_ANALYSIS_PROMPT
         
         # 限制内容长度
-        content = content[:5000] if len(content) > 5000 else content
+        content = truncate_tokens(content, CONTENT_TOKEN_BUDGET)
         
-        return {
-            'system': self.intent_prefix + template.system,
-            'user': template.user_template.format(
+        return self._build_messages(
+            template,
+            template.render(
                 title=title,
                 url=url,
                 content=content
             )
-        }
+        )
     
     def build_url_recommendation_prompt(
         self, 
         current_url: str, 
         summary: str, 
         links: List[Dict]
-    ) -> Dict[str, str]:
+    ) -> Messages:
         """构建URL推荐Prompt"""
         template = URL_RECOMMENDATION_PROMPT
         
         # 格式化链接
-        links_text = "\n".join([
+        links_text = "\n".join(
             f"- [{l.get('type', 'general')}] {l['url']}: {l.get('text', '')[:50]}"
-            for l in links[:30]
-        ])
+            for l in islice(links, 30)
+        )
         
-        return {
-            'system': self.intent_prefix + template.system,
-            'user': template.user_template.format(
+        return self._build_messages(
+            template,
+            template.render(
                 current_url=current_url,
-                summary=summary[:300],
+                summary=truncate_tokens(summary, SUMMARY_TOKEN_BUDGET),
                 links=links_text
             )
-        }
+        )
     
     def build_synthesis_prompt(
         self, 
         collected_info: List[Dict]
-    ) -> Dict[str, str]:
+    ) -> Messages:
         """构建信息整合Prompt"""
         template = INFO_SYNTHESIS_PROMPT
         
         # 格式化收集的信息
-        info_text = "\n\n".join([
+        info_text = "\n\n".join(
             f"[{info.get('url', 'unknown')}]\n{info.get('summary', '')}"
-            for info in collected_info[:10]
-        ])
+            for info in islice(collected_info, 10)
+        )
         
-        return {
-            'system': template.system,
-            'user': template.user_template.format(
+        return self._build_messages(
+            template,
+            template.render(
                 intent=self.user_intent,
                 collected_info=info_text
-            )
-        }
+            ),
+            with_intent=False
+        )
     
     def build_file_naming_prompt(
         self, 
         title: str, 
         category: str, 
         keywords: List[str]
-    ) -> Dict[str, str]:
+    ) -> Messages:
         """构建文件命名Prompt"""
         template = FILE_NAMING_PROMPT
         
-        return {
-            'system': template.system,
-            'user': template.user_template.format(
+        return self._build_messages(
+            template,
+            template.render(
                 title=title,
                 category=category,
                 keywords=', '.join(keywords[:5])
-            )
-        }
+            ),
+            with_intent=False
+        )
     
     def build_quick_relevance_prompt(
         self, 
         text: str
-    ) -> Dict[str, str]:
+    ) -> Messages:
         """构建快速相关性判断Prompt"""
         template = QUICK_RELEVANCE_PROMPT
         
-        return {
-            'system': template.system,
-            'user': template.user_template.format(
+        return self._build_messages(
+            template,
+            template.render(
                 intent=self.user_intent,
-                text=text[:500]
-            )
-        }
+                text=truncate_tokens(text, PREVIEW_TOKEN_BUDGET)
+            ),
+            with_intent=False
+        )
+
+
+@lru_cache(maxsize=8)
+def _read_intent_file(filepath: str, mtime_ns: int) -> str:
+    """读取意图文件 (按路径和修改时间缓存)"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return f.read().strip()
 
 
 def load_intent_from_file(filepath: str) -> str:
     """
     从文件加载用户意图
     
+    文件未修改时直接返回缓存的内容, 修改后重新读取
+    
     Args:
         filepath: prompt.txt文件路径
         
@@ -429,9 +592,7 @@ def load_intent_from_file(filepath: str) -> str:
         用户意图文本
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-        return content
+        return _read_intent_file(filepath, os.stat(filepath).st_mtime_ns)
     except Exception as e:
         return ""
 
@@ -447,8 +608,8 @@ if __name__ == "__main__":
         preview="Learn about applying to Stanford as an international student..."
     )
     print("=== 分类Prompt ===")
-    print(f"System: {prompt['system'][:200]}...")
-    print(f"User: {prompt['user']}")
+    for message in prompt:
+        print(f"{message['role']}: {message['content'][:200]}")
     
     # 测试内容分析Prompt
     prompt = builder.build_content_analysis_prompt(
@@ -457,4 +618,5 @@ if __name__ == "__main__":
         content="Stanford welcomes applications from students around the world..."
     )
     print("\n=== 内容分析Prompt ===")
-    print(f"System: {prompt['system'][:200]}...")
\ No newline at end of file
+    for message in prompt:
+        print(f"{message['role']}: {message['content'][:200]}")
\ No newline at end of file
@@ -19,10 +19,13 @@
 └── ...
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, TextIO
 from pathlib import Path
 from datetime import datetime
-import json
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import sys
 
 from loguru import logger
 
@@ -30,6 +33,91 @@ from config import Config
 from data_manager import DataManager
 
 
+# 作为关键发现收集的事实类型
+_KEY_FACT_TYPES = frozenset(map(sys.intern, ('deadline', 'requirement', 'date')))
+
+# 并行生成分类报告的最大线程数 (报告生成以文件写入为主)
+REPORT_WORKERS = 8
+
+
+# ============ 列表项渲染 ============
+# 模型输出的列表项可能是字符串或字典, 按类型查表选择渲染函数,
+# 代替逐项的 isinstance 判断; 表中没有的类型使用default (None表示跳过)
+
+def _render_plain(item: Any) -> str:
+    """渲染为普通列表项"""
+    return f"- {item}\n"
+
+
+_TEXT_RENDERERS = {
+    str: _render_plain,
+    dict: lambda item: f"- {item.get('text', str(item))}\n",
+}
+
+_ENTITY_VALUE_RENDERERS = {
+    str: _render_plain,
+    dict: lambda item: f"- {item.get('name', str(item))}\n",
+}
+
+_ENTITY_RENDERERS = {
+    str: _render_plain,
+    dict: lambda item: (
+        f"- **{item.get('type', 'entity')}**: "
+        f"{item.get('value', item.get('name', str(item)))}\n"
+    ),
+}
+
+_FACT_RENDERERS = {
+    str: _render_plain,
+    dict: lambda item: f"- **{item.get('type', 'info')}**: {item.get('value', '')}\n",
+}
+
+
+def _render_section(section: Dict) -> str:
+    """渲染意图报告中的一个章节"""
+    title = section.get('title', 'Section')
+    content = section.get('content', '')
+    sources = section.get('sources', [])
+    
+    # 确保content是字符串
+    if not isinstance(content, str):
+        content = str(content) if content else ''
+    
+    # 确保sources是列表
+    if isinstance(sources, list):
+        sources_str = ', '.join(str(s) for s in sources)
+    elif isinstance(sources, str):
+        sources_str = sources
+    else:
+        sources_str = str(sources) if sources else ''
+    
+    return f"""### {title}
+
+{content}
+
+*来源: {sources_str}*
+
+"""
+
+
+_SECTION_RENDERERS = {
+    dict: _render_section,
+    str: lambda section: f"{section}\n\n",
+}
+
+
+def _render_items(
+    items: Iterable[Any], 
+    renderers: Dict[type, Callable[[Any], str]], 
+    default: Optional[Callable[[Any], str]] = None
+) -> Iterator[str]:
+    """按类型查表渲染列表项, 逐项产出Markdown行"""
+    for item in items:
+        render = renderers.get(type(item), default)
+        if render is not None:
+            yield render(item)
+
+
 class ReportGenerator:
     """
     报告生成器 - 生成全方位的Markdown报告
@@ -56,40 +144,70 @@ class ReportGenerator:
         self.config = config
         self.data_manager = data_manager
         self.reports_dir = Path(config.storage.base_dir) / config.storage.reports_dir
+        # generate_all_reports 开始时记录的生成时间, 同一批报告共用
+        self._run_timestamp: Optional[str] = None
         
         logger.info("报告生成器初始化完成")
     
+    def _timestamp(self) -> str:
+        """报告中显示的生成时间 (同一批报告一致, 单独调用时取当前时间)"""
+        return self._run_timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
     def generate_all_reports(self) -> Dict[str, str]:
         """
         生成所有报告
         
         Returns:
             生成的报告路径字典
+        
+        统计信息和全部分析结果只读取一次, 按类别分组后传给各报告生成方法;
+        生成时间也只取一次, 之后的意图报告沿用同一时间
         """
         reports = {}
+        self._run_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        stats = self.data_manager.get_stats()
+        all_analyzed = self.data_manager.get_all_analyzed()
+        by_category = defaultdict(list)
+        for page in all_analyzed:
+            by_category[page.get('category', 'general')].append(page)
         
         # 1. 生成总览报告
-        summary_path = self.generate_summary_report()
+        summary_path = self.generate_summary_report(stats, all_analyzed)
         reports['summary'] = summary_path
         
         # 2. 生成分类索引
-        categories_path = self.generate_categories_index()
+        categories_path = self.generate_categories_index(stats)
         reports['categories'] = categories_path
         
-        # 3. 生成各分类报告
-        stats = self.data_manager.get_stats()
-        for category in stats.get('by_category', {}).keys():
-            cat_path = self.generate_category_report(category)
-            reports[f'category_{category}'] = cat_path
+        # 3. 生成各分类报告 (各分类写入独立目录, 并行生成)
+        categories = list(stats.get('by_category', {}).keys())
+        if categories:
+            with ThreadPoolExecutor(
+                max_workers=min(REPORT_WORKERS, len(categories))
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        self.generate_category_report, 
+                        category, by_category.get(category, [])
+                    )
+                    for category in categories
+                ]
+                for category, future in zip(categories, futures):
+                    reports[f'category_{category}'] = future.result()
         
         # 4. 生成数据导出
-        data_path = self.generate_data_export()
+        data_path = self.generate_data_export(stats)
         reports['data'] = data_path
         
         logger.success(f"生成了 {len(reports)} 个报告")
         return reports
     
-    def generate_summary_report(self) -> str:
+    def generate_summary_report(
+        self, 
+        stats: Optional[Dict] = None, 
+        all_analyzed: Optional[List[Dict]] = None
+    ) -> str:
         """
         生成总览报告
         
@@ -98,17 +216,36 @@ class ReportGenerator:
         - 爬取统计
         - 关键发现
         - 建议行动
+        
+        Args:
+            stats: 数据统计, None时从数据管理器读取
+            all_analyzed: 全部分析结果, None时从数据管理器读取
         """
-        stats = self.data_manager.get_stats()
-        all_analyzed = self.data_manager.get_all_analyzed()
+        if stats is None:
+            stats = self.data_manager.get_stats()
+        if all_analyzed is None:
+            all_analyzed = self.data_manager.get_all_analyzed()
         
         # 收集关键发现
         key_findings = self._collect_key_findings(all_analyzed)
         
-        # 构建报告内容
-        content = f"""# 📊 网页分析报告
+        return self._write_report(
+            'summary',
+            lambda f: self._write_summary(f, stats, all_analyzed, key_findings)
+        )
+    
+    def _write_summary(
+        self, 
+        f: TextIO, 
+        stats: Dict, 
+        all_analyzed: List[Dict], 
+        key_findings: List[str]
+    ):
+        """写入总览报告内容"""
+        write = f.write
+        write(f"""# 📊 网页分析报告
 
-> 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+> 生成时间: {self._timestamp()}
 
 ## 📋 任务概况
 
@@ -128,48 +265,32 @@ class ReportGenerator:
 
 ### 按类别分布
 
-"""
+""")
         
         # 类别分布
-        for cat, count in stats.get('by_category', {}).items():
-            content += f"- **{cat}**: {count} 页\n"
+        self._write_category_stats(f, stats)
         
         # 关键发现
-        content += f"""
+        write("""
 ## 🔍 关键发现
 
-"""
-        for i, finding in enumerate(key_findings[:10], 1):
-            content += f"{i}. {finding}\n"
+""")
+        f.writelines(
+            f"{i}. {finding}\n"
+            for i, finding in enumerate(key_findings[:10], 1)
+        )
         
         # 高相关页面
-        content += """
+        write("""
 ## ⭐ 高相关页面
 
 以下页面与您的意图最为相关:
 
-"""
-        # 按相关性排序
-        relevant_pages = sorted(
-            all_analyzed, 
-            key=lambda x: x.get('relevance_score', 0), 
-            reverse=True
-        )[:10]
-        
-        for page in relevant_pages:
-            score = page.get('relevance_score', 0)
-            title = page.get('title', 'Untitled')[:50]
-            url = page.get('url', '')
-            summary = page.get('summary', '')[:100]
-            
-            content += f"""### [{title}]({url})
-- 相关性评分: {score:.2f}
-- 摘要: {summary}...
-
-"""
+""")
+        self._write_relevant_pages(f, all_analyzed)
         
         # 建议行动
-        content += """
+        write("""
 ## 💡 建议行动
 
 根据分析结果，建议您:
@@ -181,31 +302,85 @@ class ReportGenerator:
 ---
 
 *报告由 Intelligent Browser Tool 自动生成*
-"""
-        
-        # 保存报告
-        filepath = self.data_manager.save_report(
-            name='summary',
-            content=content,
-            format='md'
+""")
+    
+    def _write_category_stats(self, f: TextIO, stats: Dict):
+        """写入类别分布列表"""
+        f.writelines(
+            f"- **{cat}**: {count} 页\n"
+            for cat, count in stats.get('by_category', {}).items()
+        )
+    
+    def _write_relevant_pages(self, f: TextIO, all_analyzed: List[Dict]):
+        """写入相关性最高的10个页面"""
+        # 按相关性取前10 (部分排序, 等价于sorted(..., reverse=True)[:10])
+        relevant_pages = heapq.nlargest(
+            10, 
+            all_analyzed, 
+            key=lambda x: x.get('relevance_score', 0)
         )
         
-        return filepath
+        for page in relevant_pages:
+            score = page.get('relevance_score', 0)
+            title = page.get('title', 'Untitled')[:50]
+            url = page.get('url', '')
+            summary = page.get('summary', '')[:100]
+            
+            f.write(f"""### [{title}]({url})
+- 相关性评分: {score:.2f}
+- 摘要: {summary}...
+
+""")
     
-    def generate_categories_index(self) -> str:
-        """生成分类索引"""
-        stats = self.data_manager.get_stats()
+    def _write_report(
+        self, 
+        name: str, 
+        write_content: Callable[[TextIO], None], 
+        category: str = None
+    ) -> str:
+        """
+        流式写入Markdown报告
+        
+        打开报告文件后由write_content逐段写入, 不在内存中拼接整个报告
+        
+        Args:
+            name: 报告名称
+            write_content: 写入报告内容的函数, 参数为打开的文件
+            category: 分类目录
+            
+        Returns:
+            保存的文件路径, 失败返回空字符串
+        """
+        filepath = self.data_manager.get_report_path(name, category, 'md')
+        
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                write_content(f)
+            
+            logger.debug(f"保存报告: {filepath}")
+            return str(filepath)
+            
+        except Exception as e:
+            logger.error(f"保存报告失败: {e}")
+            return ""
+    
+    def generate_categories_index(self, stats: Optional[Dict] = None) -> str:
+        """生成分类索引 (stats为None时从数据管理器读取)"""
+        if stats is None:
+            stats = self.data_manager.get_stats()
         
         content = f"""# 📁 分类索引
 
-> 更新时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+> 更新时间: {self._timestamp()}
 
 ## 目录
 
 """
         
-        for category, count in stats.get('by_category', {}).items():
-            content += f"- [{category}](./{category}/overview.md) ({count} 页)\n"
+        content += "".join(
+            f"- [{category}](./{category}/overview.md) ({count} 页)\n"
+            for category, count in stats.get('by_category', {}).items()
+        )
         
         content += """
 ## 分类说明
@@ -235,28 +410,50 @@ class ReportGenerator:
         
         return filepath
     
-    def generate_category_report(self, category: str) -> str:
+    def generate_category_report(
+        self, 
+        category: str, 
+        pages: Optional[List[Dict]] = None
+    ) -> str:
         """
         生成分类报告
         
         Args:
             category: 分类名称
+            pages: 该分类的分析结果, None时从数据管理器读取
             
         Returns:
             报告路径
         """
-        pages = self.data_manager.get_by_category(category)
+        if pages is None:
+            pages = self.data_manager.get_by_category(category)
         
         if not pages:
             return ""
         
-        content = f"""# 📂 {category.upper()} 分类报告
+        # 保存到分类目录
+        filepath = self._write_report(
+            'overview',
+            lambda f: self._write_category_overview(f, category, pages),
+            category=category
+        )
+        
+        # 同时生成各页面的详细报告
+        for page in pages:
+            self._generate_page_detail(page, category)
+        
+        return filepath
+    
+    def _write_category_overview(self, f: TextIO, category: str, pages: List[Dict]):
+        """写入分类概览内容"""
+        write = f.write
+        write(f"""# 📂 {category.upper()} 分类报告
 
 > 共 {len(pages)} 个页面
 
 ## 页面列表
 
-"""
+""")
         
         for page in pages:
             title = page.get('title', 'Untitled')
@@ -266,43 +463,34 @@ class ReportGenerator:
             if not isinstance(summary, str):
                 summary = str(summary) if summary else 'No summary available'
             
-            content += f"""### [{title}]({url})
+            write(f"""### [{title}]({url})
 
 {summary[:200]}{"..." if len(summary) > 200 else ""}
 
 **关键点:**
-"""
+""")
             key_points = page.get('key_points', [])
             if isinstance(key_points, list):
-                for point in key_points[:5]:
-                    if isinstance(point, str):
-                        content += f"- {point}\n"
-                    elif isinstance(point, dict):
-                        content += f"- {point.get('text', str(point))}\n"
-                    else:
-                        content += f"- {str(point)}\n"
+                f.writelines(_render_items(key_points[:5], _TEXT_RENDERERS, _render_plain))
             
-            content += "\n---\n\n"
-        
-        # 保存到分类目录
-        filepath = self.data_manager.save_report(
-            name='overview',
-            content=content,
-            category=category,
-            format='md'
-        )
-        
-        # 同时生成各页面的详细报告
-        for page in pages:
-            self._generate_page_detail(page, category)
-        
-        return filepath
+            write("\n---\n\n")
     
     def _generate_page_detail(self, page: Dict, category: str):
         """生成单页面详细报告"""
         filename = page.get('_meta', {}).get('filename', 'unknown')
         
-        content = f"""# {page.get('title', 'Untitled')}
+        # 保存到分类目录下的details子目录, 边生成边写入
+        details_dir = self.reports_dir / category / 'details'
+        details_dir.mkdir(parents=True, exist_ok=True)
+        
+        filepath = details_dir / f"{filename}.md"
+        with open(filepath, 'w', encoding='utf-8') as f:
+            self._write_page_detail(f, page)
+    
+    def _write_page_detail(self, f: TextIO, page: Dict):
+        """写入单页面详细报告内容"""
+        write = f.write
+        write(f"""# {page.get('title', 'Untitled')}
 
 > URL: {page.get('url', '')}  
 > 分析时间: {page.get('_meta', {}).get('analyzed_at', '')}
@@ -313,147 +501,120 @@ class ReportGenerator:
 
 ## 关键点
 
-"""
+""")
         
         key_points = page.get('key_points', [])
         if isinstance(key_points, list):
-            for point in key_points:
-                if isinstance(point, str):
-                    content += f"- {point}\n"
-                elif isinstance(point, dict):
-                    content += f"- {point.get('text', str(point))}\n"
+            f.writelines(_render_items(key_points, _TEXT_RENDERERS))
         
-        content += """
+        write("""
 ## 实体信息
 
-"""
+""")
         
         entities = page.get('entities', {})
         # 处理entities可能是字典或列表的情况
         if isinstance(entities, dict):
             for entity_type, values in entities.items():
                 if values:
-                    content += f"### {entity_type}\n"
+                    write(f"### {entity_type}\n")
                     if isinstance(values, list):
-                        for val in values:
-                            if isinstance(val, str):
-                                content += f"- {val}\n"
-                            elif isinstance(val, dict):
-                                content += f"- {val.get('name', str(val))}\n"
+                        f.writelines(_render_items(values, _ENTITY_VALUE_RENDERERS))
                     elif isinstance(values, str):
-                        content += f"- {values}\n"
-                    content += "\n"
+                        write(f"- {values}\n")
+                    write("\n")
         elif isinstance(entities, list):
             # entities是列表的情况
-            for entity in entities:
-                if isinstance(entity, str):
-                    content += f"- {entity}\n"
-                elif isinstance(entity, dict):
-                    entity_type = entity.get('type', 'entity')
-                    entity_value = entity.get('value', entity.get('name', str(entity)))
-                    content += f"- **{entity_type}**: {entity_value}\n"
+            f.writelines(_render_items(entities, _ENTITY_RENDERERS))
         
-        content += """
+        write("""
 ## 关键事实
 
-"""
+""")
         
         facts = page.get('facts', [])
         if isinstance(facts, list):
-            for fact in facts:
-                if isinstance(fact, dict):
-                    content += f"- **{fact.get('type', 'info')}**: {fact.get('value', '')}\n"
-                elif isinstance(fact, str):
-                    content += f"- {fact}\n"
+            f.writelines(_render_items(facts, _FACT_RENDERERS))
         
-        content += """
+        write("""
 ## 关键词
 
-"""
+""")
         keywords = page.get('keywords', [])
         if isinstance(keywords, list):
-            keyword_strs = [kw if isinstance(kw, str) else str(kw) for kw in keywords]
-            content += ", ".join(keyword_strs)
+            write(", ".join(map(str, keywords)))
         elif isinstance(keywords, str):
-            content += keywords
+            write(keywords)
         
-        content += f"""
+        write("""
 
 ---
 
 返回 [分类概览](./overview.md) | [总览报告](../summary.md)
-"""
-        
-        # 保存到分类目录下的details子目录
-        details_dir = self.reports_dir / category / 'details'
-        details_dir.mkdir(parents=True, exist_ok=True)
-        
-        filepath = details_dir / f"{filename}.md"
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+""")
     
-    def generate_data_export(self) -> str:
-        """生成数据导出"""
-        summary = self.data_manager.export_summary()
-        
-        filepath = self.reports_dir / 'data_export.json'
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
-        
-        return str(filepath)
+    def generate_data_export(self, stats: Optional[Dict] = None) -> str:
+        """生成数据导出 (供程序读取, 不缩进)"""
+        summary = self.data_manager.export_summary(stats)
+        
+        return self.data_manager.save_report(
+            name='data_export',
+            content=summary,
+            format='json',
+            pretty=False
+        )
     
     def _collect_key_findings(self, all_analyzed: List[Dict]) -> List[str]:
-        """收集关键发现"""
-        findings = []
+        """
+        收集关键发现
+        
+        只遍历一次分析结果, 同时统计关键词、收集重要事实和高相关页面摘要,
+        最后按 高频关键词 -> 重要事实 -> 高相关摘要 的顺序组合
+        """
+        keyword_counts = Counter()
+        fact_findings = []
+        summary_findings = []
         
-        # 收集高频关键词
-        keyword_counts = {}
         for page in all_analyzed:
+            # 统计关键词
             keywords = page.get('keywords', [])
             if isinstance(keywords, list):
-                for kw in keywords:
-                    if isinstance(kw, str):
-                        keyword_counts[kw] = keyword_counts.get(kw, 0) + 1
-        
-        top_keywords = sorted(
-            keyword_counts.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:5]
-        
-        if top_keywords:
-            findings.append(
-                f"最常见的主题包括: {', '.join([kw for kw, _ in top_keywords])}"
-            )
-        
-        # 收集重要事实
-        for page in all_analyzed:
+                keyword_counts.update(kw for kw in keywords if isinstance(kw, str))
+            
+            # 收集重要事实
             facts = page.get('facts', [])
             if isinstance(facts, list):
                 for fact in facts:
                     # 处理fact可能是字符串或字典的情况
                     if isinstance(fact, dict):
                         fact_type = fact.get('type', '')
-                        if fact_type in ['deadline', 'requirement', 'date']:
-                            findings.append(
+                        if isinstance(fact_type, str) and fact_type in _KEY_FACT_TYPES:
+                            fact_findings.append(
                                 f"{fact_type}: {fact.get('value', '')} "
                                 f"(来源: {page.get('title', 'Unknown')[:30]})"
                             )
                     elif isinstance(fact, str) and fact.strip():
                         # 如果fact是字符串，直接添加
-                        findings.append(
+                        fact_findings.append(
                             f"事实: {fact[:80]} "
                             f"(来源: {page.get('title', 'Unknown')[:30]})"
                         )
-        
-        # 收集高相关页面摘要
-        for page in all_analyzed:
-            relevance = page.get('relevance_score', 0)
-            # 确保relevance是数字
-            if isinstance(relevance, (int, float)) and relevance > 0.7:
+            
+            # 收集高相关页面摘要
+            # 数据管理器读回的relevance_score已统一为float
+            if page.get('relevance_score', 0.0) > 0.7:
                 summary = page.get('summary', '')
                 if summary and isinstance(summary, str):
-                    findings.append(summary[:100] + "...")
+                    summary_findings.append(summary[:100] + "...")
+        
+        findings = []
+        top_keywords = keyword_counts.most_common(5)
+        if top_keywords:
+            findings.append(
+                f"最常见的主题包括: {', '.join([kw for kw, _ in top_keywords])}"
+            )
+        findings.extend(fact_findings)
+        findings.extend(summary_findings)
         
         return findings[:15]
     
@@ -478,10 +639,10 @@ class ReportGenerator:
         if not isinstance(topic_summary, str):
             topic_summary = str(topic_summary) if topic_summary else '暂无概述'
         
-        content = f"""# 🎯 意图分析报告
+        parts = [f"""# 🎯 意图分析报告
 
 > 用户意图: {self.config.user_intent}  
-> 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+> 生成时间: {self._timestamp()}
 
 ## 概述
 
@@ -489,70 +650,32 @@ class ReportGenerator:
 
 ## 详细内容
 
-"""
+"""]
         
         sections = synthesized_info.get('sections', [])
         if isinstance(sections, list):
-            for section in sections:
-                if isinstance(section, dict):
-                    title = section.get('title', 'Section')
-                    section_content = section.get('content', '')
-                    sources = section.get('sources', [])
-                    
-                    # 确保content是字符串
-                    if not isinstance(section_content, str):
-                        section_content = str(section_content) if section_content else ''
-                    
-                    # 确保sources是列表
-                    if isinstance(sources, list):
-                        sources_str = ', '.join(str(s) for s in sources)
-                    elif isinstance(sources, str):
-                        sources_str = sources
-                    else:
-                        sources_str = str(sources) if sources else ''
-                    
-                    content += f"""### {title}
-
-{section_content}
-
-*来源: {sources_str}*
-
-"""
-                elif isinstance(section, str):
-                    content += f"{section}\n\n"
+            parts.extend(_render_items(sections, _SECTION_RENDERERS))
         
-        content += """## 关键发现
+        parts.append("""## 关键发现
 
-"""
+""")
         
         key_findings = synthesized_info.get('key_findings', [])
         if isinstance(key_findings, list):
-            for finding in key_findings:
-                if isinstance(finding, str):
-                    content += f"- {finding}\n"
-                elif isinstance(finding, dict):
-                    content += f"- {finding.get('text', str(finding))}\n"
-                else:
-                    content += f"- {str(finding)}\n"
+            parts.extend(_render_items(key_findings, _TEXT_RENDERERS, _render_plain))
         elif isinstance(key_findings, str):
-            content += f"- {key_findings}\n"
+            parts.append(f"- {key_findings}\n")
         
-        content += """
+        parts.append("""
 ## 建议行动
 
-"""
+""")
         
         action_items = synthesized_info.get('action_items', [])
         if isinstance(action_items, list):
-            for action in action_items:
-                if isinstance(action, str):
-                    content += f"- {action}\n"
-                elif isinstance(action, dict):
-                    content += f"- {action.get('text', str(action))}\n"
-                else:
-                    content += f"- {str(action)}\n"
+            parts.extend(_render_items(action_items, _TEXT_RENDERERS, _render_plain))
         elif isinstance(action_items, str):
-            content += f"- {action_items}\n"
+            parts.append(f"- {action_items}\n")
         
         # 数据质量评估
         quality = synthesized_info.get('data_quality', {})
@@ -570,7 +693,7 @@ class ReportGenerator:
             completeness = 0
             reliability = 0
         
-        content += f"""
+        parts.append(f"""
 ## 数据质量评估
 
 | 指标 | 评分 |
@@ -580,44 +703,23 @@ class ReportGenerator:
 
 ### 信息缺口
 
-"""
+""")
         
         gaps = quality.get('gaps', [])
         if isinstance(gaps, list):
-            for gap in gaps:
-                if isinstance(gap, str):
-                    content += f"- {gap}\n"
-                else:
-                    content += f"- {str(gap)}\n"
+            parts.extend(map(_render_plain, gaps))
         elif isinstance(gaps, str):
-            content += f"- {gaps}\n"
-        
-        content += """
----
-
-*本报告由 AI 自动生成，请结合实际情况使用*
-"""
+            parts.append(f"- {gaps}\n")
         
-        filepath = self.data_manager.save_report(
-            name='intent_analysis',
-            content=content,
-            format='md'
-        )
-        
-        return filepath
-
-        for gap in quality.get('gaps', []):
-            content += f"- {gap}\n"
-        
-        content += """
+        parts.append("""
 ---
 
 *本报告由 AI 自动生成，请结合实际情况使用*
-"""
+""")
         
         filepath = self.data_manager.save_report(
             name='intent_analysis',
-            content=content,
+            content="".join(parts),
             format='md'
         )
         
@@ -646,10 +748,8 @@ class ReportTemplates:
     @staticmethod
     def stats_table(stats: Dict) -> str:
         """统计表格模板"""
-        rows = []
-        for key, value in stats.items():
-            rows.append(f"| {key} | {value} |")
-        return "| 指标 | 数值 |\n|------|------|\n" + "\n".join(rows)
+        rows = "\n".join(f"| {key} | {value} |" for key, value in stats.items())
+        return "| 指标 | 数值 |\n|------|------|\n" + rows
 
 
 if __name__ == "__main__":
@@ -685,5 +785,6 @@ if __name__ == "__main__":
     for name, path in reports.items():
         print(f"  {name}: {path}")
     
-    # 清理
+    # 清理 (先关闭数据管理器, 写出索引后再删除目录)
+    manager.close()
     shutil.rmtree("./test_report_output", ignore_errors=True)
\ No newline at end of file
@@ -29,6 +29,7 @@ outputs/
 import sys
 import traceback
 import json
+import time
 import hashlib
 import shutil
 from datetime import datetime
@@ -911,7 +912,6 @@ class StorageManager:
             logger.warning(f"无效的分类或目录不存在: {category}")
             return 0
         
-        import time
         cutoff_time = time.time() - (older_than_days * 24 * 60 * 60)
         deleted_count = 0
         
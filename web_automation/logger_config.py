@@ -8,9 +8,14 @@
 - 便于调试: 多级别日志，支持文件和控制台输出
 """
 
+import os
+import re
 import sys
+import threading
+import time
+from functools import wraps
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, TextIO, Union
 from datetime import datetime
 
 from loguru import logger
@@ -27,6 +32,14 @@ CONSOLE_FORMAT = (
     "<level>{message}</level>"
 )
 
+# 控制台日志格式 (无颜色标记, 用于stderr不是终端时: 管道、nohup、容器日志)
+PLAIN_CONSOLE_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss} | "
+    "{level: <8} | "
+    "{name}:{function}:{line} | "
+    "{message}"
+)
+
 # 文件日志格式 (纯文本)
 FILE_FORMAT = (
     "{time:YYYY-MM-DD HH:mm:ss.SSS} | "
@@ -43,6 +56,277 @@ SIMPLE_FORMAT = (
 )
 
 
+# ============================================================================
+# 日志轮转
+# ============================================================================
+
+# 大小字符串, 如 "10 MB" / "512 KiB" (与loguru一致, 大写B表示字节)
+_SIZE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kKMG]i?)?B\s*$')
+
+_SIZE_UNITS = {
+    None: 1,
+    'k': 1000, 'K': 1000, 'M': 1000 ** 2, 'G': 1000 ** 3,
+    'ki': 1024, 'Ki': 1024, 'Mi': 1024 ** 2, 'Gi': 1024 ** 3,
+}
+
+
+class _SizeRotation:
+    """
+    按大小轮转的判断函数 (每个文件处理器一个实例)
+    
+    loguru按大小轮转时每条记录都调用file.tell(), 文本文件的tell()会先刷新缓冲区,
+    每条日志都变成一次write和lseek系统调用; 这里只在打开新文件时读取一次大小,
+    之后在内存中累计写入的字节数 (文件处理器使用UTF-8编码)
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._file = None
+        self._written = 0
+    
+    def __call__(self, message: str, file: TextIO) -> bool:
+        if file is not self._file:
+            # 新打开的文件 (首次写入或轮转后)
+            self._file = file
+            self._written = file.tell()
+        
+        self._written += len(message.encode('utf-8'))
+        if self._written > self.max_size:
+            # 轮转后本条记录写入新文件, 下次调用时重新读取大小
+            self._file = None
+            return True
+        return False
+
+
+def _parse_size(rotation: Any) -> Optional[int]:
+    """解析大小字符串为字节数, 不是大小字符串时返回None"""
+    if isinstance(rotation, str):
+        match = _SIZE_RE.match(rotation)
+        if match:
+            value, unit = match.groups()
+            return int(float(value) * _SIZE_UNITS[unit])
+    return None
+
+
+def _make_rotation(rotation: Any) -> Union[_SizeRotation, Any]:
+    """大小字符串转换为 _SizeRotation, 其他形式 (时间间隔等) 原样交给loguru"""
+    size = _parse_size(rotation)
+    return _SizeRotation(size) if size is not None else rotation
+
+
+# 保留时间字符串, 如 "7 days" / "12 hours"
+_DURATION_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(second|minute|hour|day|week)s?\s*$', re.IGNORECASE)
+
+_DURATION_UNITS = {
+    'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400, 'week': 604800,
+}
+
+
+# ============================================================================
+# 批量写入的文件sink
+# ============================================================================
+
+class BatchedFileSink:
+    """
+    批量写入的日志文件sink
+    
+    loguru的文件处理器按行缓冲, 每条记录一次write系统调用。这里记录先追加到
+    内存缓冲区, 由后台线程每隔flush_interval秒、或缓冲区超过buffer_size时
+    一次写入; WARNING及以上级别的记录立即写入。
+    支持按大小轮转 (轮转文件命名与loguru一致: 名称.时间戳.后缀) 和按时间/个数清理。
+    
+    sink本身已是异步的, 添加时使用 enqueue=False; loguru移除处理器 (包括退出时)
+    会调用stop(), 写出剩余内容。
+    
+    使用示例:
+        sink = BatchedFileSink("logs/app.log", rotation_size=10_000_000, retention=7 * 86400)
+        logger.add(sink, format=FILE_FORMAT, level="DEBUG")
+    """
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        rotation_size: Optional[int] = None,
+        retention: Optional[Union[int, float]] = None,
+        flush_interval: float = 0.2,
+        buffer_size: int = 64 * 1024
+    ):
+        """
+        初始化批量写入sink
+        
+        Args:
+            path: 日志文件路径
+            rotation_size: 文件超过该字节数时轮转, None表示不轮转
+            retention: 轮转文件的保留策略, int表示保留个数, float表示保留秒数
+            flush_interval: 后台写入间隔 (秒)
+            buffer_size: 缓冲区超过该字节数时立即写入
+        """
+        self.path = Path(path)
+        self.rotation_size = rotation_size
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        
+        self._buffer = bytearray()
+        self._buffer_lock = threading.Lock()
+        # 写文件和轮转在同一把锁下进行, 后台线程和立即写入不会交错
+        self._io_lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = self._open()
+        self._size = os.fstat(self._fd).st_size
+        
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="log-flush", daemon=True
+        )
+        self._thread.start()
+    
+    def _open(self) -> int:
+        return os.open(str(self.path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    
+    def write(self, message: str):
+        """追加一条记录 (由loguru调用)"""
+        data = message.encode('utf-8')
+        record = getattr(message, 'record', None)
+        urgent = record is not None and record['level'].no >= 30
+        
+        with self._buffer_lock:
+            self._buffer += data
+            urgent = urgent or len(self._buffer) >= self.buffer_size
+        
+        if urgent:
+            self.flush_buffer()
+    
+    def flush_buffer(self):
+        """把缓冲区内容一次写入文件, 需要时先轮转"""
+        with self._io_lock:
+            with self._buffer_lock:
+                if not self._buffer:
+                    return
+                data = bytes(self._buffer)
+                self._buffer.clear()
+            
+            if (self.rotation_size is not None and self._size 
+                    and self._size + len(data) > self.rotation_size):
+                self._rotate()
+            
+            view = memoryview(data)
+            while view:
+                written = os.write(self._fd, view)
+                view = view[written:]
+            self._size += len(data)
+    
+    def _rotate(self):
+        """关闭当前文件, 改名为带时间戳的文件后重新打开, 再按保留策略清理"""
+        os.close(self._fd)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        os.replace(
+            self.path, 
+            self.path.with_name(f"{self.path.stem}.{timestamp}{self.path.suffix}")
+        )
+        self._fd = self._open()
+        self._size = 0
+        
+        if self.retention is not None:
+            self._cleanup()
+    
+    def _cleanup(self):
+        """删除超出保留策略的轮转文件"""
+        rotated = [
+            p for p in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}")
+            if p != self.path
+        ]
+        try:
+            rotated.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+            if isinstance(self.retention, int):
+                expired = rotated[self.retention:]
+            else:
+                cutoff = time.time() - self.retention
+                expired = [p for p in rotated if p.stat().st_mtime < cutoff]
+            for p in expired:
+                p.unlink()
+        except OSError:
+            pass
+    
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush_buffer()
+    
+    def stop(self):
+        """停止后台线程, 写出剩余内容并关闭文件 (由loguru调用)"""
+        self._stop_event.set()
+        self._thread.join()
+        self.flush_buffer()
+        os.close(self._fd)
+
+
+def _parse_retention(retention: Any) -> Optional[Union[int, float]]:
+    """
+    解析保留策略: int原样返回 (保留个数), 时间字符串转为秒数;
+    None或无法解析时返回None
+    """
+    if isinstance(retention, int):
+        return retention
+    if isinstance(retention, str):
+        match = _DURATION_RE.match(retention)
+        if match:
+            value, unit = match.groups()
+            return float(value) * _DURATION_UNITS[unit.lower()]
+    return None
+
+
+# ============================================================================
+# 最近日志缓存
+# ============================================================================
+
+class _RingLogSink:
+    """
+    最近日志的环形缓冲区
+    
+    容量固定, 写满后覆盖最旧的记录; 不涉及文件I/O,
+    需要最近的日志上下文时直接从内存读取, 不必重新读日志文件
+    """
+    
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._buffer: List[Optional[str]] = [None] * capacity
+        self._index = 0
+        self._full = False
+        self._lock = threading.Lock()
+    
+    def write(self, message: str):
+        """写入一条记录 (由loguru调用)"""
+        line = message.rstrip('\n')
+        with self._lock:
+            self._buffer[self._index] = line
+            self._index += 1
+            if self._index == self.capacity:
+                self._index = 0
+                self._full = True
+    
+    def get_history(self) -> List[str]:
+        """按时间顺序返回缓存的记录"""
+        with self._lock:
+            if self._full:
+                return self._buffer[self._index:] + self._buffer[:self._index]
+            return self._buffer[:self._index]
+
+
+_history_sink: Optional[_RingLogSink] = None
+
+
+def get_log_history() -> List[str]:
+    """
+    获取最近的日志记录 (按时间顺序)
+    
+    需要在setup_logger中设置history_size启用, 未启用时返回空列表
+    """
+    if _history_sink is None:
+        return []
+    return _history_sink.get_history()
+
+
 # ============================================================================
 # 日志配置函数
 # ============================================================================
@@ -55,7 +339,9 @@ def setup_logger(
     retention: str = "7 days",
     enable_file: bool = True,
     enable_console: bool = True,
-    module_name: str = "web_automation"
+    module_name: str = "web_automation",
+    flush_interval: float = 0.2,
+    history_size: int = 0
 ) -> None:
     """
     配置日志系统
@@ -69,18 +355,35 @@ def setup_logger(
         enable_file: 是否启用文件日志
         enable_console: 是否启用控制台日志
         module_name: 模块名称
+        flush_interval: 主日志文件批量写入的间隔 (秒), 0表示逐条写入
+        history_size: 在内存中保留的最近INFO及以上日志条数 (见get_log_history), 0表示不保留
     """
+    global _history_sink
+    
     # 移除默认处理器
     logger.remove()
+    _history_sink = None
     
-    # 控制台处理器
+    # 最近日志缓存
+    if history_size > 0:
+        _history_sink = _RingLogSink(history_size)
+        logger.add(
+            _history_sink,
+            format=FILE_FORMAT,
+            level="INFO",
+            enqueue=False
+        )
+    
+    # 控制台处理器 (stderr不是终端时不着色)
+    # 直接在调用处写入: 控制台输出量小, 不值得为每条记录跨队列序列化, 崩溃前的日志也不会滞留在队列里
     if enable_console:
+        is_tty = sys.stderr.isatty()
         logger.add(
             sys.stderr,
-            format=CONSOLE_FORMAT,
+            format=CONSOLE_FORMAT if is_tty else PLAIN_CONSOLE_FORMAT,
             level=console_level,
-            colorize=True,
-            enqueue=True  # 异步写入，提高性能
+            colorize=is_tty,
+            enqueue=False
         )
     
     # 文件处理器
@@ -92,23 +395,46 @@ def setup_logger(
         timestamp = datetime.now().strftime("%Y%m%d")
         log_file = log_dir / f"{module_name}_{timestamp}.log"
         
-        logger.add(
-            str(log_file),
-            format=FILE_FORMAT,
-            level=log_level,
-            rotation=rotation,
-            retention=retention,
-            encoding="utf-8",
-            enqueue=True
+        rotation_size = _parse_size(rotation)
+        retention_policy = _parse_retention(retention)
+        batched = (
+            flush_interval > 0
+            and (rotation is None or rotation_size is not None)
+            and (retention is None or retention_policy is not None)
         )
         
+        if batched:
+            # 批量写入 (sink自带后台线程, 不再经过loguru的队列)
+            logger.add(
+                BatchedFileSink(
+                    log_file,
+                    rotation_size=rotation_size,
+                    retention=retention_policy,
+                    flush_interval=flush_interval
+                ),
+                format=FILE_FORMAT,
+                level=log_level,
+                enqueue=False
+            )
+        else:
+            # 按时间轮转等BatchedFileSink不支持的配置交给loguru
+            logger.add(
+                str(log_file),
+                format=FILE_FORMAT,
+                level=log_level,
+                rotation=_make_rotation(rotation),
+                retention=retention,
+                encoding="utf-8",
+                enqueue=True
+            )
+        
         # 错误日志单独文件
         error_file = log_dir / f"{module_name}_error_{timestamp}.log"
         logger.add(
             str(error_file),
             format=FILE_FORMAT,
             level="ERROR",
-            rotation=rotation,
+            rotation=_make_rotation(rotation),
             retention=retention,
             encoding="utf-8",
             enqueue=True
@@ -117,19 +443,29 @@ def setup_logger(
     logger.info(f"日志系统初始化完成 (控制台级别: {console_level}, 文件级别: {log_level})")
 
 
+# 按模块名缓存的已绑定logger (绑定后的logger共享同一组处理器, 重新setup_logger后仍然有效)
+_bound_loggers: Dict[str, Any] = {}
+
+
 def get_logger(name: str = None):
     """
     获取带有上下文的logger
     
+    同名的logger只绑定一次, 之后直接返回缓存的实例
+    
     Args:
         name: 模块名称
         
     Returns:
         配置好的logger实例
     """
-    if name:
-        return logger.bind(name=name)
-    return logger
+    if not name:
+        return logger
+    
+    bound = _bound_loggers.get(name)
+    if bound is None:
+        bound = _bound_loggers[name] = logger.bind(name=name)
+    return bound
 
 
 # ============================================================================
@@ -141,18 +477,20 @@ def log_function_call(func):
     函数调用日志装饰器
     
     记录函数的调用和返回，用于调试
+    
+    参数和返回类型惰性求值: 没有处理器接收DEBUG时不会对参数做repr
     """
-    from functools import wraps
+    func_name = func.__name__
+    lazy_logger = logger.opt(lazy=True)
     
     @wraps(func)
     def wrapper(*args, **kwargs):
-        func_name = func.__name__
-        logger.debug(f"调用函数: {func_name}")
-        logger.debug(f"  参数: args={args}, kwargs={kwargs}")
+        lazy_logger.debug("调用函数: {}", lambda: func_name)
+        lazy_logger.debug("  参数: args={}, kwargs={}", lambda: args, lambda: kwargs)
         
         try:
             result = func(*args, **kwargs)
-            logger.debug(f"  返回: {type(result).__name__}")
+            lazy_logger.debug("  返回: {}", lambda: type(result).__name__)
             return result
         except Exception as e:
             logger.error(f"  异常: {e}")
@@ -164,16 +502,15 @@ def log_function_call(func):
 def log_time(func):
     """
     函数执行时间日志装饰器
-    """
-    from functools import wraps
-    import time
     
+    使用单调时钟计时 (不受系统时间调整影响), 以毫秒记录
+    """
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        elapsed = time.time() - start_time
-        logger.debug(f"{func.__name__} 执行时间: {elapsed:.2f}秒")
+        elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        logger.debug(f"{func.__name__} 执行时间: {elapsed_ms:.2f}ms")
         return result
     
     return wrapper
@@ -187,21 +524,35 @@ class ProgressLogger:
     """
     进度日志记录器
     
-    用于记录爬取进度，显示当前状态
+    用于记录爬取进度，显示当前状态。
+    每完成约1%或距上次输出超过min_interval秒时才输出一条，避免逐条格式化和写日志
     """
     
-    def __init__(self, total: int, desc: str = "进度"):
+    # 进度消息模板 (一次format_map生成整条消息)
+    _TEMPLATE = (
+        "{desc}: {current}/{total} ({progress:.1f}%) | "
+        "速度: {speed:.2f}/s | 剩余: {eta:.0f}s{suffix}"
+    )
+    
+    def __init__(self, total: int, desc: str = "进度", min_interval: float = 2.0):
         """
         初始化进度记录器
         
         Args:
             total: 总数
             desc: 描述文本
+            min_interval: 两次输出之间的最长间隔 (秒)
         """
         self.total = total
         self.current = 0
         self.desc = desc
-        self.start_time = datetime.now()
+        self.min_interval = min_interval
+        self.start_time = time.monotonic()
+        
+        self._step = max(1, total // 100)
+        self._next_emit = self._step
+        self._last_emit = self.start_time
+        self._inv_total = 100.0 / total if total > 0 else 0.0
     
     def update(self, n: int = 1, message: str = ""):
         """
@@ -209,29 +560,37 @@ class ProgressLogger:
         
         Args:
             n: 增加的数量
-            message: 附加消息
+            message: 附加消息 (只在本次输出时显示)
         """
         self.current += n
-        progress = (self.current / self.total) * 100 if self.total > 0 else 0
+        now = time.monotonic()
         
-        elapsed = (datetime.now() - self.start_time).total_seconds()
-        speed = self.current / elapsed if elapsed > 0 else 0
+        if (self.current < self._next_emit 
+                and self.current < self.total 
+                and now - self._last_emit < self.min_interval):
+            return
         
-        eta = (self.total - self.current) / speed if speed > 0 else 0
+        self._next_emit = (self.current // self._step + 1) * self._step
+        self._last_emit = now
         
-        log_message = (
-            f"{self.desc}: {self.current}/{self.total} ({progress:.1f}%) | "
-            f"速度: {speed:.2f}/s | 剩余: {eta:.0f}s"
-        )
+        elapsed = now - self.start_time
+        speed = self.current / elapsed if elapsed > 0 else 0
         
-        if message:
-            log_message += f" | {message}"
+        eta = (self.total - self.current) / speed if speed > 0 else 0
         
-        logger.info(log_message)
+        logger.info(self._TEMPLATE.format_map({
+            'desc': self.desc,
+            'current': self.current,
+            'total': self.total,
+            'progress': self.current * self._inv_total,
+            'speed': speed,
+            'eta': eta,
+            'suffix': f" | {message}" if message else ""
+        }))
     
     def finish(self):
         """完成进度"""
-        elapsed = (datetime.now() - self.start_time).total_seconds()
+        elapsed = time.monotonic() - self.start_time
         logger.success(f"{self.desc}完成! 总计: {self.current}, 耗时: {elapsed:.2f}秒")
 
 
@@ -276,7 +635,7 @@ class LogContext:
 # ============================================================================
 
 if __name__ == "__main__":
-    from pathlib import Path
+    import shutil
     
     # 测试日志配置
     test_log_dir = Path("./test_logs")
@@ -293,7 +652,6 @@ if __name__ == "__main__":
     print("\n测试进度日志:")
     progress = ProgressLogger(total=5, desc="测试进度")
     for i in range(5):
-        import time
         time.sleep(0.1)
         progress.update(1, f"处理项目 {i+1}")
     progress.finish()
@@ -309,7 +667,6 @@ if __name__ == "__main__":
     @log_function_call
     @log_time
     def test_function(x, y):
-        import time
         time.sleep(0.1)
         return x + y
     
@@ -317,8 +674,7 @@ if __name__ == "__main__":
     print(f"结果: {result}")
     
     # 清理测试目录
-    import shutil
     if test_log_dir.exists():
         shutil.rmtree(test_log_dir)
     
-    print("\n日志模块测试完成!")
+    print("\n日志模块测试完成!")
\ No newline at end of file